@@ -6,6 +6,11 @@ from .auth_utils import AuthError
 # import extensions
 from .extensions import db, cache
 from .config import Config
+from .token_cache import token_cache
+from .identity_map import identity_map
+from .metrics import metrics
+from .profiling import profiler
+from .commands import expenses_cli, idempotency_cli, rollups_cli
 
 # import blueprints
 from routes.api_routes import api_bp
@@ -21,13 +26,22 @@ def create_app(config_class=None):
     # load config
     app.config.from_object(Config)
 
-    # initialise extensions
+    # initialise extensions (metrics first: it picks the pool class of the engines db creates)
+    metrics.init_app(app)
     db.init_app(app)
     cache.init_app(app) 
+    token_cache.init_app(app)
+    identity_map.init_app(app)
+    profiler.init_app(app)
 
     # Set up Flask-Migrate
     Migrate(app, db)
 
+    # CLI commands
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(expenses_cli)
+    app.cli.add_command(idempotency_cli)
+
     # blueprint registration
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(expense_bp, url_prefix='/api/expenses')
@@ -1,10 +1,59 @@
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
 from models.user import User
 from app.extensions import db
+from app.db_utils import dialect_insert, is_mysql
+from app.identity_map import identity_map
+from app.profiling import profiled
+
+def build_user_upsert(dialect_name: str, auth0_subject_id: str, email: str = None):
+    """
+    Builds a single-statement "insert the user unless it exists, and give me its id" for the dialect.
+
+    Postgres/SQLite: INSERT ... ON CONFLICT (auth0_subject) DO UPDATE ... RETURNING id.
+    MySQL has no RETURNING, so ON DUPLICATE KEY UPDATE routes the existing id through
+    LAST_INSERT_ID(id), which the driver reports as the statement's lastrowid.
+    """
+    users = User.__table__
+    stmt = dialect_insert(dialect_name, users).values(auth0_subject=auth0_subject_id, email=email)
+
+    if is_mysql(dialect_name):
+        # Only adopt the existing id when the duplicate is on auth0_subject, not on email
+        return stmt.on_duplicate_key_update(
+            id=func.if_(users.c.auth0_subject == stmt.inserted.auth0_subject,
+                        func.last_insert_id(users.c.id), users.c.id)
+        )
 
+    # The no-op SET makes the conflicting row visible to RETURNING (DO NOTHING returns no row)
+    return stmt.on_conflict_do_update(
+        index_elements=[users.c.auth0_subject],
+        set_={"auth0_subject": stmt.excluded.auth0_subject},
+    ).returning(users.c.id)
+
+def _provision_user(auth0_subject_id: str, email: str = None):
+    # Own connection and transaction: one round trip, and never commits unrelated db.session state
+    with db.engine.begin() as connection:
+        dialect_name = connection.dialect.name
+        stmt = build_user_upsert(dialect_name, auth0_subject_id, email)
+        result = connection.execute(stmt)
+        if not is_mysql(dialect_name):
+            return result.scalar_one()
+
+        if not result.lastrowid:
+            raise IntegrityError(str(stmt), None, Exception("email is already registered to another user"))
+        return result.lastrowid
+
+@profiled("auth")
 def get_or_create_internal_user_id(auth0_subject_id: str, email: str = None, create_if_missing: bool = False):
     """
     Retrieves the local Fintrack user ID based on the Auth0 subject ID.
     Optionally creates the user if not found and `create_if_missing` is True.
+    Lookups are served from the identity map when possible, so most requests
+    never query the users table.
+
+    Existing users are found with a plain SELECT. Creation is a single atomic upsert,
+    so concurrent first requests from a new user all receive the same ID instead of racing on the unique auth0_subject index.
 
     Args:
         auth0_subject_id: The 'sub' claim from the Auth0 token.
@@ -17,14 +66,21 @@ def get_or_create_internal_user_id(auth0_subject_id: str, email: str = None, cre
     if not auth0_subject_id:
         return None
 
-    internal_user = User.query.filter_by(auth0_subject=auth0_subject_id).first()
+    cached_user_id = identity_map.get(auth0_subject_id)
+    if cached_user_id is not None:
+        return cached_user_id
+
+    # Indexed read first: only a subject with no row yet pays for the upsert, which is a write.
+    # No autoflush, so the lookup never writes pending db.session state either.
+    with db.session.no_autoflush:
+        internal_user = User.query.filter_by(auth0_subject=auth0_subject_id).first()
     if internal_user:
+        identity_map.set(auth0_subject_id, internal_user.id)
         return internal_user.id
 
     if create_if_missing:
-        new_user = User(auth0_subject=auth0_subject_id, email=email)
-        db.session.add(new_user)
-        db.session.commit()
-        return new_user.id
+        user_id = _provision_user(auth0_subject_id, email)
+        identity_map.set(auth0_subject_id, user_id)
+        return user_id
 
     return None
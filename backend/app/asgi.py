@@ -0,0 +1,37 @@
+import contextlib
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Mount
+
+from . import create_app
+from .async_db import create_async_db
+from .auth_utils import AuthError
+from routes.async_expense_routes import expense_read_routes
+
+async def handle_auth_error(request, ex):
+    return JSONResponse(ex.error, status_code=ex.status_code)
+
+def create_asgi_app(flask_app=None):
+    """
+    ASGI application (asgi.py). The expense read routes run as coroutines on an async engine, so a request
+    waiting on the database, on a first JWKS fetch or on a slow client holds no thread. Every other route is
+    the Flask app, run on ASGI_WSGI_THREADS worker threads.
+    """
+    flask_app = flask_app or create_app()
+    engine, sessions = create_async_db(flask_app.config)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    wsgi_app = WSGIMiddleware(flask_app, workers=flask_app.config.get("ASGI_WSGI_THREADS", 10))
+    app = Starlette(
+        routes=[*expense_read_routes(flask_app), Mount("/", app=wsgi_app)],
+        exception_handlers={AuthError: handle_auth_error},
+        lifespan=lifespan,
+    )
+    app.state.db_engine = engine
+    app.state.db_sessions = sessions
+    return app
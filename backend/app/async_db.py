@@ -0,0 +1,29 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# asyncio driver, from requirements.txt, for each backend the async read routes support
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_uri(uri):
+    """SQLALCHEMY_DATABASE_URI with its driver swapped for the backend's asyncio driver."""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(
+            f"The async read routes (asgi.py) support Postgres and SQLite, not '{backend}'; "
+            f"serve the app with wsgi.py instead."
+        )
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def create_async_db(config):
+    """
+    (engine, session factory) for the async read routes. ASYNC_DATABASE_URI wins when set, e.g. to add
+    driver-specific options such as asyncpg's ssl; otherwise the primary's URI is reused with an asyncio driver.
+    """
+    uri = config.get("ASYNC_DATABASE_URI") or async_database_uri(config["SQLALCHEMY_DATABASE_URI"])
+    engine = create_async_engine(uri)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
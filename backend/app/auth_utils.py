@@ -1,9 +1,10 @@
+import anyio
 import requests
-import json
+import threading
+import time
 from functools import wraps
 from flask import request, current_app, g
 import jwt
-from jwt.algorithms import RSAAlgorithm
 
 from jwt.exceptions import (
     ExpiredSignatureError,
@@ -15,7 +16,10 @@ from jwt.exceptions import (
     PyJWKError
 )
 
-from .extensions import cache
+from .caching import run_shared_cache_call
+from .jwks import JWKSProvider, get_public_key_index
+from .profiling import profile_phase
+from .token_cache import token_cache
 
 # Auth Error Exception
 class AuthError(Exception):
@@ -24,6 +28,9 @@ class AuthError(Exception):
         self.status_code = status_code
 
 # JWKS Handling
+# Pooled HTTP session so JWKS refreshes reuse the TLS connection to Auth0
+_http_session = requests.Session()
+
 def get_jwks_from_auth0_uncached():
     auth0_domain = current_app.config["AUTH0_DOMAIN"]
     if not auth0_domain:
@@ -31,10 +38,10 @@ def get_jwks_from_auth0_uncached():
         raise AuthError({"code": "config_error",
                          "description": "Authentication service domain not configured."}, 500)
 
-    current_app.logger.info(f"Fetching JWKS from Auth0 (https://{auth0_domain}/.well-known/jwks.json)")
+    jwks_url = current_app.config.get("AUTH0_JWKS_URL") or f"https://{auth0_domain}/.well-known/jwks.json"
+    current_app.logger.info(f"Fetching JWKS from Auth0 ({jwks_url})")
     try:
-        jwks_url = f"https://{auth0_domain}/.well-known/jwks.json"
-        jwks_response = requests.get(jwks_url, timeout=10)
+        jwks_response = _http_session.get(jwks_url, timeout=current_app.config.get("JWKS_FETCH_TIMEOUT", 10))
         jwks_response.raise_for_status()
         jwks = jwks_response.json()
         if not jwks or "keys" not in jwks:
@@ -47,9 +54,35 @@ def get_jwks_from_auth0_uncached():
         raise AuthError({"code": "jwks_fetch_error",
                          "description": "Unable to fetch JWKS."}, 500)
 
+# The lambda resolves get_jwks_from_auth0_uncached at call time so it can be patched in tests
+jwks_provider = JWKSProvider(lambda: get_jwks_from_auth0_uncached())
+
+_last_forced_refresh = None
+_forced_refresh_lock = threading.Lock()
+
+def refresh_jwks_for_unknown_kid():
+    """
+    Re-fetches the JWKS when a token references a kid we don't know (e.g. Auth0 rotated keys).
+    Rate limited per process to one refresh every JWKS_MIN_REFRESH_INTERVAL seconds so that
+    tokens with bogus kids can't be used to hammer Auth0. Returns the new JWKS, or None if limited.
+    """
+    global _last_forced_refresh
+    now = time.monotonic()
+    with _forced_refresh_lock:
+        min_interval = current_app.config.get("JWKS_MIN_REFRESH_INTERVAL", 60)
+        if _last_forced_refresh is not None and now - _last_forced_refresh < min_interval:
+            return None
+        _last_forced_refresh = now
+
+    current_app.logger.info("Unknown kid in token header, refreshing JWKS.")
+    return jwks_provider.refresh()
+
 # JWT Verification
 def get_token_auth_header():
-    auth = request.headers.get("Authorization", None)
+    return parse_bearer_token(request.headers.get("Authorization", None))
+
+def parse_bearer_token(auth):
+    """The token from an `Authorization: Bearer <token>` header value; AuthError if it is missing or malformed."""
     if not auth:
         raise AuthError({"code": "authorization_header_missing",
                         "description": "Authorization header is expected"}, 401)
@@ -76,18 +109,15 @@ def verify_decode_jwt(token, jwks):
         raise AuthError({"code": "invalid_header",
                         "description": "Authorization malformed. 'kid' missing from header."}, 401)
 
-    rsa_key_dict = None
-    for key_component in jwks["keys"]:
-        if key_component["kid"] == unverified_header["kid"]:
-            rsa_key_dict = key_component # Stores the whole key dict
-            break
-
-    if not rsa_key_dict:
-        raise AuthError({"code": "invalid_key",
-                        "description": "Unable to find appropriate key in JWKS for token verification."}, 401)
+    kid = unverified_header["kid"]
+    key_index = get_public_key_index(jwks, jwks_provider.fingerprint(jwks))
+    if kid not in key_index:
+        refreshed_jwks = refresh_jwks_for_unknown_kid()
+        if refreshed_jwks:
+            key_index = get_public_key_index(refreshed_jwks, jwks_provider.fingerprint(refreshed_jwks))
 
     try:
-        public_key = RSAAlgorithm.from_jwk(json.dumps(rsa_key_dict))
+        public_key = key_index.get(kid)
     except PyJWKError as e:
         current_app.logger.error(f"Error constructing public key from JWK: {e}")
         raise AuthError({"code": "key_construction_error",
@@ -97,6 +127,9 @@ def verify_decode_jwt(token, jwks):
         raise AuthError({"code": "key_construction_error",
                          "description": "Unexpected error during public key construction."}, 500)
 
+    if public_key is None:
+        raise AuthError({"code": "invalid_key",
+                        "description": "Unable to find appropriate key in JWKS for token verification."}, 401)
 
     try:
         payload = jwt.decode(
@@ -141,25 +174,62 @@ def verify_decode_jwt(token, jwks):
 def requires_auth(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        memoized_get_jwks = cache.memoize(timeout=current_app.config['CACHE_DEFAULT_TIMEOUT'])(get_jwks_from_auth0_uncached)
         try:
-            token = get_token_auth_header()
-            jwks = memoized_get_jwks()
+            with profile_phase("auth"):
+                token = get_token_auth_header()
+                jwks = jwks_provider.get()
+                if not jwks:
+                    raise AuthError({"code": "jwks_unavailable",
+                                     "description": "JWKS not available for token validation."}, 500)
+                fingerprint = jwks_provider.fingerprint(jwks)
+                payload = token_cache.get(token, fingerprint)
+                if payload is None:
+                    payload = verify_decode_jwt(token, jwks)
+                    token_cache.set(token, payload, fingerprint)
+                g.current_user = payload
+        except AuthError as e:
+            raise e
+        except Exception as ex:
+            current_app.logger.error(f"Unexpected error in requires_auth decorator: {ex}", exc_info=True)
+            raise AuthError({"code": "internal_server_error",
+                             "description": "An unexpected error occurred during authentication processing."}, 500)
+        return f(*args, **kwargs)
+    return decorated
+
+def requires_auth_async(f):
+    """
+    requires_auth for the async read routes served by asgi.py: `f` takes a Starlette request and the
+    verified claims are stored in request.state.current_user.
+
+    Blocking work runs on worker threads: the first JWKS fetch, token-cache reads and writes that reach
+    the shared cache, and full verification (which may refresh the JWKS for an unknown kid). A token-cache
+    hit needs no JWKS fetch or RSA check.
+    """
+    @wraps(f)
+    async def decorated(request, *args, **kwargs):
+        try:
+            token = parse_bearer_token(request.headers.get("Authorization"))
+            jwks = jwks_provider.cached()
+            if jwks is None:
+                jwks = await anyio.to_thread.run_sync(jwks_provider.get)
             if not jwks:
                 raise AuthError({"code": "jwks_unavailable",
                                  "description": "JWKS not available for token validation."}, 500)
-            payload = verify_decode_jwt(token, jwks)
-            g.current_user = payload
+            fingerprint = jwks_provider.fingerprint(jwks)
+            payload = await run_shared_cache_call(token_cache.get, token, fingerprint)
+            if payload is None:
+                payload = await anyio.to_thread.run_sync(verify_decode_jwt, token, jwks)
+                await run_shared_cache_call(token_cache.set, token, payload, fingerprint)
+            request.state.current_user = payload
         except AuthError as e:
             raise e
         except Exception as ex:
-            current_app.logger.error(f"Unexpected error in requires_auth decorator: {ex}", exc_info=True)
+            current_app.logger.error(f"Unexpected error in requires_auth_async decorator: {ex}", exc_info=True)
             raise AuthError({"code": "internal_server_error",
                              "description": "An unexpected error occurred during authentication processing."}, 500)
-        return f(*args, **kwargs)
+        return await f(request, *args, **kwargs)
     return decorated
 
 def clear_jwks_cache_util():
-    memoized_get_jwks = cache.memoize(timeout=current_app.config['CACHE_DEFAULT_TIMEOUT'])(get_jwks_from_auth0_uncached)
-    cache.delete_memoized(memoized_get_jwks)
+    jwks_provider.invalidate()
     current_app.logger.info("JWKS cache cleared via utility function.")
\ No newline at end of file
@@ -0,0 +1,112 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+import anyio
+from flask import current_app, has_app_context
+
+from .extensions import cache
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU mapping with optional per-entry expiry (unix timestamp)."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at=None):
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+# Shared (Redis) tier helpers
+# These fail open: a broken or disabled shared cache degrades to process-local caching, never to an error response.
+def shared_cache_enabled():
+    return has_app_context() and bool(current_app.config.get("SHARED_CACHE_ENABLED"))
+
+def config_value(key, default):
+    """Reads an app config value, falling back to `default` outside an app context."""
+    return current_app.config.get(key, default) if has_app_context() else default
+
+def shared_get(key):
+    if not shared_cache_enabled():
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        current_app.logger.warning(f"Shared cache read failed for '{key}': {e}")
+        return None
+
+def shared_set(key, value, timeout=None):
+    if not shared_cache_enabled():
+        return False
+    try:
+        return cache.set(key, value, timeout=timeout)
+    except Exception as e:
+        current_app.logger.warning(f"Shared cache write failed for '{key}': {e}")
+        return False
+
+def shared_delete(key):
+    if not shared_cache_enabled():
+        return False
+    try:
+        return cache.delete(key)
+    except Exception as e:
+        current_app.logger.warning(f"Shared cache delete failed for '{key}': {e}")
+        return False
+
+def shared_add(key, value, timeout=None):
+    """Sets `key` only if it does not exist yet (SET NX on Redis)."""
+    if not shared_cache_enabled():
+        return False
+    try:
+        return cache.add(key, value, timeout=timeout)
+    except Exception as e:
+        current_app.logger.warning(f"Shared cache add failed for '{key}': {e}")
+        return False
+
+def shared_inc(key, delta=1):
+    """Atomically increments an integer `key` (INCRBY on Redis). Returns the new value, or None on failure."""
+    if not shared_cache_enabled():
+        return None
+    try:
+        return cache.cache.inc(key, delta)
+    except Exception as e:
+        current_app.logger.warning(f"Shared cache increment failed for '{key}': {e}")
+        return None
+
+async def run_shared_cache_call(func, *args, **kwargs):
+    """
+    Awaits `func(*args, **kwargs)`, a call that may reach the shared cache, from async code. It runs on a
+    worker thread so the event loop never waits on a Redis round trip; with the shared tier off it only
+    touches process-local state and runs inline.
+    """
+    if not shared_cache_enabled():
+        return func(*args, **kwargs)
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs))
@@ -0,0 +1,91 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from .expense_cache import bump_data_version
+from .extensions import db
+from .idempotency import purge_expired
+from .importers import EXPENSE_SIGNS, FORMATS, open_statement, run_import
+from .partitions import INTERVALS, ensure_partitions, is_partitioned
+from .rollups import rebuild_rollups, rollup_user_ids
+
+rollups_cli = AppGroup("rollups", help="Maintain the expense_daily_rollups table.")
+
+@rollups_cli.command("rebuild")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user's rollups.")
+def rebuild_rollups_command(user_id):
+    """Backfill or repair daily rollups from the expenses table."""
+    with db.engine.begin() as connection:
+        user_ids = [user_id] if user_id is not None else rollup_user_ids(connection)
+        row_count = rebuild_rollups(connection, user_id=user_id)
+    # Cached aggregates may have been served from the rollups just replaced
+    for rebuilt_user_id in user_ids:
+        bump_data_version(rebuilt_user_id)
+    target = f"user {user_id}" if user_id is not None else "all users"
+    click.echo(f"Rebuilt {row_count} daily rollup rows for {target}.")
+
+
+expenses_cli = AppGroup("expenses", help="Manage expense data.")
+
+@expenses_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--user-id", type=int, required=True, help="Fintrack user id to import the expenses for.")
+@click.option("--format", "statement_format", type=click.Choice(list(FORMATS)), default=None,
+              help="Statement format; defaults to the file extension.")
+@click.option("--expense-sign", type=click.Choice(EXPENSE_SIGNS), default="negative", show_default=True,
+              help="Sign of the amounts that are expenses; others are skipped.")
+@click.option("--date-format", default=None, help="strptime format for non-ISO dates, e.g. %d/%m/%Y.")
+@click.option("--encoding", default="utf-8-sig", show_default=True)
+@click.option("--batch-size", type=int, default=None, help="Expenses per insert and transaction.")
+def import_expenses_command(path, user_id, statement_format, expense_sign, date_format, encoding, batch_size):
+    """Stream a CSV, OFX or QIF bank statement into a user's expenses."""
+    statement_format = statement_format or path.rpartition(".")[2].lower()
+    if statement_format not in FORMATS:
+        raise click.UsageError(f"Cannot tell the format of {path}; pass --format.")
+
+    with open(path, encoding=encoding, errors="replace", newline="") as stream:
+        try:
+            records, parse_date = open_statement(stream, statement_format, date_format)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        events = run_import(
+            db.session, user_id, records, parse_date,
+            batch_size=batch_size or current_app.config.get("EXPENSES_IMPORT_BATCH_SIZE", 1000),
+            expense_sign=expense_sign
+        )
+        for event in events:
+            summary = (f"processed {event['processed']}, imported {event['imported']}, "
+                       f"skipped {event['skipped']}, failed {event['failed']}")
+            if event["event"] == "progress":
+                click.echo(f"Progress: {summary}")
+                continue
+            for error in event["errors"]:
+                click.echo(f"Record {error['record']}: {error['error']}", err=True)
+            if event["event"] == "error":
+                raise click.ClickException(f"{event['error']} ({summary})")
+            click.echo(f"Done: {summary}")
+
+@expenses_cli.command("ensure-partitions")
+@click.option("--ahead", type=int, default=None, help="Periods past the current one to create partitions for.")
+@click.option("--interval", type=click.Choice(INTERVALS), default=None, help="Partition size; must match the existing partitions.")
+def ensure_partitions_command(ahead, interval):
+    """Create upcoming expenses partitions (Postgres). Run daily, e.g. from cron."""
+    ahead = ahead if ahead is not None else current_app.config.get("EXPENSES_PARTITIONS_AHEAD", 3)
+    interval = interval or current_app.config.get("EXPENSES_PARTITION_INTERVAL", "month")
+    with db.engine.begin() as connection:
+        if not is_partitioned(connection):
+            click.echo("The expenses table is not partitioned; nothing to do.")
+            return
+        created = ensure_partitions(connection, interval, ahead)
+    click.echo(f"Created partitions: {', '.join(created)}." if created else "All partitions already exist.")
+
+
+idempotency_cli = AppGroup("idempotency", help="Maintain stored Idempotency-Key responses.")
+
+@idempotency_cli.command("purge")
+def purge_idempotency_keys_command():
+    """Delete expired idempotency_keys rows (the shared cache expires its own)."""
+    with db.engine.begin() as connection:
+        row_count = purge_expired(connection)
+    click.echo(f"Deleted {row_count} expired idempotency keys.")
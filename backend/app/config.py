@@ -3,6 +3,16 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _replica_binds(protocol, user, password, hosts, port, name):
+    """SQLALCHEMY_BINDS entries for comma-separated replica host[:port]s sharing the primary's credentials and database."""
+    binds = {}
+    if not all((user, password, port, name)):
+        return binds
+    for index, host in enumerate(part.strip() for part in (hosts or "").split(",") if part.strip()):
+        address = host if ":" in host else f"{host}:{port}"
+        binds[f"replica_{index}"] = f"{protocol}://{user}:{password}@{address}/{name}"
+    return binds
+
 class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv('APP_SECRET_KEY')
@@ -21,6 +31,16 @@ class Config:
         f"{CACHE_PROTOCOL}://{CACHE_USER}:{CACHE_PASS}@{CACHE_HOST}:{CACHE_PORT}"
         if all((CACHE_USER, CACHE_PASS, CACHE_HOST, CACHE_PORT)) else None
     )
+    # Whether app-level caches may use the shared (Redis) tier in addition to process-local memory
+    SHARED_CACHE_ENABLED = os.getenv("SHARED_CACHE_ENABLED", "true").lower() == "true"
+
+    # Verified-token cache
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 1024))
+
+    # auth0_subject -> user id identity map
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+    IDENTITY_CACHE_LOCAL_TTL = int(os.getenv("IDENTITY_CACHE_LOCAL_TTL", 300))
+    IDENTITY_CACHE_TIMEOUT = int(os.getenv("IDENTITY_CACHE_TIMEOUT", 86400))
 
     # SQLAlchemy URI
     DB_PROTOCOL = os.getenv("DB_PROTOCOL")
@@ -34,19 +54,108 @@ class Config:
         if all((DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME)) else None
     )
 
+    # Read replicas: GET endpoints read from one of these unless it lags the primary by more than
+    # REPLICA_MAX_LAG seconds (checked every REPLICA_LAG_CHECK_INTERVAL). A user who wrote reads from the
+    # primary for REPLICA_READ_YOUR_WRITES_WINDOW seconds, which must be at least REPLICA_MAX_LAG.
+    DB_REPLICA_HOSTS = os.getenv("DB_REPLICA_HOSTS")
+    SQLALCHEMY_BINDS = _replica_binds(DB_PROTOCOL, DB_USER, DB_PASS, DB_REPLICA_HOSTS, DB_PORT, DB_NAME)
+    REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", 5))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", 5))
+    REPLICA_READ_YOUR_WRITES_WINDOW = int(os.getenv("REPLICA_READ_YOUR_WRITES_WINDOW", 10))
+
+    # ASGI entry point (asgi.py): the async read routes connect to ASYNC_DATABASE_URI, or to the primary's
+    # URI with an asyncio driver; every other route runs on ASGI_WSGI_THREADS threads
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URI")
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", 10))
+
+    # Expense listing
+    EXPENSES_PAGE_SIZE_DEFAULT = int(os.getenv("EXPENSES_PAGE_SIZE_DEFAULT", 50))
+    EXPENSES_PAGE_SIZE_MAX = int(os.getenv("EXPENSES_PAGE_SIZE_MAX", 500))
+    # Most expenses accepted by one /bulk_create request
+    EXPENSES_BULK_MAX_ITEMS = int(os.getenv("EXPENSES_BULK_MAX_ITEMS", 500))
+    # Most ids accepted by one /get_by_ids request
+    EXPENSES_BATCH_MAX_IDS = int(os.getenv("EXPENSES_BATCH_MAX_IDS", 100))
+    # Deepest page offset /search will serve; relevance-ordered pages cannot use a keyset cursor
+    EXPENSES_SEARCH_MAX_OFFSET = int(os.getenv("EXPENSES_SEARCH_MAX_OFFSET", 1000))
+    # Rows fetched per server-side cursor batch when streaming an export
+    EXPENSES_EXPORT_BATCH_SIZE = int(os.getenv("EXPENSES_EXPORT_BATCH_SIZE", 1000))
+    # Expenses written per bulk insert and transaction by statement imports
+    EXPENSES_IMPORT_BATCH_SIZE = int(os.getenv("EXPENSES_IMPORT_BATCH_SIZE", 1000))
+    # Postgres range partitioning of expenses by date: partition size (month or year), and how many
+    # periods past the current one `flask expenses ensure-partitions` keeps created
+    EXPENSES_PARTITION_INTERVAL = os.getenv("EXPENSES_PARTITION_INTERVAL", "month")
+    EXPENSES_PARTITIONS_AHEAD = int(os.getenv("EXPENSES_PARTITIONS_AHEAD", 3))
+    # Lifetime of cached expense reads; writes invalidate them sooner through the per-user data version
+    EXPENSES_CACHE_TIMEOUT = int(os.getenv("EXPENSES_CACHE_TIMEOUT", 300))
+
+    # Idempotency-Key handling for expense writes: stored responses live for IDEMPOTENCY_KEY_TTL seconds,
+    # a request holds its key for at most IDEMPOTENCY_LOCK_TIMEOUT, and a concurrent duplicate waits up to
+    # IDEMPOTENCY_WAIT_TIMEOUT for it before getting a 409
+    IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 86400))
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 30))
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 10))
+
+    # Prometheus metrics at METRICS_PATH; scrapes must send METRICS_AUTH_TOKEN as a Bearer token, and
+    # without a token the endpoint is only served in debug or testing
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+    METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN")
+
+    # Per-request SQL profiling (Server-Timing header, a log line per request, and a warning when one
+    # statement shape runs SQL_PROFILING_REPEAT_THRESHOLD times in a request). Off by default
+    SQL_PROFILING_ENABLED = os.getenv("SQL_PROFILING_ENABLED", "false").lower() == "true"
+    SQL_PROFILING_REPEAT_THRESHOLD = int(os.getenv("SQL_PROFILING_REPEAT_THRESHOLD", 5))
+
     # Auth0
     AUTH0_CLIENT_ID = os.getenv('AUTH0_CLIENT_ID')
     AUTH0_CLIENT_SECRET = os.getenv('AUTH0_CLIENT_SECRET')
     AUTH0_DOMAIN = os.getenv('AUTH0_DOMAIN')
     AUTH0_API_AUDIENCE = os.getenv('AUTH0_API_AUDIENCE')
+    # Optional override of https://{AUTH0_DOMAIN}/.well-known/jwks.json
+    AUTH0_JWKS_URL = os.getenv("AUTH0_JWKS_URL")
+
+    # JWKS provider: key sets are refreshed in the background after JWKS_REFRESH_INTERVAL seconds,
+    # failed fetches are retried after JWKS_RETRY_INTERVAL while the last good key set keeps being served
+    JWKS_REFRESH_INTERVAL = int(os.getenv("JWKS_REFRESH_INTERVAL", 600))
+    JWKS_RETRY_INTERVAL = int(os.getenv("JWKS_RETRY_INTERVAL", 30))
+    JWKS_FETCH_TIMEOUT = int(os.getenv("JWKS_FETCH_TIMEOUT", 10))
+    # Minimum seconds between JWKS refreshes triggered by tokens with an unknown kid
+    JWKS_MIN_REFRESH_INTERVAL = int(os.getenv("JWKS_MIN_REFRESH_INTERVAL", 60))
 
 class TestingConfig:
     DEBUG = True
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    REPLICA_MAX_LAG = 5
+    REPLICA_LAG_CHECK_INTERVAL = 5
+    REPLICA_READ_YOUR_WRITES_WINDOW = 10
+    ASYNC_DATABASE_URI = None
+    ASGI_WSGI_THREADS = 4
     SERVER_NAME = "localhost"
     CACHE_TYPE = 'SimpleCache'
     CACHE_DEFAULT_TIMEOUT = 300
+    AUTH_TOKEN_CACHE_SIZE = 1024
+    IDENTITY_CACHE_SIZE = 10000
+    IDENTITY_CACHE_LOCAL_TTL = 300
+    IDENTITY_CACHE_TIMEOUT = 86400
+    EXPENSES_PAGE_SIZE_DEFAULT = 50
+    EXPENSES_PAGE_SIZE_MAX = 500
+    EXPENSES_BATCH_MAX_IDS = 5
+    EXPENSES_BULK_MAX_ITEMS = 5
+    EXPENSES_SEARCH_MAX_OFFSET = 1000
+    EXPENSES_EXPORT_BATCH_SIZE = 2
+    EXPENSES_IMPORT_BATCH_SIZE = 2
+    EXPENSES_CACHE_TIMEOUT = 300
+    EXPENSES_PARTITION_INTERVAL = "month"
+    EXPENSES_PARTITIONS_AHEAD = 3
+    IDEMPOTENCY_KEY_TTL = 86400
+    IDEMPOTENCY_LOCK_TIMEOUT = 30
+    IDEMPOTENCY_WAIT_TIMEOUT = 0.3
+    METRICS_ENABLED = True
+    METRICS_PATH = "/metrics"
+    METRICS_AUTH_TOKEN = None
+    SQL_PROFILING_ENABLED = False
+    SQL_PROFILING_REPEAT_THRESHOLD = 5
     ALGORITHMS = ["RS256"]
     SECRET_KEY = 'test_secretkey'
     AUTH0_DOMAIN = "testing.auth0.com"
@@ -54,4 +163,8 @@ class TestingConfig:
     AUTH0_CLIENT_SECRET = "test_client_secret"
     AUTH0_API_AUDIENCE = "test-api-audience"
     KID = "test-kid-123"
+    JWKS_REFRESH_INTERVAL = 600
+    JWKS_RETRY_INTERVAL = 30
+    JWKS_FETCH_TIMEOUT = 2
+    JWKS_MIN_REFRESH_INTERVAL = 60
     WTF_CSRF_ENABLED = False
@@ -0,0 +1,144 @@
+import functools
+import hashlib
+import random
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event, text
+
+from .caching import LRUCache, shared_get, shared_set
+from .db_session import REPLICA_ENVIRON_KEY, RoutingSession
+from .extensions import db
+
+# Replicas are the SQLALCHEMY_BINDS entries named replica, replica_1, replica_eu, ...
+REPLICA_BIND_PREFIX = "replica"
+
+PIN_KEY = "db:primary_pin:{digest}"
+
+# Seconds the replica is behind the primary; 0 when it is caught up or is not a standby at all
+_LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+
+def replica_lag(engine):
+    """Replication lag of a replica in seconds. Dialects without a lag query report 0."""
+    query = _LAG_QUERIES.get(engine.dialect.name)
+    if query is None:
+        return 0.0
+    with engine.connect() as connection:
+        lag = connection.execute(text(query)).scalar()
+    return float(lag or 0)
+
+class ReplicaMonitor:
+    """
+    Process-local view of which replicas may serve reads: a replica whose lag exceeds REPLICA_MAX_LAG,
+    or that cannot be reached, is skipped until its next check, REPLICA_LAG_CHECK_INTERVAL seconds later.
+    """
+
+    def __init__(self):
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def usable(self, key, engine):
+        now = time.monotonic()
+        with self._lock:
+            checked = self._checked.get(key)
+            if checked is not None and checked[0] > now:
+                return checked[1]
+            # Claim the next check before running it, so one request per interval pays for it
+            self._checked[key] = (now + current_app.config.get("REPLICA_LAG_CHECK_INTERVAL", 5),
+                                  checked[1] if checked else False)
+
+        max_lag = current_app.config.get("REPLICA_MAX_LAG", 5)
+        try:
+            lag = replica_lag(engine)
+            ok = lag <= max_lag
+            if not ok:
+                current_app.logger.warning(f"Replica '{key}' is {lag:.1f}s behind (max {max_lag}s); reading from the primary.")
+        except Exception as e:
+            ok = False
+            current_app.logger.warning(f"Replica '{key}' is unavailable; reading from the primary: {e}")
+
+        with self._lock:
+            self._checked[key] = (self._checked.get(key, (0,))[0], ok)
+        return ok
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+replica_monitor = ReplicaMonitor()
+
+# --- Read-your-writes ---
+# A user who just wrote reads from the primary for REPLICA_READ_YOUR_WRITES_WINDOW seconds, so a lagging
+# replica never hides their own write from them (or seeds the read cache with the pre-write data)
+_local_pins = LRUCache(maxsize=10000)
+
+def _pin_key(subject):
+    return PIN_KEY.format(digest=hashlib.sha256(subject.encode("utf-8")).hexdigest()[:32])
+
+def pin_to_primary(subject):
+    window = current_app.config.get("REPLICA_READ_YOUR_WRITES_WINDOW", 10)
+    key = _pin_key(subject)
+    _local_pins.set(key, True, expires_at=time.time() + window)
+    shared_set(key, 1, timeout=window)
+
+def is_pinned_to_primary(subject):
+    key = _pin_key(subject)
+    return bool(_local_pins.get(key) or shared_get(key))
+
+def reset_replica_state():
+    """Forgets lag checks and local read-your-writes pins (tests)."""
+    replica_monitor.reset()
+    _local_pins.clear()
+
+def _current_subject():
+    user = g.get("current_user") if has_request_context() else None
+    return user.get("sub") if user else None
+
+@event.listens_for(RoutingSession, "after_commit")
+def _pin_writer(session):
+    if session.info.pop("wrote", False):
+        subject = _current_subject()
+        if subject:
+            pin_to_primary(subject)
+        # The rest of this request reads its own write from the primary too
+        if has_request_context():
+            request.environ.pop(REPLICA_ENVIRON_KEY, None)
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+# --- Request routing ---
+def replica_bind_keys():
+    return [key for key in db.engines if key and key.startswith(REPLICA_BIND_PREFIX)]
+
+def choose_replica(keys):
+    """A usable replica engine from `keys`, at random, or None to read from the primary."""
+    keys = list(keys)
+    random.shuffle(keys)
+    for key in keys:
+        engine = db.engines[key]
+        if replica_monitor.usable(key, engine):
+            return engine
+    return None
+
+def reads_from_replica(view):
+    """
+    Lets a read-only endpoint run its SELECTs on a read replica, unless the user wrote within the
+    read-your-writes window or no replica is usable. The choice holds for the whole request.
+    Place below @requires_auth.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        keys = replica_bind_keys()
+        subject = _current_subject()
+        if keys and subject and not is_pinned_to_primary(subject):
+            request.environ[REPLICA_ENVIRON_KEY] = choose_replica(keys)
+        return view(*args, **kwargs)
+
+    return wrapper
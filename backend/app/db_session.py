@@ -0,0 +1,35 @@
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+# Where the current request's replica engine is kept: the WSGI environ lives exactly as long as the
+# request, while g lives as long as the app context, which can outlive it
+REPLICA_ENVIRON_KEY = "fintrack.db_replica"
+
+def _is_plain_read(clause):
+    # SELECT ... FOR UPDATE takes row locks, which only the primary can
+    return getattr(clause, "is_select", False) and getattr(clause, "_for_update_arg", None) is None
+
+class RoutingSession(Session):
+    """
+    db.session class that sends plain SELECTs to the read replica chosen for the request
+    (by db_routing.reads_from_replica) and everything else to the primary.
+
+    Once the current transaction has written, its remaining reads stay on the primary so they see the
+    write (db_routing clears the mark when the transaction ends). Without a replica for the request
+    this is Flask-SQLAlchemy's session, unchanged.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+            return engine
+
+        replica = request.environ.get(REPLICA_ENVIRON_KEY) if has_request_context() else None
+        if (replica is not None and not self.info.get("wrote") and engine is self._db.engines.get(None)
+                and _is_plain_read(clause)):
+            return replica
+        return engine
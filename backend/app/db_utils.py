@@ -0,0 +1,18 @@
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+    "mysql": mysql.insert,
+    "mariadb": mysql.insert,
+}
+
+def dialect_insert(dialect_name, table):
+    """Returns the dialect-specific insert() construct, which exposes that dialect's upsert clause."""
+    try:
+        return UPSERT_DIALECTS[dialect_name](table)
+    except KeyError:
+        raise NotImplementedError(f"Upserts are not supported for the '{dialect_name}' dialect.")
+
+def is_mysql(dialect_name):
+    return dialect_name in ("mysql", "mariadb")
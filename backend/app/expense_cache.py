@@ -0,0 +1,94 @@
+import hashlib
+import json
+import time
+import zlib
+from flask import current_app
+
+from .caching import shared_add, shared_get, shared_inc, shared_set
+from .metrics import record_cache_lookup
+
+# Versions never expire on their own; eviction is handled by re-seeding (see _seed_version)
+VERSION_KEY = "expenses:version:{user_id}"
+
+def _seed_version():
+    # Millisecond clock seed: a version re-created after eviction is still newer than any it replaces,
+    # so entries cached under an old version can never be served again
+    return int(time.time() * 1000)
+
+def data_version(user_id):
+    """
+    Current version of a user's expense data, or None when the shared cache is unavailable.
+    Every write bumps it, so anything keyed on it is invalidated by the write.
+    """
+    key = VERSION_KEY.format(user_id=user_id)
+    version = shared_get(key)
+    if version is None:
+        shared_add(key, _seed_version(), timeout=0)
+        version = shared_get(key)
+    return version
+
+def bump_data_version(user_id):
+    """Invalidates every cached read of a user's expenses. Call after a write has committed."""
+    key = VERSION_KEY.format(user_id=user_id)
+    if shared_add(key, _seed_version(), timeout=0):
+        return
+    if shared_inc(key) is None:
+        current_app.logger.warning(f"Could not bump expense data version for user {user_id}.")
+
+def params_digest(params):
+    """Stable digest of normalized request parameters."""
+    canonical = json.dumps(sorted(params.items()), default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+def cache_key(user_id, namespace, params):
+    """Cache key for a per-user read, bound to the user's data version; None if caching is unavailable."""
+    version = data_version(user_id)
+    if version is None:
+        return None
+    return f"expenses:{namespace}:{user_id}:{version}:{params_digest(params)}"
+
+def etag(user_id, namespace, params):
+    """
+    Validator for a per-user read: changes whenever the user's data version does, so a matching
+    If-None-Match can be answered without querying. None if the shared cache is unavailable.
+    """
+    version = data_version(user_id)
+    if version is None:
+        return None
+    return f"{version}-{params_digest(dict(params, namespace=namespace))}"
+
+# Cached bodies are stored as a one-byte marker followed by the (possibly zlib-compressed) UTF-8 body.
+# JSON listings compress several-fold; tiny bodies are not worth the CPU.
+_RAW, _ZLIB = b"r", b"z"
+COMPRESS_MIN_BYTES = 512
+
+def _pack(body):
+    data = body.encode("utf-8")
+    if len(data) < COMPRESS_MIN_BYTES:
+        return _RAW + data
+    return _ZLIB + zlib.compress(data, 6)
+
+def _unpack(payload):
+    if not isinstance(payload, bytes) or not payload:
+        return None
+    try:
+        if payload[:1] == _ZLIB:
+            return zlib.decompress(payload[1:]).decode("utf-8")
+        if payload[:1] == _RAW:
+            return payload[1:].decode("utf-8")
+    except (zlib.error, UnicodeDecodeError):
+        pass
+    return None
+
+def get_cached(key, namespace):
+    """Cached response body for `key`, or None. Lookups are counted in metrics under `expenses_<namespace>`."""
+    if not key:
+        return None
+    # Anything unreadable (e.g. an entry written in an older format) counts as a miss and is overwritten
+    body = _unpack(shared_get(key))
+    record_cache_lookup(f"expenses_{namespace}", body is not None)
+    return body
+
+def set_cached(key, body):
+    if key:
+        shared_set(key, _pack(body), timeout=current_app.config.get("EXPENSES_CACHE_TIMEOUT", 300))
@@ -0,0 +1,290 @@
+import datetime
+import json
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+from sqlalchemy import and_, func, or_, select
+
+from models.expense import Expense
+
+# Fields a client may request through ?fields=, in the order Expense.to_dict emits them
+EXPENSE_FIELDS = ("id", "user_id", "date", "description", "amount", "category", "created_at")
+_COLUMNS = {name: Expense.__table__.c[name] for name in EXPENSE_FIELDS}
+
+# Keyset pagination needs these on every row, whether or not the client asked for them
+_CURSOR_FIELDS = ("date", "id")
+
+# Single shared encoder: every value reaching it is already a JSON primitive, so no default() hook is needed
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def parse_fields(value):
+    """Parses a comma-separated `fields` parameter into a tuple of known field names (all fields if empty)."""
+    if not value:
+        return EXPENSE_FIELDS
+    requested = [name.strip() for name in value.split(",") if name.strip()]
+    if not requested:
+        raise ValueError(f"No fields requested. Allowed fields: {', '.join(EXPENSE_FIELDS)}.")
+    unknown = [name for name in requested if name not in _COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed fields: {', '.join(EXPENSE_FIELDS)}.")
+    # Keep canonical order and drop duplicates
+    return tuple(name for name in EXPENSE_FIELDS if name in requested)
+
+def select_expense_rows(fields):
+    """
+    Core select of only the requested columns (plus cursor columns) as plain rows.
+    The selected column order is `fields` followed by any missing cursor fields.
+    """
+    extra = tuple(name for name in _CURSOR_FIELDS if name not in fields)
+    return select(*(_COLUMNS[name] for name in fields + extra))
+
+def keyset_after(after):
+    """WHERE clause continuing a (date DESC, id DESC) listing after the cursor row."""
+    after_date, after_id = after
+    # The redundant upper bound lets Postgres prune date partitions, which it cannot do through the OR
+    return and_(
+        Expense.date <= after_date,
+        or_(Expense.date < after_date, and_(Expense.date == after_date, Expense.id < after_id)),
+    )
+
+def row_position(fields, name):
+    """Index of `name` in rows produced by select_expense_rows(fields)."""
+    extra = tuple(n for n in _CURSOR_FIELDS if n not in fields)
+    return (fields + extra).index(name)
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+def _decimal(value):
+    # Matches Flask's JSON provider, which renders Decimal as a string
+    return str(value) if value is not None else None
+
+_CONVERTERS = {
+    "date": _iso,
+    "created_at": _iso,
+    "amount": _decimal,
+}
+
+@lru_cache(maxsize=128)
+def row_serializer(fields):
+    """
+    Compiles a row -> dict function for a field tuple, once per distinct fieldset.
+    Output matches Expense.to_dict() as rendered by jsonify, without ORM hydration.
+    """
+    steps = tuple((name, index, _CONVERTERS.get(name)) for index, name in enumerate(fields))
+
+    def serialize(row):
+        return {name: convert(row[index]) if convert else row[index] for name, index, convert in steps}
+
+    return serialize
+
+def dumps(obj):
+    return _encoder.encode(obj)
+
+# Largest id a BIGINT (and SQLite's INTEGER) can hold; anything above cannot be bound as a parameter
+MAX_ID = 2 ** 63 - 1
+
+def parse_ids(values, maximum):
+    """Parses repeated and/or comma-separated `ids` values into a list of positive ints, in request order."""
+    ids = []
+    for value in values:
+        for part in value.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            # isdigit() alone also accepts non-ASCII digits such as "²", which int() rejects
+            if not (part.isascii() and part.isdigit()) or not 0 < int(part) <= MAX_ID:
+                raise ValueError(f"Invalid id: {part}. Ids must be positive integers.")
+            ids.append(int(part))
+    if not ids:
+        raise ValueError("At least one id must be given.")
+    if len(ids) > maximum:
+        raise ValueError(f"At most {maximum} ids may be requested at once.")
+    return ids
+
+
+# --- Filtering ---
+MAX_CATEGORIES = 50
+
+def _parse_datetime(name, value):
+    """Returns (datetime, is_date_only). Accepts ISO 8601 dates or datetimes."""
+    try:
+        if len(value) == 10:
+            return datetime.datetime.combine(datetime.date.fromisoformat(value), datetime.time()), True
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or datetime.")
+    if parsed.tzinfo is not None:
+        # Dates are stored as naive UTC
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed, False
+
+def _parse_amount(name, value):
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"{name} must be a number.")
+    if not amount.is_finite():
+        raise ValueError(f"{name} must be a number.")
+    return amount
+
+def parse_date_hint(value, table=Expense.__table__):
+    """
+    Conditions for an optional `date` hint (the expense's ISO date or datetime) on lookups by id.
+    The id alone already identifies the expense; the day range lets Postgres scan only its date partition.
+    """
+    if not value:
+        return []
+    day = _parse_datetime("date", value)[0].replace(hour=0, minute=0, second=0, microsecond=0)
+    return [table.c.date >= day, table.c.date < day + datetime.timedelta(days=1)]
+
+def parse_expense_filters(args):
+    """
+    Validates filter query parameters into a normalized dict (only filters that were given).
+
+    - date_from / date_to: ISO dates or datetimes; a date-only date_to includes that whole day
+    - category: repeated (?category=a&category=b) and/or comma-separated
+    - amount_min / amount_max: inclusive bounds
+    - q: case-insensitive substring of the description
+    """
+    filters = {}
+
+    for name in ("date_from", "date_to"):
+        value = args.get(name)
+        if value:
+            parsed, date_only = _parse_datetime(name, value)
+            if name == "date_to" and date_only:
+                filters["date_before"] = parsed + datetime.timedelta(days=1)
+            else:
+                filters[name] = parsed
+
+    categories = []
+    for value in args.getlist("category"):
+        categories.extend(part.strip() for part in value.split(",") if part.strip())
+    if categories:
+        if len(categories) > MAX_CATEGORIES:
+            raise ValueError(f"At most {MAX_CATEGORIES} categories may be given.")
+        filters["category"] = tuple(sorted(set(categories)))
+
+    for name in ("amount_min", "amount_max"):
+        value = args.get(name)
+        if value:
+            filters[name] = _parse_amount(name, value)
+
+    q = args.get("q", "").strip()
+    if q:
+        if len(q) > 200:
+            raise ValueError("q must be at most 200 characters.")
+        filters["q"] = q
+
+    lower = filters.get("date_from")
+    upper = filters.get("date_to") or filters.get("date_before")
+    if lower and upper and lower > upper:
+        raise ValueError("date_from must not be after date_to.")
+    if "amount_min" in filters and "amount_max" in filters and filters["amount_min"] > filters["amount_max"]:
+        raise ValueError("amount_min must not be greater than amount_max.")
+
+    return filters
+
+def escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def filter_clauses(filters, table=Expense.__table__):
+    """
+    SQL conditions for a normalized filter dict, ANDed with the user_id condition by the caller.
+    Served by ix_expenses_user_id_date_id, ix_expenses_user_id_category_date, ix_expenses_user_id_amount
+    and, on Postgres, the trigram index on description.
+    """
+    c = table.c
+    clauses = []
+    if "date_from" in filters:
+        clauses.append(c.date >= filters["date_from"])
+    if "date_to" in filters:
+        clauses.append(c.date <= filters["date_to"])
+    if "date_before" in filters:
+        clauses.append(c.date < filters["date_before"])
+    if "category" in filters:
+        clauses.append(c.category.in_(filters["category"]))
+    if "amount_min" in filters:
+        clauses.append(c.amount >= filters["amount_min"])
+    if "amount_max" in filters:
+        clauses.append(c.amount <= filters["amount_max"])
+    if "q" in filters:
+        clauses.append(c.description.ilike(f"%{escape_like(filters['q'])}%", escape="\\"))
+    return clauses
+
+
+# --- Aggregation ---
+PERIODS = ("day", "week", "month", "year")
+_CENTS = Decimal("0.01")
+
+def parse_group_by(value):
+    """Parses `group_by` into (period or None, by_category). At most one period may be given."""
+    parts = [part.strip().lower() for part in (value or "").split(",") if part.strip()]
+    unknown = [part for part in parts if part not in PERIODS and part != "category"]
+    if unknown:
+        raise ValueError(f"Unknown group_by value(s): {', '.join(unknown)}. Use any of: {', '.join(PERIODS)}, category.")
+    periods = [part for part in parts if part in PERIODS]
+    if len(periods) > 1:
+        raise ValueError("group_by may contain at most one period.")
+    return (periods[0] if periods else None), ("category" in parts)
+
+def period_start(dialect_name, period, column):
+    """
+    First day of the day/week/month/year containing `column`, as a 'YYYY-MM-DD' string.
+    Weeks start on Monday on every dialect.
+    """
+    if dialect_name == "postgresql":
+        return func.to_char(func.date_trunc(period, column), "YYYY-MM-DD")
+
+    if dialect_name in ("mysql", "mariadb"):
+        if period == "week":
+            return func.date_format(func.subdate(column, func.weekday(column)), "%Y-%m-%d")
+        return func.date_format(column, {"day": "%Y-%m-%d", "month": "%Y-%m-01", "year": "%Y-01-01"}[period])
+
+    if dialect_name == "sqlite":
+        if period == "week":
+            # Step back six days, then forward to the next Monday (a Monday stays put)
+            return func.date(column, "-6 days", "weekday 1")
+        return func.strftime({"day": "%Y-%m-%d", "month": "%Y-%m-01", "year": "%Y-01-01"}[period], column)
+
+    raise NotImplementedError(f"Period grouping is not supported for the '{dialect_name}' dialect.")
+
+def build_aggregate_query(dialect_name, user_id, period, by_category, filters):
+    """SUM/COUNT/AVG of a user's expenses, grouped by period and/or category, computed in the database."""
+    table = Expense.__table__
+    group_columns = []
+    if period:
+        group_columns.append(period_start(dialect_name, period, table.c.date).label("period"))
+    if by_category:
+        group_columns.append(table.c.category.label("category"))
+
+    stmt = select(
+        *group_columns,
+        func.sum(table.c.amount).label("total"),
+        func.count().label("count"),
+        func.avg(table.c.amount).label("average"),
+    ).where(table.c.user_id == user_id, *filter_clauses(filters))
+
+    # Group and order by label so the (possibly parameterized) period expression is rendered once
+    labels = [column.name for column in group_columns]
+    if labels:
+        stmt = stmt.group_by(*labels).order_by(*labels)
+    return stmt
+
+def _money(value):
+    # Dialects disagree on SUM/AVG precision (SQLite works in floats); report cents everywhere
+    return str(Decimal(str(value)).quantize(_CENTS, rounding=ROUND_HALF_UP)) if value is not None else None
+
+def serialize_aggregate_rows(rows, period, by_category):
+    results = []
+    for row in rows:
+        item = {}
+        if period:
+            item["period"] = row.period
+        if by_category:
+            item["category"] = row.category
+        item["total"] = _money(row.total) if row.count else "0.00"
+        item["count"] = row.count
+        item["average"] = _money(row.average)
+        results.append(item)
+    return results
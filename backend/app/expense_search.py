@@ -0,0 +1,100 @@
+import re
+from sqlalchemy import DDL, and_, event, func, literal, literal_column, or_, table, column
+
+from models.expense import Expense
+from .expense_queries import escape_like, select_expense_rows
+
+expenses = Expense.__table__
+
+MAX_TERMS = 8
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+# --- Index DDL ---
+# The text index lives outside the ORM model: Postgres keeps a generated tsvector column with a GIN index,
+# SQLite an external-content FTS5 table kept in step by triggers. Migrations create them in deployed
+# databases; these hooks do the same for metadata.create_all() (tests and local SQLite).
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '')), 'B')"
+)
+
+_PG_CREATE = [
+    f"ALTER TABLE expenses ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({PG_SEARCH_VECTOR}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_expenses_search_vector ON expenses USING gin (search_vector)",
+]
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5("
+    "description, category, content='expenses', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_ai AFTER INSERT ON expenses BEGIN "
+    "INSERT INTO expenses_fts(rowid, description, category) VALUES (new.id, new.description, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_ad AFTER DELETE ON expenses BEGIN "
+    "INSERT INTO expenses_fts(expenses_fts, rowid, description, category) "
+    "VALUES ('delete', old.id, old.description, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_au AFTER UPDATE OF description, category ON expenses BEGIN "
+    "INSERT INTO expenses_fts(expenses_fts, rowid, description, category) "
+    "VALUES ('delete', old.id, old.description, old.category); "
+    "INSERT INTO expenses_fts(rowid, description, category) VALUES (new.id, new.description, new.category); END",
+]
+
+for _statement in _PG_CREATE:
+    event.listen(expenses, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_CREATE:
+    event.listen(expenses, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+# Triggers go with the expenses table; the FTS table has to be dropped explicitly
+event.listen(expenses, "before_drop", DDL("DROP TABLE IF EXISTS expenses_fts").execute_if(dialect="sqlite"))
+
+# --- Querying ---
+def parse_search_terms(value):
+    """Splits a search string into at most MAX_TERMS lower-cased word terms; each is matched as a prefix."""
+    terms = _TERM.findall((value or "").lower())
+    if not terms:
+        raise ValueError("q must contain at least one word.")
+    if len(terms) > MAX_TERMS:
+        raise ValueError(f"q may contain at most {MAX_TERMS} words.")
+    return tuple(dict.fromkeys(term[:50] for term in terms))
+
+def _postgresql_match(terms):
+    # Terms are plain word characters, so they cannot smuggle tsquery operators in
+    query = func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{term}:*" for term in terms))
+    vector = literal_column("expenses.search_vector")
+    return None, vector.op("@@")(query), func.ts_rank_cd(vector, query)
+
+_fts = table("expenses_fts", column("rowid"))
+
+def _sqlite_match(terms):
+    # Quoted terms with a trailing * are prefix queries; adjacent terms are ANDed
+    query = " ".join(f'"{term}"*' for term in terms)
+    fts = literal_column("expenses_fts")
+    # bm25() is lower-is-better; description matches weigh double
+    return _fts, fts.op("MATCH")(query), -func.bm25(fts, 2.0, 1.0)
+
+def _fallback_match(terms):
+    # No text index on this dialect: every term must appear as a substring; results are unranked
+    clauses = [
+        or_(
+            expenses.c.description.ilike(f"%{escape_like(term)}%", escape="\\"),
+            expenses.c.category.ilike(f"%{escape_like(term)}%", escape="\\"),
+        )
+        for term in terms
+    ]
+    return None, and_(*clauses), literal(0)
+
+_MATCHERS = {
+    "postgresql": _postgresql_match,
+    "sqlite": _sqlite_match,
+}
+
+def build_search_query(dialect_name, user_id, terms, fields, clauses):
+    """
+    Ranked full-text search over a user's expense descriptions and categories. Rows are ordered by
+    relevance, then (date DESC, id DESC); `clauses` are extra filter conditions.
+    """
+    join_table, match, rank = _MATCHERS.get(dialect_name, _fallback_match)(terms)
+    stmt = select_expense_rows(fields)
+    if join_table is not None:
+        stmt = stmt.join_from(expenses, join_table, join_table.c.rowid == expenses.c.id)
+    return (
+        stmt.where(expenses.c.user_id == user_id, match, *clauses)
+        .order_by(rank.desc(), expenses.c.date.desc(), expenses.c.id.desc())
+    )
@@ -0,0 +1,173 @@
+import datetime
+from datetime import timezone
+from decimal import Decimal, InvalidOperation
+from typing import Callable, NamedTuple, Optional
+
+class ExpenseValidationError(ValueError):
+    """
+    str() is the single client-facing message (the first problem found, as before);
+    `errors` maps each offending field to its own message.
+    """
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or {}
+
+# --- Field parsers: value -> normalized column value, or ValueError with the client-facing message ---
+_AMOUNT_FORMAT = "Invalid amount format. Must be a number."
+_DATE_FORMAT = "Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ)."
+
+def _amount(value):
+    # Decimal(str(...)) only where it is needed: floats keep their shortest repr, e.g. 0.1 -> 0.1
+    value_type = type(value)
+    try:
+        if value_type is str:
+            amount = Decimal(value)
+        elif value_type is Decimal:
+            amount = value
+        elif value_type is int:
+            amount = Decimal(value)
+        elif value_type is float:
+            amount = Decimal(repr(value))
+        else:
+            raise ValueError(_AMOUNT_FORMAT)
+    except InvalidOperation:
+        raise ValueError(_AMOUNT_FORMAT)
+    if not amount.is_finite():
+        raise ValueError(_AMOUNT_FORMAT)
+    if amount <= 0:  # Assuming expenses must be positive
+        raise ValueError("Amount must be a positive number.")
+    return amount
+
+def _description(value):
+    if type(value) is not str or not (0 < len(value) <= 200):
+        raise ValueError("Description must be a string between 1 and 200 characters.")
+    return value
+
+def _date(value):
+    # fromisoformat accepts a trailing Z since Python 3.11
+    if type(value) is datetime.datetime:
+        return value
+    if type(value) is not str:
+        raise ValueError(_DATE_FORMAT)
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(_DATE_FORMAT)
+
+def _category(value):
+    if value and (type(value) is not str or len(value) > 50):
+        raise ValueError("Category, if provided, must be a string no longer than 50 characters.")
+    # An empty category is no category: stored as NULL, so it groups with uncategorized expenses everywhere
+    return value or None
+
+def _now():
+    return datetime.datetime.now(timezone.utc)
+
+# --- Schema ---
+class Field(NamedTuple):
+    name: str
+    parse: Callable
+    required: bool = False
+    # Called for the value when the field is absent (or empty, with blank_is_missing) on creation
+    default: Optional[Callable] = None
+    blank_is_missing: bool = False
+
+# Checked in this order, the original /create's, so the first problem found becomes the `error` message
+EXPENSE_SCHEMA = (
+    Field("amount", _amount, required=True),
+    Field("description", _description, required=True),
+    Field("date", _date, default=_now, blank_is_missing=True),
+    Field("category", _category, default=lambda: None),
+)
+# The order fields are named in messages, e.g. "Missing required fields: description, amount"
+EXPENSE_FIELD_ORDER = ("description", "amount", "category", "date")
+
+def compile_schema(schema, partial=False, field_order=None):
+    """
+    Compiles a field schema into a validator, once, so per-payload work is a loop over prebuilt steps.
+    The validator returns the normalized column values or raises ExpenseValidationError.
+
+    partial=False validates a new record: required fields must be present, absent ones get their defaults
+    and unknown keys are ignored. partial=True validates an update: only the fields given are checked,
+    unknown keys are rejected and at least one field must be given.
+
+    Fields are checked in schema order; `field_order`, if given, is the order they are named in messages.
+    """
+    names = tuple(field_order or (field.name for field in schema))
+    known = frozenset(names)
+    steps = tuple((field.name, field.parse, field.default, field.blank_is_missing, field.required) for field in schema)
+    unknown_message = f"Updatable fields: {', '.join(names)}."
+    empty_message = f"At least one of {', '.join(names)} must be given."
+
+    def fail(missing, errors):
+        if missing:
+            missing = sorted(missing, key=names.index)
+            errors = dict({name: "This field is required." for name in missing}, **(errors or {}))
+            raise ExpenseValidationError(f"Missing required fields: {', '.join(missing)}", errors)
+        raise ExpenseValidationError(next(iter(errors.values())), errors)
+
+    def validate_partial(data):
+        unknown = [name for name in data if name not in known]
+        if unknown:
+            raise ExpenseValidationError(f"Unknown field(s): {', '.join(unknown)}. {unknown_message}",
+                                         {name: "Unknown field." for name in unknown})
+        if not data:
+            raise ExpenseValidationError(empty_message)
+        values, errors = {}, None
+        for name, parse, _, _, _ in steps:
+            if name in data:
+                try:
+                    values[name] = parse(data[name])
+                except ValueError as e:
+                    errors = errors or {}
+                    errors[name] = str(e)
+        if errors:
+            fail(None, errors)
+        return values
+
+    # One pass over the payload: every field is looked up once and parsed at most once
+    def validate(data):
+        values, errors, missing = {}, None, None
+        for name, parse, default, blank_is_missing, required in steps:
+            if name in data:
+                value = data[name]
+                if blank_is_missing and not value:
+                    values[name] = default()
+                    continue
+                try:
+                    values[name] = parse(value)
+                except ValueError as e:
+                    errors = errors or {}
+                    errors[name] = str(e)
+            elif required:
+                missing = missing or []
+                missing.append(name)
+            elif default is not None:
+                values[name] = default()
+        if errors or missing:
+            fail(missing, errors)
+        return values
+
+    return validate_partial if partial else validate
+
+_required = {field.name for field in EXPENSE_SCHEMA if field.required}
+REQUIRED_FIELDS = tuple(name for name in EXPENSE_FIELD_ORDER if name in _required)
+UPDATABLE_FIELDS = EXPENSE_FIELD_ORDER
+
+_validate_new = compile_schema(EXPENSE_SCHEMA, field_order=EXPENSE_FIELD_ORDER)
+_validate_partial = compile_schema(EXPENSE_SCHEMA, partial=True, field_order=EXPENSE_FIELD_ORDER)
+
+def validate_expense_data(data):
+    """
+    Validates one expense payload, shared by /create, /bulk_create and statement imports.
+    Returns the column values for a new Expense; raises ExpenseValidationError.
+    """
+    return _validate_new(data)
+
+def validate_expense_update(data):
+    """
+    Validates a partial update: only the fields present are checked, by the same rules as creation.
+    A null category clears it. Returns the column values to set; raises ExpenseValidationError.
+    """
+    return _validate_partial(data)
@@ -0,0 +1,130 @@
+from sqlalchemy import and_, delete, insert, select, update
+
+from models.expense import Expense
+from .expense_queries import EXPENSE_FIELDS
+from .rollups import add_delta, apply_rollup_deltas, new_deltas
+
+expenses = Expense.__table__
+
+# Columns the daily rollups are keyed and summed on
+_ROLLUP_FIELDS = ("date", "category", "amount")
+
+def _returning(fields):
+    """`fields` followed by any rollup columns they lack, so rows serialize with row_serializer(fields)."""
+    return [expenses.c[name] for name in fields + tuple(n for n in _ROLLUP_FIELDS if n not in fields)]
+
+def insert_expenses(session, user_id, rows):
+    """
+    Inserts validated expense rows (see validate_expense_data) for one user in as few statements as the
+    dialect allows, inside the session's transaction. Returns the new ids in input order.
+
+    The caller commits, then calls bump_data_version.
+    """
+    if not rows:
+        return []
+    params = [dict(row, user_id=user_id) for row in rows]
+    dialect = session.get_bind().dialect
+
+    if not dialect.insert_executemany_returning_sort_by_parameter_order:
+        # No ordered multi-row RETURNING (MySQL): the ORM flush issues the inserts and fires the rollup listener
+        objects = [Expense(**values) for values in params]
+        session.add_all(objects)
+        session.flush()
+        return [obj.id for obj in objects]
+
+    # Core insert: rendered as multi-row INSERT ... VALUES (...), (...) RETURNING id batches.
+    # It bypasses the ORM flush, so the rollups are maintained here, in the same transaction.
+    if dialect.name == "sqlite":
+        # SQLite has no way to order RETURNING rows by parameter, and asking for it downgrades to one
+        # INSERT per row. Rowids are assigned in VALUES order, so sorting the ids restores input order.
+        ids = sorted(session.execute(insert(expenses).returning(expenses.c.id), params).scalars().all())
+    else:
+        stmt = insert(expenses).returning(expenses.c.id, sort_by_parameter_order=True)
+        ids = session.execute(stmt, params).scalars().all()
+
+    deltas = new_deltas()
+    for values in params:
+        add_delta(deltas, user_id, values["date"], values["category"], 1, values["amount"])
+    apply_rollup_deltas(session.connection(), deltas)
+    return ids
+
+def _rollup_values(returning, row):
+    names = [column.name for column in returning]
+    return tuple(row[names.index(name)] for name in _ROLLUP_FIELDS)
+
+def update_expense_row(session, user_id, expense_id, values, fields=EXPENSE_FIELDS, clauses=()):
+    """
+    Applies validated column `values` (see validate_expense_update) to one of the user's expenses and keeps
+    the rollups in step, inside the session's transaction. Returns the updated row, or None if the user
+    has no such expense (or it does not match the extra `clauses`). The caller commits, then calls
+    bump_data_version.
+
+    On Postgres this is one UPDATE ... FROM (locked snapshot) ... RETURNING statement that yields the new
+    and old values together. SQLite's RETURNING cannot see joined tables, so there (and on MySQL) the old
+    values are read first, and only when a rollup column changes.
+    """
+    owned = and_(expenses.c.id == expense_id, expenses.c.user_id == user_id, *clauses)
+    returning = _returning(fields)
+    dialect = session.get_bind().dialect
+
+    if not any(name in values for name in _ROLLUP_FIELDS) and dialect.update_returning:
+        return session.execute(update(expenses).where(owned).values(**values).returning(*returning)).first()
+
+    # Not dialect.update_returning_multifrom: SQLite claims it, but its RETURNING drops the table
+    # qualifier, so previous.amount would silently come back as the new amount
+    if dialect.name == "postgresql":
+        # FOR UPDATE makes the snapshot re-read the row if a concurrent write got there first
+        previous = select(*(expenses.c[name] for name in ("id",) + _ROLLUP_FIELDS)).where(owned).with_for_update()
+        previous = previous.subquery("previous")
+        stmt = (
+            # Matching the date too keeps the join to the row's own partition on a partitioned table
+            update(expenses).where(expenses.c.id == previous.c.id, expenses.c.date == previous.c.date).values(**values)
+            .returning(*returning, *(previous.c[name].label(f"old_{name}") for name in _ROLLUP_FIELDS))
+        )
+        result = session.execute(stmt).first()
+        if result is None:
+            return None
+        row, old_values = result[:len(returning)], result[len(returning):]
+    else:
+        old_values = session.execute(
+            select(*(expenses.c[name] for name in _ROLLUP_FIELDS)).where(owned).with_for_update()
+        ).first()
+        if old_values is None:
+            return None
+        if dialect.update_returning:
+            row = session.execute(update(expenses).where(owned).values(**values).returning(*returning)).first()
+        else:
+            session.execute(update(expenses).where(owned).values(**values))
+            row = session.execute(select(*returning).where(owned)).first()
+
+    deltas = new_deltas()
+    old_date, old_category, old_amount = old_values
+    add_delta(deltas, user_id, old_date, old_category, -1, old_amount)
+    date, category, amount = _rollup_values(returning, row)
+    add_delta(deltas, user_id, date, category, 1, amount)
+    apply_rollup_deltas(session.connection(), deltas)
+    return row
+
+def delete_expense_rows(session, user_id, clauses, fields=EXPENSE_FIELDS):
+    """
+    Deletes the user's expenses matching `clauses` with one ownership-scoped DELETE ... RETURNING and takes
+    them out of the rollups, inside the session's transaction. Returns the deleted rows.
+    The caller commits, then calls bump_data_version.
+    """
+    condition = and_(expenses.c.user_id == user_id, *clauses)
+    returning = _returning(fields)
+    dialect = session.get_bind().dialect
+
+    if dialect.delete_returning:
+        rows = session.execute(delete(expenses).where(condition).returning(*returning)).all()
+    else:
+        # No RETURNING (MySQL): lock and read the rows, then delete them
+        rows = session.execute(select(*returning).where(condition).with_for_update()).all()
+        session.execute(delete(expenses).where(condition))
+
+    deltas = new_deltas()
+    for row in rows:
+        date, category, amount = _rollup_values(returning, row)
+        add_delta(deltas, user_id, date, category, -1, amount)
+    apply_rollup_deltas(session.connection(), deltas)
+    return rows
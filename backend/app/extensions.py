@@ -1,5 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_caching import Cache
 
-db = SQLAlchemy()
+from .db_session import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 cache = Cache()
\ No newline at end of file
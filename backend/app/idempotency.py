@@ -0,0 +1,201 @@
+import datetime
+import functools
+import hashlib
+import time
+from flask import current_app, g, jsonify, request
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models.idempotency_key import IdempotencyKey
+from .caching import shared_cache_enabled
+from .extensions import cache, db
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+keys = IdempotencyKey.__table__
+
+class StoreUnavailable(Exception):
+    pass
+
+class SharedCacheStore:
+    """
+    Idempotency records in the shared cache (Redis). The reservation is a SET NX lock that expires
+    after IDEMPOTENCY_LOCK_TIMEOUT, so a crashed request cannot block its key forever.
+    """
+
+    def __init__(self, subject, key):
+        digest = hashlib.sha256(f"{subject}\0{key}".encode("utf-8")).hexdigest()[:32]
+        self._record_key = f"idempotency:{digest}"
+        self._lock_key = f"idempotency:lock:{digest}"
+
+    def _call(self, method, *args, **kwargs):
+        try:
+            return getattr(cache, method)(*args, **kwargs)
+        except Exception as e:
+            raise StoreUnavailable(str(e)) from e
+
+    def get(self):
+        return self._call("get", self._record_key)
+
+    def reserve(self, fingerprint):
+        return bool(self._call("add", self._lock_key, fingerprint, timeout=_config("IDEMPOTENCY_LOCK_TIMEOUT", 30)))
+
+    def complete(self, record):
+        self._call("set", self._record_key, record, timeout=_config("IDEMPOTENCY_KEY_TTL", 86400))
+        self.release()
+
+    def release(self):
+        self._call("delete", self._lock_key)
+
+class DatabaseStore:
+    """
+    Idempotency records in the idempotency_keys table, used when the shared cache is disabled or failing.
+    The reservation is the row itself: the primary key makes a concurrent second insert fail.
+    Each step runs in its own short transaction, independent of the view's session.
+    """
+
+    def __init__(self, subject, key):
+        self._where = and_(keys.c.auth0_subject == subject, keys.c.key == key)
+        self._subject = subject
+        self._key = key
+
+    def get(self):
+        with db.engine.connect() as connection:
+            row = connection.execute(select(keys).where(self._where)).first()
+        if row is None or row.status_code is None or row.expires_at <= _utcnow():
+            return None
+        return {"fingerprint": row.fingerprint, "status": row.status_code, "body": row.response_body,
+                "mimetype": row.mimetype}
+
+    def reserve(self, fingerprint):
+        now = _utcnow()
+        values = {
+            "auth0_subject": self._subject,
+            "key": self._key,
+            "fingerprint": fingerprint,
+            "locked_until": now + datetime.timedelta(seconds=_config("IDEMPOTENCY_LOCK_TIMEOUT", 30)),
+            "expires_at": now + datetime.timedelta(seconds=_config("IDEMPOTENCY_KEY_TTL", 86400)),
+        }
+        for _ in range(2):
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(insert(keys).values(**values))
+                return True
+            except IntegrityError:
+                # Take over an expired record or a reservation whose holder died, then try once more
+                with db.engine.begin() as connection:
+                    stale = or_(keys.c.expires_at <= now, and_(keys.c.status_code.is_(None), keys.c.locked_until <= now))
+                    if not connection.execute(delete(keys).where(self._where, stale)).rowcount:
+                        return False
+        return False
+
+    def complete(self, record):
+        with db.engine.begin() as connection:
+            connection.execute(update(keys).where(self._where).values(
+                status_code=record["status"], response_body=record["body"], mimetype=record["mimetype"],
+                locked_until=None
+            ))
+
+    def release(self):
+        with db.engine.begin() as connection:
+            connection.execute(delete(keys).where(self._where, keys.c.status_code.is_(None)))
+
+def _config(name, default):
+    return current_app.config.get(name, default)
+
+def _utcnow():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+def request_fingerprint():
+    digest = hashlib.sha256()
+    for part in (request.method, request.path, request.query_string.decode("latin-1")):
+        digest.update(part.encode("utf-8") + b"\0")
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+def _replay(record, fingerprint):
+    if record["fingerprint"] != fingerprint:
+        return jsonify({"error": "Idempotency-Key has already been used with a different request."}), 422
+    response = current_app.response_class(record["body"], status=record["status"], mimetype=record["mimetype"])
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+def _acquire(store, fingerprint):
+    """Returns None once the key is reserved for this request, or the response to send instead."""
+    record = store.get()
+    if record is not None:
+        return _replay(record, fingerprint)
+
+    # A concurrent request holding the key is waited for, then replayed, instead of racing it
+    deadline = time.monotonic() + _config("IDEMPOTENCY_WAIT_TIMEOUT", 10)
+    delay = 0.05
+    while True:
+        if store.reserve(fingerprint):
+            # It may have completed between our lookup and the reservation
+            record = store.get()
+            if record is None:
+                return None
+            store.release()
+            return _replay(record, fingerprint)
+        record = store.get()
+        if record is not None:
+            return _replay(record, fingerprint)
+        if time.monotonic() >= deadline:
+            return jsonify({"error": "A request with this Idempotency-Key is still being processed."}), 409
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+def idempotent(view):
+    """
+    Makes a write endpoint honor the Idempotency-Key header, per authenticated user. The first response
+    (anything but a 5xx) is stored for IDEMPOTENCY_KEY_TTL seconds and replayed for retries of the same
+    request; a 5xx releases the key so the client can retry. Place below @requires_auth.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"{HEADER} must be between 1 and {MAX_KEY_LENGTH} characters."}), 400
+
+        subject = g.current_user.get("sub")
+        fingerprint = request_fingerprint()
+        store = SharedCacheStore(subject, key) if shared_cache_enabled() else DatabaseStore(subject, key)
+        try:
+            early_response = _acquire(store, fingerprint)
+        except StoreUnavailable as e:
+            current_app.logger.warning(f"Shared cache unavailable for idempotency, using the database: {e}")
+            store = DatabaseStore(subject, key)
+            early_response = _acquire(store, fingerprint)
+        if early_response is not None:
+            return early_response
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            _safely(store.release)
+            raise
+
+        if response.status_code >= 500 or response.is_streamed:
+            _safely(store.release)
+        else:
+            record = {"fingerprint": fingerprint, "status": response.status_code,
+                      "body": response.get_data(as_text=True), "mimetype": response.mimetype}
+            _safely(store.complete, record)
+        return response
+
+    return wrapper
+
+def _safely(operation, *args):
+    # The write itself has already happened; failing to record it must not turn into an error response
+    try:
+        operation(*args)
+    except Exception as e:
+        current_app.logger.error(f"Could not update idempotency record: {e}")
+
+def purge_expired(connection):
+    """Deletes expired idempotency_keys rows. Returns the number deleted."""
+    return connection.execute(delete(keys).where(keys.c.expires_at <= _utcnow())).rowcount
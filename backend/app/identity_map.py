@@ -0,0 +1,60 @@
+import time
+from flask import has_app_context
+from sqlalchemy import event
+
+from models.user import User
+from .caching import LRUCache, config_value, shared_delete, shared_get, shared_set
+from .metrics import record_cache_lookup
+
+SHARED_KEY_PREFIX = "identity"
+
+class IdentityMap:
+    """
+    auth0_subject -> Fintrack user id map: an in-process LRU in front of the shared cache.
+
+    The mapping never changes for the lifetime of a user, so it is filled on every
+    successful lookup or creation and only invalidated when a user is deleted. Local
+    entries carry a short TTL (IDENTITY_CACHE_LOCAL_TTL) because a deletion can only
+    clear the local tier of the process that performed it.
+    """
+
+    def __init__(self, maxsize=10000):
+        self._local = LRUCache(maxsize)
+
+    def init_app(self, app):
+        self._local.maxsize = app.config.get("IDENTITY_CACHE_SIZE", 10000)
+
+    def get(self, auth0_subject):
+        user_id = self._local.get(auth0_subject)
+        if user_id is not None:
+            record_cache_lookup("identity", True)
+            return user_id
+
+        user_id = shared_get(f"{SHARED_KEY_PREFIX}:{auth0_subject}")
+        if user_id is not None:
+            self._set_local(auth0_subject, user_id)
+        record_cache_lookup("identity", user_id is not None)
+        return user_id
+
+    def set(self, auth0_subject, user_id):
+        self._set_local(auth0_subject, user_id)
+        shared_set(f"{SHARED_KEY_PREFIX}:{auth0_subject}", user_id,
+                   timeout=config_value("IDENTITY_CACHE_TIMEOUT", 86400))
+
+    def invalidate(self, auth0_subject):
+        self._local.delete(auth0_subject)
+        shared_delete(f"{SHARED_KEY_PREFIX}:{auth0_subject}")
+
+    def clear(self):
+        self._local.clear()
+
+    def _set_local(self, auth0_subject, user_id):
+        ttl = config_value("IDENTITY_CACHE_LOCAL_TTL", 300)
+        self._local.set(auth0_subject, user_id, expires_at=time.time() + ttl)
+
+identity_map = IdentityMap()
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    if target.auth0_subject and has_app_context():
+        identity_map.invalidate(target.auth0_subject)
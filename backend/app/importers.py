@@ -0,0 +1,288 @@
+import csv
+import datetime
+import html
+import re
+from decimal import Decimal, InvalidOperation
+from flask import current_app
+
+from .expense_cache import bump_data_version
+from .expense_validation import validate_expense_data
+from .expense_writes import insert_expenses
+
+# Statement parsers are generators of (record number, raw fields) read lazily from a text stream, so an
+# import holds one batch of rows in memory no matter how large the file is. Raw fields are strings:
+# date, description, amount (signed: outflows negative) and an optional category.
+
+# --- CSV ---
+_CSV_COLUMNS = {
+    "date": ("date", "transaction date", "posted date", "posting date", "booking date", "value date"),
+    "description": ("description", "payee", "name", "merchant", "details", "narrative", "memo", "reference"),
+    "amount": ("amount", "value", "transaction amount"),
+    "debit": ("debit", "debit amount", "withdrawal", "withdrawals", "money out", "paid out"),
+    "credit": ("credit", "credit amount", "deposit", "deposits", "money in", "paid in"),
+    "category": ("category",),
+}
+
+def _csv_columns(header):
+    positions = {}
+    normalized = [name.strip().lower() for name in header]
+    for field, aliases in _CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in normalized:
+                positions[field] = normalized.index(alias)
+                break
+    if "date" not in positions or "description" not in positions or not (
+        "amount" in positions or "debit" in positions
+    ):
+        raise ValueError("CSV header must include date, description and amount (or debit/credit) columns.")
+    return positions
+
+def parse_csv(stream):
+    """Reads the header eagerly, so a file that is not a usable statement fails before anything is imported."""
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if not header:
+        raise ValueError("CSV file is empty.")
+    positions = _csv_columns(header)
+
+    def cell(row, field):
+        position = positions.get(field)
+        return row[position].strip() if position is not None and position < len(row) else ""
+
+    def records():
+        for number, row in enumerate(reader, start=1):
+            if not any(value.strip() for value in row):
+                continue
+            amount = cell(row, "amount")
+            if not amount:
+                debit, credit = cell(row, "debit"), cell(row, "credit")
+                amount = f"-{debit.lstrip('-')}" if debit else credit
+            yield number, {
+                "date": cell(row, "date"),
+                "description": cell(row, "description"),
+                "amount": amount,
+                "category": cell(row, "category") or None,
+            }
+
+    return records()
+
+# --- OFX (1.x SGML and 2.x XML) ---
+_OFX_TOKEN = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+def parse_ofx(stream, chunk_size=64 * 1024):
+    def records():
+        buffer, current, number = "", None, 0
+        while True:
+            chunk = stream.read(chunk_size)
+            buffer += chunk
+            # The token starting at the last '<' may continue in the next chunk
+            end = len(buffer) if not chunk else buffer.rfind("<")
+            if end > 0:
+                for match in _OFX_TOKEN.finditer(buffer, 0, end):
+                    closing, tag, value = match.group(1), match.group(2).upper(), match.group(3).strip()
+                    if tag == "STMTTRN":
+                        if closing and current is not None:
+                            number += 1
+                            yield number, {
+                                "date": current.get("DTPOSTED", ""),
+                                "description": current.get("NAME") or current.get("MEMO", ""),
+                                "amount": current.get("TRNAMT", ""),
+                                "category": None,
+                            }
+                            current = None
+                        elif not closing:
+                            current = {}
+                    elif current is not None and not closing and value:
+                        # SGML leaf elements have no closing tag; XML ones do, with the value in between
+                        current[tag] = html.unescape(value)
+                buffer = buffer[end:]
+            if not chunk:
+                break
+
+    return records()
+
+_OFX_DATE = re.compile(r"^(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::[^\]]*)?\])?$")
+
+def parse_ofx_date(value):
+    """OFX dates look like 20250131, 20250131120000 or 20250131120000.000[-5:EST]; returned as naive UTC."""
+    match = _OFX_DATE.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid date: {value}.")
+    day, time_part, offset = match.groups()
+    parsed = datetime.datetime.strptime(day + (time_part or "000000"), "%Y%m%d%H%M%S")
+    if offset:
+        parsed -= datetime.timedelta(hours=float(offset))
+    return parsed
+
+# --- QIF ---
+# Transaction sections; category/class/memorized lists and account headers are skipped
+_QIF_TRANSACTION_TYPES = ("bank", "cash", "ccard", "oth a", "oth l")
+
+def parse_qif(stream):
+    def records():
+        in_transactions, current, number = False, {}, 0
+        for line in stream:
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            if line.startswith("!"):
+                header = line[1:].strip().lower()
+                if header.startswith("type:"):
+                    in_transactions = header[5:].strip() in _QIF_TRANSACTION_TYPES
+                    current = {}
+                continue
+            if not in_transactions:
+                continue
+            code, value = line[0], line[1:].strip()
+            if code == "^":
+                if current:
+                    number += 1
+                    category = current.get("L")
+                    # [Account] categories are transfers between accounts
+                    if category and category.startswith("["):
+                        category = None
+                    yield number, {
+                        "date": current.get("D", ""),
+                        "description": current.get("P") or current.get("M", ""),
+                        "amount": current.get("T") or current.get("U", ""),
+                        "category": category,
+                    }
+                current = {}
+            elif code in "DTUPML" and code not in current:
+                # Split lines (S/E/$) repeat per split; the transaction's own fields come first
+                current[code] = value
+
+    return records()
+
+def parse_qif_date(value, date_format=None):
+    """QIF dates are US-style, e.g. 1/31/2025, 01/31/25 or 1/31'25 (apostrophe years are 2000+)."""
+    cleaned = value.replace(" ", "")
+    if "'" in cleaned:
+        month_day, year = cleaned.split("'", 1)
+        cleaned = f"{month_day}/{2000 + int(year) if year.isdigit() and len(year) <= 2 else year}"
+    return parse_statement_date(cleaned, date_format)
+
+# --- Normalization ---
+_DEFAULT_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d")
+
+def parse_statement_date(value, date_format=None):
+    """ISO 8601, then `date_format` if given, otherwise common US-style formats."""
+    value = value.strip()
+    if not value:
+        raise ValueError("Missing date.")
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    for candidate in ((date_format,) if date_format else _DEFAULT_DATE_FORMATS):
+        try:
+            return datetime.datetime.strptime(value, candidate)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value}.")
+
+_CURRENCY = re.compile(r"[^\d,.\-+()]")
+
+def parse_statement_amount(value):
+    """Signed amount from strings like -12.50, (12.50), £1,234.56, 1.234,56 or 12,50."""
+    cleaned = _CURRENCY.sub("", value or "")
+    negative = cleaned.startswith("(") and cleaned.endswith(")")
+    cleaned = cleaned.strip("()")
+    if "," in cleaned and "." in cleaned:
+        # Whichever separator comes last is the decimal point: 1,234.56 or 1.234,56
+        if cleaned.rfind(",") > cleaned.rfind("."):
+            cleaned = cleaned.replace(".", "").replace(",", ".")
+        else:
+            cleaned = cleaned.replace(",", "")
+    elif re.fullmatch(r"[-+]?\d+,\d{1,2}", cleaned):
+        cleaned = cleaned.replace(",", ".")
+    else:
+        cleaned = cleaned.replace(",", "")
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value}.")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {value}.")
+    return -amount if negative else amount
+
+FORMATS = {
+    "csv": (parse_csv, parse_statement_date),
+    "ofx": (parse_ofx, lambda value, date_format=None: parse_ofx_date(value)),
+    "qif": (parse_qif, parse_qif_date),
+}
+EXPENSE_SIGNS = ("negative", "positive")
+
+def open_statement(stream, statement_format, date_format=None):
+    """Returns (records, parse_date) for a statement stream; raises ValueError for an unusable file."""
+    if statement_format not in FORMATS:
+        raise ValueError(f"Unsupported import format. Use one of: {', '.join(FORMATS)}.")
+    parser, parse_date = FORMATS[statement_format]
+    return parser(stream), (lambda value: parse_date(value, date_format))
+
+def normalize_record(raw, parse_date, expense_sign="negative"):
+    """
+    Turns raw statement fields into validated Expense values, or None for a transaction that is not an
+    expense (an inflow when outflows are negative, and vice versa). Raises ValueError for a bad record.
+    """
+    amount = parse_statement_amount(raw["amount"])
+    if amount == 0 or (amount > 0) == (expense_sign == "negative"):
+        return None
+    date = parse_date(raw["date"])
+    if date.tzinfo is not None:
+        date = date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    description = " ".join((raw["description"] or "").split())[:200]
+    category = (raw.get("category") or "").strip()[:50] or None
+    # The parsed Decimal and datetime go in as they are; the validator does not re-parse them
+    return validate_expense_data({
+        "description": description,
+        "amount": abs(amount),
+        "date": date,
+        "category": category,
+    })
+
+# --- Pipeline ---
+def run_import(session, user_id, records, parse_date, batch_size=1000, expense_sign="negative", max_errors=100):
+    """
+    Validates records and writes them with bulk inserts, committing every `batch_size` expenses.
+    Yields a progress event after each committed batch and a final "done" (or "error") event.
+    Batches committed before a failure stay imported.
+    """
+    counts = {"processed": 0, "imported": 0, "skipped": 0, "failed": 0}
+    errors = []
+    batch = []
+
+    def flush():
+        insert_expenses(session, user_id, batch)
+        session.commit()
+        counts["imported"] += len(batch)
+        batch.clear()
+        bump_data_version(user_id)
+        return dict(counts, event="progress")
+
+    try:
+        for number, raw in records:
+            counts["processed"] += 1
+            try:
+                values = normalize_record(raw, parse_date, expense_sign)
+            except ValueError as e:
+                counts["failed"] += 1
+                if len(errors) < max_errors:
+                    errors.append({"record": number, "error": str(e)})
+                continue
+            if values is None:
+                counts["skipped"] += 1
+                continue
+            batch.append(values)
+            if len(batch) >= batch_size:
+                yield flush()
+        if batch:
+            yield flush()
+    except Exception as e:
+        session.rollback()
+        current_app.logger.error(f"Import for user {user_id} stopped after {counts['processed']} records: {e}")
+        yield dict(counts, event="error", error="An error occurred during the import. Expenses from earlier "
+                   "batches were kept.", errors=errors)
+        return
+
+    yield dict(counts, event="done", errors=errors)
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import threading
+import time
+from flask import current_app
+from jwt.algorithms import RSAAlgorithm
+
+from .metrics import record_cache_lookup
+
+def jwks_fingerprint(jwks):
+    """Stable digest of a key set, used to detect JWKS rotation."""
+    canonical = json.dumps(jwks.get("keys", []), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+class PublicKeyIndex:
+    """
+    kid -> RSA public key map built once per key set.
+
+    Keys that cannot be constructed are remembered with their error so that a token
+    signed with that kid fails the same way it always has, without retrying the build.
+    """
+
+    def __init__(self, jwks, fingerprint=None):
+        self.fingerprint = fingerprint or jwks_fingerprint(jwks)
+        # The key set object last served by this index, for an identity check that skips hashing
+        self.source = jwks
+        self._keys = {}
+        self._errors = {}
+        for key_component in jwks.get("keys", []):
+            kid = key_component.get("kid")
+            if not kid:
+                continue
+            try:
+                self._keys[kid] = RSAAlgorithm.from_jwk(json.dumps(key_component))
+            except Exception as e:
+                self._errors[kid] = e
+
+    def __contains__(self, kid):
+        return kid in self._keys or kid in self._errors
+
+    def get(self, kid):
+        """Returns the public key for `kid`, None if unknown, or re-raises its construction error."""
+        if kid in self._errors:
+            raise self._errors[kid]
+        return self._keys.get(kid)
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_public_key_index(jwks, fingerprint=None):
+    """
+    Returns the key index for `jwks`, rebuilding it only when the key set has changed.
+    The same key set object is matched by identity; another one is compared by `fingerprint`,
+    hashed here only when the caller does not have it.
+    """
+    global _index
+    index = _index
+    if index is not None and index.source is jwks:
+        return index
+    fingerprint = fingerprint or jwks_fingerprint(jwks)
+    with _index_lock:
+        if _index is None or _index.fingerprint != fingerprint:
+            _index = PublicKeyIndex(jwks, fingerprint)
+        else:
+            _index.source = jwks
+        return _index
+
+def reset_public_key_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+class JWKSProvider:
+    """
+    Process-local JWKS source with stale-while-revalidate and single-flight refreshes.
+
+    - Cold start: the first caller fetches synchronously; concurrent callers wait for
+      that one fetch instead of each calling Auth0, and share its error if it fails.
+    - After JWKS_REFRESH_INTERVAL seconds the current key set keeps being served while a
+      single background thread fetches a new one.
+    - A failed fetch never discards the last good key set; it is retried after
+      JWKS_RETRY_INTERVAL seconds.
+
+    `fetch` is a zero-argument callable returning the JWKS dict, called inside an app context.
+    """
+
+    def __init__(self, fetch):
+        self._fetch = fetch
+        self._jwks = None
+        # (key set, its fingerprint), replaced together so readers never pair one with another's digest
+        self._fetched = (None, None)
+        self._generation = 0
+        # Failed fetches while there is no key set yet, and the latest error, for callers queued behind one
+        self._cold_failures = 0
+        self._cold_error = None
+        self._next_refresh_at = 0.0
+        self._refreshing = False
+        self._fetch_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    def get(self):
+        jwks = self.cached()
+        if jwks is None:
+            return self.refresh(self._generation)
+        return jwks
+
+    def cached(self):
+        """
+        The current key set without ever blocking, or None before the first successful fetch.
+        A due refresh is started in the background, as in get().
+        """
+        jwks = self._jwks
+        record_cache_lookup("jwks", jwks is not None)
+        if jwks is not None and time.monotonic() >= self._next_refresh_at:
+            self._refresh_in_background()
+        return jwks
+
+    def fingerprint(self, jwks):
+        """Fingerprint of `jwks`; computed once per fetched key set, so only foreign key sets are hashed here."""
+        fetched, fingerprint = self._fetched
+        if jwks is fetched:
+            return fingerprint
+        return jwks_fingerprint(jwks)
+
+    def refresh(self, seen_generation=None):
+        """
+        Synchronously fetches a new key set unless another thread completed a refresh while
+        we waited for the lock. Returns the freshest key set available (possibly the old one).
+
+        Before the first successful fetch, callers that waited on a fetch which failed re-raise its
+        error rather than queueing one more full-timeout attempt each.
+        """
+        if seen_generation is None:
+            seen_generation = self._generation
+        seen_failures = self._cold_failures
+        with self._fetch_lock:
+            if self._generation != seen_generation and self._jwks is not None:
+                return self._jwks
+            if self._jwks is None and self._cold_failures != seen_failures:
+                raise self._cold_error
+            return self._do_fetch()
+
+    def invalidate(self):
+        with self._fetch_lock:
+            self._jwks = None
+            self._next_refresh_at = 0.0
+
+    def _refresh_in_background(self):
+        with self._state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        app = current_app._get_current_object()
+
+        def run():
+            try:
+                with app.app_context(), self._fetch_lock:
+                    if time.monotonic() >= self._next_refresh_at:
+                        self._do_fetch()
+            except Exception as e:
+                app.logger.error(f"Background JWKS refresh failed: {e}")
+            finally:
+                with self._state_lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def _do_fetch(self):
+        # Caller holds _fetch_lock
+        config = current_app.config
+        try:
+            jwks = self._fetch()
+        except Exception as e:
+            if self._jwks is None:
+                self._cold_error = e
+                self._cold_failures += 1
+                raise
+            current_app.logger.warning(f"JWKS refresh failed, serving last good key set: {e}")
+            self._next_refresh_at = time.monotonic() + config.get("JWKS_RETRY_INTERVAL", 30)
+            return self._jwks
+
+        if not jwks or "keys" not in jwks:
+            current_app.logger.warning("JWKS fetch returned no key set.")
+            self._next_refresh_at = time.monotonic() + config.get("JWKS_RETRY_INTERVAL", 30)
+            return self._jwks
+
+        fingerprint = jwks_fingerprint(jwks)
+        self._fetched = (jwks, fingerprint)
+        self._jwks = jwks
+        self._generation += 1
+        self._next_refresh_at = time.monotonic() + config.get("JWKS_REFRESH_INTERVAL", 600)
+        # Warm the key index off the request path
+        get_public_key_index(jwks, fingerprint)
+        return jwks
@@ -0,0 +1,148 @@
+import hmac
+import os
+import time
+from flask import Response, current_app, has_request_context, jsonify, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+# Prometheus metrics for the whole process. prometheus_client is thread-safe, so waitress threads share
+# these objects. With several worker processes, start each with PROMETHEUS_MULTIPROC_DIR pointing at the
+# same empty directory (set in the environment, before the app is imported): every process then writes
+# its samples there and /metrics aggregates all of them.
+
+_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUEST_LATENCY = Histogram(
+    "fintrack_http_request_duration_seconds", "Time to produce a response, per route.",
+    ["blueprint", "endpoint", "method"],
+)
+REQUESTS = Counter(
+    "fintrack_http_requests_total", "Responses sent, per route and status code.",
+    ["blueprint", "endpoint", "method", "status"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "fintrack_db_query_duration_seconds", "Database statement execution time (its _count is the number of statements).",
+    ["endpoint", "operation"], buckets=_DB_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "fintrack_db_queries_per_request", "Database statements executed while handling one request.",
+    ["endpoint"], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+CACHE_LOOKUPS = Counter(
+    "fintrack_cache_lookups_total", "Cache lookups by result; hit ratio = rate(hit) / rate(all).",
+    ["cache", "result"],
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "fintrack_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.",
+    buckets=_DB_BUCKETS,
+)
+POOL_CHECKED_OUT = Gauge(
+    "fintrack_db_pool_checked_out_connections", "Pooled database connections currently in use.",
+    multiprocess_mode="livesum",
+)
+
+_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+# Per-request timing state lives in the WSGI environ, like the replica choice in db_session
+_STARTED_KEY = "fintrack.metrics_started"
+_QUERIES_KEY = "fintrack.metrics_queries"
+
+def record_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+def _endpoint_label():
+    if not has_request_context():
+        return "none"
+    return request.endpoint or "unmatched"
+
+# --- Database ---
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    operation = statement.lstrip()[:6].upper()
+    endpoint = _endpoint_label()
+    DB_QUERY_LATENCY.labels(endpoint=endpoint, operation=operation if operation in _OPERATIONS else "OTHER").observe(
+        time.perf_counter() - started
+    )
+    if has_request_context() and _QUERIES_KEY in request.environ:
+        request.environ[_QUERIES_KEY] += 1
+
+@event.listens_for(Pool, "checkout")
+def _connection_checked_out(dbapi_connection, connection_record, connection_proxy):
+    POOL_CHECKED_OUT.inc()
+
+@event.listens_for(Pool, "checkin")
+def _connection_checked_in(dbapi_connection, connection_record):
+    POOL_CHECKED_OUT.dec()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout, including any wait for a free connection or a new one to open."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+# --- Requests ---
+def _start_request():
+    request.environ[_STARTED_KEY] = time.perf_counter()
+    request.environ[_QUERIES_KEY] = 0
+
+def _record_request(response):
+    started = request.environ.pop(_STARTED_KEY, None)
+    if started is None:
+        return response
+    blueprint = request.blueprint or ""
+    endpoint = request.endpoint or "unmatched"
+    # Streamed bodies are produced later; their latency here is the time to the first byte
+    REQUEST_LATENCY.labels(blueprint=blueprint, endpoint=endpoint, method=request.method).observe(time.perf_counter() - started)
+    REQUESTS.labels(blueprint=blueprint, endpoint=endpoint, method=request.method, status=str(response.status_code)).inc()
+    DB_QUERIES_PER_REQUEST.labels(endpoint=endpoint).observe(request.environ.pop(_QUERIES_KEY, 0))
+    return response
+
+def metrics_view():
+    token = current_app.config.get("METRICS_AUTH_TOKEN")
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify({"error": "A valid metrics token is required."}), 401
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+class Metrics:
+    """Request and database instrumentation plus the Prometheus scrape endpoint at METRICS_PATH."""
+
+    def init_app(self, app):
+        """Call before db.init_app, so the database engines get the instrumented pool."""
+        if not app.config.get("METRICS_ENABLED", False):
+            return
+        uri = app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+        # SQLite's in-memory databases rely on their own pool classes; leave those alone
+        if not uri.startswith("sqlite"):
+            app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {}).setdefault("poolclass", InstrumentedQueuePool)
+        app.before_request(_start_request)
+        app.after_request(_record_request)
+
+        path = app.config.get("METRICS_PATH", "/metrics")
+        # Route names, pool state and latencies are not for the public: outside local development and
+        # tests the endpoint is only served behind METRICS_AUTH_TOKEN
+        if not app.config.get("METRICS_AUTH_TOKEN") and not (app.debug or app.testing):
+            app.logger.warning(f"METRICS_AUTH_TOKEN is not set; metrics are collected but not served at {path}.")
+            return
+        app.add_url_rule(path, "metrics", metrics_view)
+
+metrics = Metrics()
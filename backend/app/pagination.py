@@ -0,0 +1,47 @@
+import base64
+import datetime
+import json
+
+class InvalidCursorError(ValueError):
+    pass
+
+def encode_cursor(date, row_id):
+    """Opaque keyset cursor for the (date DESC, id DESC) ordering."""
+    raw = json.dumps([date.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_str, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(row_id, int) or isinstance(row_id, bool):
+            raise ValueError("cursor id must be an integer")
+        return datetime.datetime.fromisoformat(date_str), row_id
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursorError("Invalid cursor.") from e
+
+def parse_limit(value, default, maximum):
+    """Parses a `limit` query parameter, clamped to [1, maximum]."""
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer.")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer.")
+    return min(limit, maximum)
+
+def parse_offset(value, maximum):
+    """Parses an `offset` query parameter for ranked listings that cannot use a keyset cursor."""
+    if value is None or value == "":
+        return 0
+    try:
+        offset = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("offset must be an integer.")
+    if offset < 0:
+        raise ValueError("offset must not be negative.")
+    if offset > maximum:
+        raise ValueError(f"offset must not be greater than {maximum}.")
+    return offset
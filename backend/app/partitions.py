@@ -0,0 +1,92 @@
+import datetime
+from sqlalchemy import text
+
+from models.expense import Expense
+
+# On Postgres, expenses is range-partitioned by date (see migration 9c2b7e4f1a30): one partition per month
+# or year, plus expenses_default for rows outside every range. Other dialects keep a plain table.
+INTERVALS = ("month", "year")
+PARENT = "expenses"
+DEFAULT_PARTITION = "expenses_default"
+
+# Every stored column except the generated search_vector, which Postgres refuses to be given
+_COLUMNS = ", ".join(column.name for column in Expense.__table__.columns)
+
+def period_start(day, interval):
+    return day.replace(day=1) if interval == "month" else day.replace(month=1, day=1)
+
+def next_period(start, interval):
+    if interval == "year":
+        return start.replace(year=start.year + 1)
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+def partition_name(start, interval):
+    return f"{PARENT}_y{start.year}" if interval == "year" else f"{PARENT}_y{start.year}m{start.month:02d}"
+
+def partition_ranges(first_day, last_day, interval):
+    """(name, start, end) of every partition needed to cover first_day..last_day, in order."""
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported partition interval. Use one of: {', '.join(INTERVALS)}.")
+    ranges = []
+    start = period_start(first_day, interval)
+    while start <= last_day:
+        end = next_period(start, interval)
+        ranges.append((partition_name(start, interval), start, end))
+        start = end
+    return ranges
+
+def is_partitioned(connection):
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:parent)"
+    ), {"parent": PARENT}).scalar() or False
+
+def existing_partitions(connection):
+    return set(connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:parent)"
+    ), {"parent": PARENT}).scalars())
+
+def create_partition(connection, name, start, end):
+    """
+    Creates one partition. Rows the default partition already holds for the range are moved into it:
+    Postgres refuses to add a partition while the default one has rows that belong to it.
+    """
+    bounds = {"start": start, "end": end}
+    in_range = "date >= :start AND date < :end"
+    strays = connection.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds).scalar()
+    if strays:
+        connection.execute(text(
+            f"CREATE TEMP TABLE expenses_moving ON COMMIT DROP AS SELECT {_COLUMNS} FROM {DEFAULT_PARTITION} WHERE {in_range}"
+        ), bounds)
+        connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+
+    connection.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+    if strays:
+        connection.execute(text(f"INSERT INTO {PARENT} ({_COLUMNS}) SELECT {_COLUMNS} FROM expenses_moving"))
+        connection.execute(text("DROP TABLE expenses_moving"))
+    return strays
+
+def ensure_partitions(connection, interval, ahead, today=None):
+    """
+    Creates any missing partitions from the current period through `ahead` periods after it.
+    Returns the names created. Meant to run regularly (flask expenses ensure-partitions), well before
+    the next period begins, so new expenses never land in the default partition.
+    """
+    today = today or datetime.date.today()
+    last_day = today
+    for _ in range(ahead):
+        last_day = next_period(period_start(last_day, interval), interval)
+
+    existing = existing_partitions(connection)
+    created = []
+    for name, start, end in partition_ranges(today, last_day, interval):
+        if name not in existing:
+            create_partition(connection, name, start, end)
+            created.append(name)
+    return created
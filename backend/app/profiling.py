@@ -0,0 +1,151 @@
+import collections
+import contextlib
+import functools
+import json
+import re
+import time
+from flask import current_app, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Opt-in (SQL_PROFILING_ENABLED) per-request profile: statement count and time, the slowest statement,
+# and time spent in auth and JSON serialization. Reported in a Server-Timing header and one log line;
+# a statement shape repeated SQL_PROFILING_REPEAT_THRESHOLD times or more in one request logs an N+1 warning.
+PROFILE_ENVIRON_KEY = "fintrack.profile"
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_ROW_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement):
+    """
+    Statement text with whitespace normalized and parameter lists collapsed, so `IN (?, ?)` and
+    `IN (?, ?, ?)`, or multi-row VALUES of any length, count as the same statement.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _ROW_LIST.sub("(...)", shape)
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.shapes = collections.Counter()
+        self.phases = collections.defaultdict(float)
+
+    def record_statement(self, statement, duration):
+        shape = statement_shape(statement)
+        self.statements += 1
+        self.db_time += duration
+        if duration >= self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = shape
+        self.shapes[shape] += 1
+
+    def repeated(self, threshold):
+        """(shape, count) of statements that ran at least `threshold` times, most repeated first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+def current_profile():
+    return request.environ.get(PROFILE_ENVIRON_KEY) if has_request_context() else None
+
+@contextlib.contextmanager
+def profile_phase(name):
+    """Adds the time spent in the block to the request's `name` phase, when profiling."""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.phases[name] += time.perf_counter() - started
+
+def profiled(name):
+    """Decorator form of profile_phase."""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            with profile_phase(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class ProfilingJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing every dumps (jsonify included) as the serialize phase."""
+
+    def dumps(self, obj, **kwargs):
+        with profile_phase("serialize"):
+            return super().dumps(obj, **kwargs)
+
+# --- Database ---
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_profile() is not None:
+        context._profile_started = time.perf_counter()
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profile_started", None)
+    profile = current_profile()
+    if started is not None and profile is not None:
+        profile.record_statement(statement, time.perf_counter() - started)
+
+# --- Requests ---
+def _start_request():
+    request.environ[PROFILE_ENVIRON_KEY] = RequestProfile()
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+def _report_request(response):
+    profile = request.environ.pop(PROFILE_ENVIRON_KEY, None)
+    if profile is None:
+        return response
+    total = time.perf_counter() - profile.started
+
+    timings = [f'db;dur={_ms(profile.db_time)};desc="{profile.statements} statements"']
+    timings += [f"{name};dur={_ms(seconds)}" for name, seconds in sorted(profile.phases.items())]
+    timings.append(f"total;dur={_ms(total)}")
+    response.headers.add("Server-Timing", ", ".join(timings))
+
+    summary = {
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "total_ms": _ms(total),
+        "statements": profile.statements,
+        "db_ms": _ms(profile.db_time),
+        "slowest_ms": _ms(profile.slowest_time),
+        "slowest_statement": profile.slowest_statement,
+        "phases_ms": {name: _ms(seconds) for name, seconds in profile.phases.items()},
+    }
+    current_app.logger.info(f"Request profile: {json.dumps(summary, sort_keys=True)}")
+
+    threshold = current_app.config.get("SQL_PROFILING_REPEAT_THRESHOLD", 5)
+    for shape, count in profile.repeated(threshold):
+        current_app.logger.warning(
+            f"Possible N+1 in {request.method} {request.path}: statement ran {count} times: {shape}"
+        )
+    return response
+
+class Profiler:
+    """Installs the request hooks, statement listeners and timing JSON provider when SQL_PROFILING_ENABLED."""
+
+    def init_app(self, app):
+        if not app.config.get("SQL_PROFILING_ENABLED", False):
+            return
+        # Engine-wide listeners; they only record while a profiled request is in progress
+        if not event.contains(Engine, "before_cursor_execute", _start_statement):
+            event.listen(Engine, "before_cursor_execute", _start_statement)
+            event.listen(Engine, "after_cursor_execute", _record_statement)
+        app.json = ProfilingJSONProvider(app)
+        app.before_request(_start_request)
+        app.after_request(_report_request)
+
+profiler = Profiler()
@@ -0,0 +1,174 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import Numeric, delete, event, func, inspect, literal_column, select, type_coerce
+from sqlalchemy.orm import Session
+
+from models.expense import Expense
+from models.expense_daily_rollup import ExpenseDailyRollup
+from models.user import User
+from .db_utils import dialect_insert, is_mysql
+from .expense_queries import period_start
+
+rollups = ExpenseDailyRollup.__table__
+expenses = Expense.__table__
+
+def rollup_key(user_id, date, category):
+    day = date.date() if isinstance(date, datetime.datetime) else date
+    return user_id, day, category or ''
+
+def new_deltas():
+    """(user_id, day, category) -> [count delta, amount delta]"""
+    return defaultdict(lambda: [0, Decimal("0")])
+
+def add_delta(deltas, user_id, date, category, count, amount):
+    entry = deltas[rollup_key(user_id, date, category)]
+    entry[0] += count
+    entry[1] += Decimal(str(amount)) * count
+
+def apply_rollup_deltas(connection, deltas):
+    """
+    Adds count/amount deltas to the rollup rows in one upsert, on the caller's connection so it
+    commits or rolls back together with the expense write. Rows that drop to zero are removed.
+    """
+    params = [
+        {"user_id": user_id, "day": day, "category": category, "expense_count": count, "amount_total": amount}
+        for (user_id, day, category), (count, amount) in deltas.items()
+        if count or amount
+    ]
+    if not params:
+        return
+
+    dialect_name = connection.dialect.name
+    stmt = dialect_insert(dialect_name, rollups)
+    if is_mysql(dialect_name):
+        stmt = stmt.on_duplicate_key_update(
+            expense_count=rollups.c.expense_count + stmt.inserted.expense_count,
+            amount_total=rollups.c.amount_total + stmt.inserted.amount_total,
+        )
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[rollups.c.user_id, rollups.c.day, rollups.c.category],
+            set_={
+                "expense_count": rollups.c.expense_count + stmt.excluded.expense_count,
+                "amount_total": rollups.c.amount_total + stmt.excluded.amount_total,
+            },
+        )
+    connection.execute(stmt, params)
+
+    if any(param["expense_count"] < 0 for param in params):
+        user_ids = {param["user_id"] for param in params}
+        connection.execute(delete(rollups).where(rollups.c.user_id.in_(user_ids), rollups.c.expense_count <= 0))
+
+def _committed_value(state, attr):
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.attrs[attr].value
+
+_ROLLUP_ATTRS = ("user_id", "date", "category", "amount")
+
+# Load the previous value when one of these is assigned on an expired instance, so history.deleted
+# still holds the committed value the rollup has to be decremented by.
+for _attr in _ROLLUP_ATTRS:
+    event.listen(getattr(Expense, _attr), "set", lambda target, value, oldvalue, initiator: value,
+                 active_history=True, retval=True)
+
+@event.listens_for(Session, "after_flush")
+def _maintain_rollups(session, flush_context):
+    """Keeps rollups in step with every ORM insert, update and delete of an Expense, inside the flush's transaction."""
+    deleted_user_ids = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    deltas = new_deltas()
+
+    for obj in session.new:
+        if isinstance(obj, Expense):
+            add_delta(deltas, obj.user_id, obj.date, obj.category, 1, obj.amount)
+
+    for obj in session.deleted:
+        # A deleted user's rollups are removed by the User.daily_rollups cascade
+        if isinstance(obj, Expense) and obj.user_id not in deleted_user_ids:
+            state = inspect(obj)
+            old = [_committed_value(state, attr) for attr in _ROLLUP_ATTRS]
+            add_delta(deltas, *old[:3], -1, old[3])
+
+    for obj in session.dirty:
+        if isinstance(obj, Expense) and session.is_modified(obj):
+            state = inspect(obj)
+            old = [_committed_value(state, attr) for attr in _ROLLUP_ATTRS]
+            new = [getattr(obj, attr) for attr in _ROLLUP_ATTRS]
+            if old != new:
+                add_delta(deltas, *old[:3], -1, old[3])
+                add_delta(deltas, *new[:3], 1, new[3])
+
+    if deltas:
+        apply_rollup_deltas(session.connection(), deltas)
+
+def rollup_user_ids(connection):
+    """Ids of every user with rollups or expenses, i.e. whose rollups a full rebuild may change."""
+    return connection.execute(select(rollups.c.user_id).union(select(expenses.c.user_id))).scalars().all()
+
+def rebuild_rollups(connection, user_id=None):
+    """Recomputes rollups from the expenses table, for one user or everyone. Returns the number of rows written."""
+    # Group by the expressions themselves: on Postgres a bare "category" would mean the raw input column
+    day = func.date(expenses.c.date)
+    category = func.coalesce(expenses.c.category, literal_column("''"))
+    delete_stmt = delete(rollups)
+    source = select(
+        expenses.c.user_id,
+        day.label("day"),
+        category.label("category"),
+        func.count().label("expense_count"),
+        func.sum(expenses.c.amount).label("amount_total"),
+    ).group_by(expenses.c.user_id, day, category)
+    if user_id is not None:
+        delete_stmt = delete_stmt.where(rollups.c.user_id == user_id)
+        source = source.where(expenses.c.user_id == user_id)
+
+    connection.execute(delete_stmt)
+    result = connection.execute(
+        rollups.insert().from_select(["user_id", "day", "category", "expense_count", "amount_total"], source)
+    )
+    return result.rowcount
+
+# --- Reading ---
+def rollups_can_serve(filters):
+    """Rollups hold whole days per category, so they can answer day-aligned date and category filters only."""
+    for name, value in filters.items():
+        if name in ("date_from", "date_before"):
+            if value.time() != datetime.time():
+                return False
+        elif name != "category":
+            return False
+    return True
+
+def build_rollup_aggregate_query(dialect_name, user_id, period, by_category, filters):
+    """Same result shape as expense_queries.build_aggregate_query, read from the rollup table."""
+    group_columns = []
+    if period:
+        group_columns.append(period_start(dialect_name, period, rollups.c.day).label("period"))
+    if by_category:
+        group_columns.append(func.nullif(rollups.c.category, literal_column("''")).label("category"))
+
+    total = func.sum(rollups.c.amount_total)
+    count = func.coalesce(func.sum(rollups.c.expense_count), 0)
+    stmt = select(
+        *group_columns,
+        total.label("total"),
+        count.label("count"),
+        # Unscaled Numeric so the average reaches serialization unrounded, like AVG() does
+        type_coerce(total / func.sum(rollups.c.expense_count), Numeric()).label("average"),
+    ).where(rollups.c.user_id == user_id)
+
+    if "date_from" in filters:
+        stmt = stmt.where(rollups.c.day >= filters["date_from"].date())
+    if "date_before" in filters:
+        stmt = stmt.where(rollups.c.day < filters["date_before"].date())
+    if "category" in filters:
+        stmt = stmt.where(rollups.c.category.in_(filters["category"]))
+
+    labels = [column.name for column in group_columns]
+    if labels:
+        stmt = stmt.group_by(*labels).order_by(*labels)
+    return stmt
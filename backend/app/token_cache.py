@@ -0,0 +1,78 @@
+import hashlib
+import threading
+import time
+
+from .caching import LRUCache, shared_get, shared_set
+from .metrics import record_cache_lookup
+
+SHARED_KEY_PREFIX = "auth:token"
+
+def _token_key(token):
+    # Never store raw bearer tokens as cache keys
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+class VerifiedTokenCache:
+    """
+    Cache of verified JWT claims, keyed by a hash of the bearer token.
+
+    Entries live in a bounded process-local LRU and, when the shared cache is enabled,
+    in Redis so that other workers can skip RSA verification too. Every entry expires
+    at the token's `exp` claim. Entries are bound to the JWKS they were verified against:
+    a change of JWKS fingerprint clears the local tier, and shared keys include the
+    fingerprint so entries verified against rotated keys are never read again.
+    """
+
+    def __init__(self, maxsize=1024):
+        self._local = LRUCache(maxsize)
+        self._jwks_fingerprint = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._local.maxsize = app.config.get("AUTH_TOKEN_CACHE_SIZE", 1024)
+
+    def _sync_fingerprint(self, jwks_fingerprint):
+        if jwks_fingerprint == self._jwks_fingerprint:
+            return
+        with self._lock:
+            if jwks_fingerprint != self._jwks_fingerprint:
+                self._local.clear()
+                self._jwks_fingerprint = jwks_fingerprint
+
+    def get(self, token, jwks_fingerprint):
+        """Returns cached claims for `token`, or None if it must be verified."""
+        self._sync_fingerprint(jwks_fingerprint)
+        key = _token_key(token)
+
+        claims = self._local.get(key)
+        if claims is not None:
+            record_cache_lookup("auth_token", True)
+            return claims
+
+        claims = shared_get(f"{SHARED_KEY_PREFIX}:{jwks_fingerprint}:{key}")
+        if claims is not None and claims.get("exp", 0) > time.time():
+            self._local.set(key, claims, expires_at=claims["exp"])
+            record_cache_lookup("auth_token", True)
+            return claims
+        record_cache_lookup("auth_token", False)
+        return None
+
+    def set(self, token, claims, jwks_fingerprint):
+        """Stores verified claims until the token expires. Tokens without a numeric `exp` are not cached."""
+        exp = claims.get("exp") if isinstance(claims, dict) else None
+        if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+            return
+        ttl = int(exp - time.time())
+        if ttl <= 0:
+            return
+
+        self._sync_fingerprint(jwks_fingerprint)
+        key = _token_key(token)
+        self._local.set(key, claims, expires_at=exp)
+        shared_set(f"{SHARED_KEY_PREFIX}:{jwks_fingerprint}:{key}", claims, timeout=ttl)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+            self._jwks_fingerprint = None
+
+token_cache = VerifiedTokenCache()
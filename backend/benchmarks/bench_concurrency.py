@@ -0,0 +1,231 @@
+"""
+Compares how the WSGI deployment (waitress, wsgi.py) and the ASGI one (uvicorn, asgi.py) hold up as the
+number of concurrent clients grows, on GET /api/expenses/get_all.
+
+Each server runs in its own process against the same SQLite file. --db-latency adds a simulated
+network round trip to every statement: the sync driver blocks its thread for it, as psycopg2 does, while
+the async driver awaits it, as asyncpg does. Clients are keep-alive connections issuing requests back to back.
+
+Usage (from backend/):
+    python benchmarks/bench_concurrency.py --clients 8 64 256 --duration 5 --db-latency 20 --threads 4
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from app.config import TestingConfig  # noqa: E402
+from app.extensions import db  # noqa: E402
+from models.expense import Expense  # noqa: E402
+from models.user import User  # noqa: E402
+
+PATH = "/api/expenses/get_all?limit=50"
+SUBJECT = "auth0|bench"
+
+def make_flask_app(database):
+    from app.extensions import cache
+    from routes.expense_routes import expense_bp
+
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    app.config.update(DEBUG=False, SQLALCHEMY_DATABASE_URI=f"sqlite:///{database}")
+    db.init_app(app)
+    cache.init_app(app)
+    app.register_blueprint(expense_bp, url_prefix="/api/expenses")
+    return app
+
+def seed(database, row_count):
+    app = make_flask_app(database)
+    with app.app_context():
+        db.create_all()
+        user = User(auth0_subject=SUBJECT, email="bench@example.com")
+        db.session.add(user)
+        db.session.flush()
+        base = datetime.datetime(2020, 1, 1)
+        db.session.execute(Expense.__table__.insert(), [
+            {
+                "user_id": user.id,
+                "date": base + datetime.timedelta(minutes=i),
+                "created_at": base + datetime.timedelta(minutes=i),
+                "description": f"Benchmark expense {i}",
+                "amount": Decimal(i % 10000) / 100 + 1,
+                "category": ("Food", "Travel", "Rent", None)[i % 4],
+            }
+            for i in range(row_count)
+        ])
+        db.session.commit()
+
+def signing_material():
+    """(bearer token, JWKS) from a throwaway RSA key, matching TestingConfig's issuer and audience."""
+    import jwt
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jwt.algorithms import RSAAlgorithm
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    public_jwk.update({"kid": TestingConfig.KID, "alg": "RS256", "use": "sig"})
+    token = jwt.encode({
+        "iss": f"https://{TestingConfig.AUTH0_DOMAIN}/",
+        "aud": TestingConfig.AUTH0_API_AUDIENCE,
+        "sub": SUBJECT,
+        "exp": int(time.time()) + 3600,
+    }, private_key, algorithm="RS256", headers={"kid": TestingConfig.KID})
+    return token, {"keys": [public_jwk]}
+
+# --- Server process ---
+def add_db_latency(latency):
+    """Delays every statement by `latency` seconds: blocking in the sync driver, awaited in the async one."""
+    import aiosqlite
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _blocking_round_trip(conn, cursor, statement, parameters, context, executemany):
+        if conn.dialect.driver == "pysqlite":
+            time.sleep(latency)
+
+    execute = aiosqlite.Cursor.execute
+
+    async def awaited_round_trip(self, *args, **kwargs):
+        await asyncio.sleep(latency)
+        return await execute(self, *args, **kwargs)
+
+    aiosqlite.Cursor.execute = awaited_round_trip
+
+def serve(args):
+    import app.auth_utils as auth_utils
+
+    with open(args.jwks) as f:
+        jwks = json.load(f)
+    auth_utils.get_jwks_from_auth0_uncached = lambda: jwks
+    if args.db_latency:
+        add_db_latency(args.db_latency / 1000)
+
+    flask_app = make_flask_app(args.database)
+    if args.serve == "waitress":
+        import waitress
+        # Queue-depth warnings are expected here: more clients than threads is the point
+        logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+        waitress.serve(flask_app, host="127.0.0.1", port=args.port, threads=args.threads, _quiet=True)
+    else:
+        import uvicorn
+        from app.asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(flask_app), host="127.0.0.1", port=args.port, log_level="warning")
+
+# --- Load generator ---
+async def client(port, request, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = next(
+                int(line.split(b":", 1)[1]) for line in head.split(b"\r\n") if line.lower().startswith(b"content-length:")
+            )
+            await reader.readexactly(length)
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def load(port, token, clients, duration):
+    request = (
+        f"GET {PATH} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Bearer {token}\r\n\r\n"
+    ).encode("ascii")
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    results = await asyncio.gather(
+        *(client(port, request, deadline, latencies, errors) for _ in range(clients)), return_exceptions=True
+    )
+    errors += [result for result in results if isinstance(result, Exception)]
+    return latencies, errors
+
+def wait_for_port(port, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start.")
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def run_server(kind, args, database, jwks_path, token):
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, os.path.abspath(__file__), "--serve", kind, "--port", str(port), "--database", database,
+        "--jwks", jwks_path, "--db-latency", str(args.db_latency), "--threads", str(args.threads),
+    ])
+    try:
+        wait_for_port(port)
+        asyncio.run(load(port, token, 1, 0.5))  # warm up JWKS, token cache and pools
+        rows = []
+        for clients in args.clients:
+            latencies, errors = asyncio.run(load(port, token, clients, args.duration))
+            rows.append((clients, latencies, errors))
+        return rows
+    finally:
+        process.terminate()
+        process.wait()
+
+def percentile(samples, fraction):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))] if samples else float("nan")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[8, 64, 256])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--db-latency", type=float, default=20.0, help="simulated ms per statement")
+    parser.add_argument("--threads", type=int, default=4, help="waitress threads (its default)")
+    parser.add_argument("--serve", choices=("waitress", "uvicorn"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    parser.add_argument("--jwks", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database = os.path.join(workdir, "bench.db")
+        seed(database, args.rows)
+        token, jwks = signing_material()
+        jwks_path = os.path.join(workdir, "jwks.json")
+        with open(jwks_path, "w") as f:
+            json.dump(jwks, f)
+
+        print(f"GET {PATH}, {args.rows} rows, {args.db_latency:g}ms per statement, {args.duration:g}s per run")
+        print(f"{'server':<22}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for kind, label in (("waitress", f"waitress ({args.threads} threads)"), ("uvicorn", "uvicorn (asgi.py)")):
+            for clients, latencies, errors in run_server(kind, args, database, jwks_path, token):
+                print(
+                    f"{label:<22}{clients:>8}{len(latencies) / args.duration:>10.0f}"
+                    f"{statistics.median(latencies) * 1000 if latencies else float('nan'):>10.1f}"
+                    f"{percentile(latencies, 0.99) * 1000:>10.1f}{len(errors):>8}"
+                )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compares the ORM read path (Expense objects + Expense.to_dict + jsonify) with the
+Core projection path (plain rows + precompiled row serializer) used by list reads.
+
+Usage (from backend/):
+    python benchmarks/bench_expense_reads.py --rows 20000 --repeat 5
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify  # noqa: E402
+
+from app.config import TestingConfig  # noqa: E402
+from app.expense_queries import EXPENSE_FIELDS, dumps, parse_fields, row_serializer, select_expense_rows  # noqa: E402
+from app.extensions import db  # noqa: E402
+from models.expense import Expense  # noqa: E402
+from models.user import User  # noqa: E402
+
+def seed(row_count):
+    user = User(auth0_subject="auth0|bench", email="bench@example.com")
+    db.session.add(user)
+    db.session.flush()
+    base = datetime.datetime(2020, 1, 1)
+    db.session.execute(Expense.__table__.insert(), [
+        {
+            "user_id": user.id,
+            "date": base + datetime.timedelta(minutes=i),
+            "created_at": base + datetime.timedelta(minutes=i),
+            "description": f"Benchmark expense {i}",
+            "amount": Decimal(i % 10000) / 100 + 1,
+            "category": ("Food", "Travel", "Rent", None)[i % 4],
+        }
+        for i in range(row_count)
+    ])
+    db.session.commit()
+    return user.id
+
+def orm_path(user_id):
+    expenses = Expense.query.filter_by(user_id=user_id).order_by(Expense.date.desc(), Expense.id.desc()).all()
+    body = jsonify([e.to_dict() for e in expenses]).get_data()
+    db.session.expunge_all()
+    return body
+
+def fast_path(user_id, fields=EXPENSE_FIELDS):
+    stmt = select_expense_rows(fields).where(Expense.user_id == user_id).order_by(Expense.date.desc(), Expense.id.desc())
+    serialize = row_serializer(fields)
+    return dumps([serialize(row) for row in db.session.execute(stmt)]).encode("utf-8")
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        user_id = seed(args.rows)
+
+        results = [
+            ("ORM + to_dict + jsonify", timed(lambda: orm_path(user_id), args.repeat)),
+            ("Core projection, all fields", timed(lambda: fast_path(user_id), args.repeat)),
+            ("Core projection, fields=id,date,amount", timed(lambda: fast_path(user_id, parse_fields("id,date,amount")), args.repeat)),
+        ]
+
+    baseline = results[0][1]
+    print(f"{args.rows} rows, median of {args.repeat} runs")
+    for name, seconds in results:
+        print(f"  {name:<40} {seconds * 1000:9.1f} ms   {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Measures payload validation against the bulk insert it feeds, to check validation never becomes the
+bottleneck of bulk ingest. The previous inline validator is kept here as the baseline.
+
+Usage (from backend/):
+    python benchmarks/bench_expense_validation.py --items 100000 --repeat 5
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+from datetime import timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from app.config import TestingConfig  # noqa: E402
+from app.expense_validation import validate_expense_data  # noqa: E402
+from app.expense_writes import insert_expenses  # noqa: E402
+from app.extensions import db  # noqa: E402
+from models.user import User  # noqa: E402
+
+def legacy_validate(data):
+    missing_fields = [field for field in ('description', 'amount') if field not in data]
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+    try:
+        amount = Decimal(str(data.get('amount')))
+        positive = amount > 0
+    except Exception:
+        raise ValueError("Invalid amount format. Must be a number.")
+    if not positive:
+        raise ValueError("Amount must be a positive number.")
+    description = data.get('description')
+    if not isinstance(description, str) or not (0 < len(description) <= 200):
+        raise ValueError("Description must be a string between 1 and 200 characters.")
+    date_str = data.get('date')
+    try:
+        expense_date = datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00')) if date_str else datetime.datetime.now(timezone.utc)
+    except ValueError:
+        raise ValueError("Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ).")
+    category = data.get('category')
+    if category and (not isinstance(category, str) or len(category) > 50):
+        raise ValueError("Category, if provided, must be a string no longer than 50 characters.")
+    return {"date": expense_date, "description": description, "amount": amount, "category": category}
+
+def payloads(count):
+    base = datetime.datetime(2020, 1, 1)
+    return [
+        {
+            "description": f"Benchmark expense {i}",
+            "amount": (f"{i % 10000 / 100 + 1:.2f}", i % 500 + 1, i % 97 + 0.5)[i % 3],
+            "date": (base + datetime.timedelta(minutes=i)).isoformat() + "Z",
+            "category": ("Food", "Travel", "Rent", None)[i % 4],
+        }
+        for i in range(count)
+    ]
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per insert_expenses call, as in /bulk_create")
+    args = parser.parse_args()
+
+    items = payloads(args.items)
+    results = [
+        ("Inline validator (previous)", timed(lambda: [legacy_validate(item) for item in items], args.repeat)),
+        ("Compiled schema", timed(lambda: [validate_expense_data(item) for item in items], args.repeat)),
+    ]
+
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    db.init_app(app)
+    rows = [validate_expense_data(item) for item in items]
+    with app.app_context():
+        db.create_all()
+        user = User(auth0_subject="auth0|bench", email="bench@example.com")
+        db.session.add(user)
+        db.session.commit()
+
+        def insert_all():
+            for start in range(0, len(rows), args.batch_size):
+                insert_expenses(db.session, user.id, rows[start:start + args.batch_size])
+            db.session.rollback()
+
+        results.append((f"insert_expenses, batches of {args.batch_size}", timed(insert_all, args.repeat)))
+
+    baseline = results[0][1]
+    print(f"{args.items} payloads, median of {args.repeat} runs")
+    for name, seconds in results:
+        print(f"  {name:<40} {seconds * 1000:9.1f} ms   {seconds / args.items * 1e6:6.2f} us/item   {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import logging
+import re
 from logging.config import fileConfig
 
 from flask import current_app
@@ -90,9 +91,24 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # the full-text search objects and the expenses partitions are managed by
+    # hand-written migrations and commands, not the models, so autogenerate
+    # must not try to drop them
+    def include_object(object, name, type_, reflected, compare_to):
+        if reflected and compare_to is None:
+            if type_ == 'table' and name.startswith('expenses_fts'):
+                return False
+            if type_ == 'table' and (name == 'expenses_default' or re.match(r'expenses_y\d{4}', name)):
+                return False
+            if name in ('search_vector', 'ix_expenses_search_vector'):
+                return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
@@ -0,0 +1,26 @@
+"""Added (user_id, date, id) index to expenses for keyset pagination
+
+Revision ID: 3b9c1f7d2a64
+Revises: e5d53dbf2f00
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9c1f7d2a64'
+down_revision = 'e5d53dbf2f00'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.create_index('ix_expenses_user_id_date_id', ['user_id', 'date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.drop_index('ix_expenses_user_id_date_id')
@@ -0,0 +1,66 @@
+"""Added full-text search index over expense descriptions and categories
+
+Revision ID: 5e9a0d3c7b16
+Revises: c71a5e0b9d28
+Create Date: 2026-10-18 13:41:05.226817
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9a0d3c7b16'
+down_revision = 'c71a5e0b9d28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # Generated column: Postgres keeps it current on every write, no triggers needed
+        op.execute(
+            "ALTER TABLE expenses ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(category, '')), 'B')) STORED"
+        )
+        op.execute("CREATE INDEX ix_expenses_search_vector ON expenses USING gin (search_vector)")
+
+    elif dialect == 'sqlite':
+        # External-content FTS5 table: stores only the index, kept in step by triggers.
+        # A later batch_alter_table on expenses recreates the table and must recreate these triggers.
+        op.execute(
+            "CREATE VIRTUAL TABLE expenses_fts USING fts5("
+            "description, category, content='expenses', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER expenses_fts_ai AFTER INSERT ON expenses BEGIN "
+            "INSERT INTO expenses_fts(rowid, description, category) VALUES (new.id, new.description, new.category); END"
+        )
+        op.execute(
+            "CREATE TRIGGER expenses_fts_ad AFTER DELETE ON expenses BEGIN "
+            "INSERT INTO expenses_fts(expenses_fts, rowid, description, category) "
+            "VALUES ('delete', old.id, old.description, old.category); END"
+        )
+        op.execute(
+            "CREATE TRIGGER expenses_fts_au AFTER UPDATE OF description, category ON expenses BEGIN "
+            "INSERT INTO expenses_fts(expenses_fts, rowid, description, category) "
+            "VALUES ('delete', old.id, old.description, old.category); "
+            "INSERT INTO expenses_fts(rowid, description, category) VALUES (new.id, new.description, new.category); END"
+        )
+        # Index the rows that already exist
+        op.execute("INSERT INTO expenses_fts(expenses_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_expenses_search_vector")
+        op.execute("ALTER TABLE expenses DROP COLUMN IF EXISTS search_vector")
+
+    elif dialect == 'sqlite':
+        for trigger in ('expenses_fts_au', 'expenses_fts_ad', 'expenses_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS expenses_fts")
@@ -0,0 +1,27 @@
+"""Stored empty expense categories as NULL
+
+Revision ID: 6f1d8b3a2c47
+Revises: 9c2b7e4f1a30
+Create Date: 2026-10-18 19:04:12.731846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1d8b3a2c47'
+down_revision = '9c2b7e4f1a30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Writes now store "" as NULL; the daily rollups already counted both as uncategorized
+    expenses = sa.table('expenses', sa.column('category', sa.String(50)))
+    op.execute(expenses.update().where(expenses.c.category == '').values(category=None))
+
+
+def downgrade():
+    # Which NULLs were once "" is not recorded; they stay NULL
+    pass
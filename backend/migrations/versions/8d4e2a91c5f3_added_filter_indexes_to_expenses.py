@@ -0,0 +1,39 @@
+"""Added category, amount and description filter indexes to expenses
+
+Revision ID: 8d4e2a91c5f3
+Revises: 3b9c1f7d2a64
+Create Date: 2026-10-18 10:02:17.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4e2a91c5f3'
+down_revision = '3b9c1f7d2a64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.create_index('ix_expenses_user_id_category_date', ['user_id', 'category', 'date'], unique=False)
+        batch_op.create_index('ix_expenses_user_id_amount', ['user_id', 'amount'], unique=False)
+
+    # ILIKE '%term%' can only use an index through pg_trgm
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_expenses_description_trgm', 'expenses', ['description'], unique=False,
+            postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_expenses_description_trgm', table_name='expenses')
+
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.drop_index('ix_expenses_user_id_amount')
+        batch_op.drop_index('ix_expenses_user_id_category_date')
@@ -0,0 +1,107 @@
+"""Partitioned expenses by date on Postgres
+
+Revision ID: 9c2b7e4f1a30
+Revises: a4d7f2c9e513
+Create Date: 2026-10-18 17:26:31.508734
+
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2b7e4f1a30'
+down_revision = 'a4d7f2c9e513'
+branch_labels = None
+depends_on = None
+
+# Stored columns; search_vector is generated and cannot be copied
+COLUMNS = 'id, user_id, date, description, amount, category, created_at'
+
+
+def _create_indexes():
+    # Created on the parent, so every partition, present and future, gets its own copy
+    op.create_index('ix_expenses_user_id', 'expenses', ['user_id'])
+    op.create_index('ix_expenses_date', 'expenses', ['date'])
+    op.create_index('ix_expenses_created_at', 'expenses', ['created_at'])
+    op.create_index('ix_expenses_user_id_date_id', 'expenses', ['user_id', 'date', 'id'])
+    op.create_index('ix_expenses_user_id_category_date', 'expenses', ['user_id', 'category', 'date'])
+    op.create_index('ix_expenses_user_id_amount', 'expenses', ['user_id', 'amount'])
+    op.create_index(
+        'ix_expenses_description_trgm', 'expenses', ['description'],
+        postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}
+    )
+    op.execute("CREATE INDEX ix_expenses_search_vector ON expenses USING gin (search_vector)")
+
+
+def _replace_expenses(old_name, partition_by, primary_key):
+    """Moves expenses to `old_name` and recreates it, with the same columns, defaults and sequence."""
+    op.execute(f"ALTER TABLE expenses RENAME TO {old_name}")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT expenses_pkey TO {old_name}_pkey")
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE expenses_id_seq OWNED BY NONE")
+    op.execute(
+        f"CREATE TABLE expenses (LIKE {old_name} INCLUDING DEFAULTS INCLUDING GENERATED){partition_by}"
+    )
+    op.execute(f"ALTER TABLE expenses ADD CONSTRAINT expenses_pkey PRIMARY KEY ({primary_key})")
+    op.execute("ALTER TABLE expenses ADD CONSTRAINT expenses_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+
+
+def _finish_copy(old_name):
+    op.execute(f"INSERT INTO expenses ({COLUMNS}) SELECT {COLUMNS} FROM {old_name}")
+    op.execute(f"DROP TABLE {old_name}")
+    op.execute("ALTER SEQUENCE expenses_id_seq OWNED BY expenses.id")
+    _create_indexes()
+
+
+def _period_start(day, interval):
+    return day.replace(day=1) if interval == 'month' else day.replace(month=1, day=1)
+
+
+def _next_period(start, interval):
+    if interval == 'year':
+        return start.replace(year=start.year + 1)
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+
+def upgrade():
+    # Range partitioning is Postgres-only; other databases keep the plain table
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    interval = current_app.config.get('EXPENSES_PARTITION_INTERVAL', 'month')
+    ahead = current_app.config.get('EXPENSES_PARTITIONS_AHEAD', 3)
+    if interval not in ('month', 'year'):
+        raise ValueError(f"EXPENSES_PARTITION_INTERVAL must be month or year, not {interval!r}.")
+
+    # A partitioned table's primary key has to include the partition key
+    _replace_expenses('expenses_unpartitioned', ' PARTITION BY RANGE (date)', 'id, date')
+
+    today = datetime.date.today()
+    first, last = op.get_bind().execute(sa.text("SELECT min(date), max(date) FROM expenses_unpartitioned")).one()
+    start = _period_start(first.date() if first else today, interval)
+    end = _period_start(max(last.date() if last else today, today), interval)
+    for _ in range(ahead + 1):
+        end = _next_period(end, interval)
+    while start < end:
+        following = _next_period(start, interval)
+        name = f"expenses_y{start.year}" if interval == 'year' else f"expenses_y{start.year}m{start.month:02d}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF expenses FOR VALUES FROM ('{start.isoformat()}') TO ('{following.isoformat()}')"
+        )
+        start = following
+    op.execute("CREATE TABLE expenses_default PARTITION OF expenses DEFAULT")
+
+    _finish_copy('expenses_unpartitioned')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    _replace_expenses('expenses_partitioned', '', 'id')
+    # Dropping the parent drops every partition with it
+    _finish_copy('expenses_partitioned')
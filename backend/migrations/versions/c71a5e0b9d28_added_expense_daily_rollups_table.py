@@ -0,0 +1,39 @@
+"""Added expense_daily_rollups table
+
+Revision ID: c71a5e0b9d28
+Revises: 8d4e2a91c5f3
+Create Date: 2026-10-18 11:26:53.552730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71a5e0b9d28'
+down_revision = '8d4e2a91c5f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('expense_daily_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('expense_count', sa.Integer(), nullable=False),
+    sa.Column('amount_total', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'category')
+    )
+
+    # Backfill from existing expenses (same statement as `flask rollups rebuild`)
+    op.execute(
+        "INSERT INTO expense_daily_rollups (user_id, day, category, expense_count, amount_total) "
+        "SELECT user_id, date(date), coalesce(category, ''), count(*), sum(amount) "
+        "FROM expenses GROUP BY user_id, date(date), coalesce(category, '')"
+    )
+
+
+def downgrade():
+    op.drop_table('expense_daily_rollups')
@@ -1,4 +1,6 @@
 from .user import User
 from .expense import Expense
+from .expense_daily_rollup import ExpenseDailyRollup
+from .idempotency_key import IdempotencyKey
 
-__all__ = ['User', 'Expense']
\ No newline at end of file
+__all__ = ['User', 'Expense', 'ExpenseDailyRollup', 'IdempotencyKey']
\ No newline at end of file
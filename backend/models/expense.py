@@ -3,7 +3,21 @@ from datetime import timezone
 from app.extensions import db
 
 class Expense(db.Model):
+    # On Postgres the table is range-partitioned by date (migration 9c2b7e4f1a30, app/partitions.py),
+    # with primary key (id, date); ids still come from one sequence and stay unique
     __tablename__ = 'expenses'
+    __table_args__ = (
+        # Serves keyset pagination of a user's expenses ordered by (date DESC, id DESC)
+        db.Index('ix_expenses_user_id_date_id', 'user_id', 'date', 'id'),
+        # Serve the category and amount filters of list/aggregate queries
+        db.Index('ix_expenses_user_id_category_date', 'user_id', 'category', 'date'),
+        db.Index('ix_expenses_user_id_amount', 'user_id', 'amount'),
+        # Trigram index for case-insensitive description substring search (Postgres only, needs pg_trgm)
+        db.Index(
+            'ix_expenses_description_trgm', 'description',
+            postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
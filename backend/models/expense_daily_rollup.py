@@ -0,0 +1,15 @@
+from app.extensions import db
+
+class ExpenseDailyRollup(db.Model):
+    """Per-user, per-day, per-category count and sum of expenses, maintained alongside every expense write."""
+    __tablename__ = 'expense_daily_rollups'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    # '' stands for "no category": primary key columns can't be NULL
+    category = db.Column(db.String(50), primary_key=True, default='')
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
+    amount_total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ExpenseDailyRollup {self.user_id} {self.day} {self.category!r} ({self.expense_count}, {self.amount_total})>'
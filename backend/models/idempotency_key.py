@@ -0,0 +1,20 @@
+from app.extensions import db
+
+class IdempotencyKey(db.Model):
+    """
+    Durable record of a write made with an Idempotency-Key header, used when the shared cache is unavailable.
+    A row with no status_code is a reservation held by the request still processing it.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    auth0_subject = db.Column(db.String(128), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    mimetype = db.Column(db.String(100), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.auth0_subject} {self.key!r} ({self.status_code})>'
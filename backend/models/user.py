@@ -8,6 +8,7 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=True)
 
     expenses = db.relationship('Expense', backref='user', lazy=True, cascade="all, delete-orphan")
+    daily_rollups = db.relationship('ExpenseDailyRollup', lazy=True, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f'<User {self.email or self.auth0_subject}>'
\ No newline at end of file
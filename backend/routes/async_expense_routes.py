@@ -0,0 +1,358 @@
+import functools
+
+import anyio
+from flask import current_app
+from sqlalchemy import select
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from werkzeug.http import parse_etags, quote_etag
+
+from app.api_helpers import get_or_create_internal_user_id
+from app.auth_utils import requires_auth_async
+from app.caching import run_shared_cache_call
+from app.expense_cache import cache_key, etag, get_cached, set_cached
+from app.expense_queries import (
+    EXPENSE_FIELDS, build_aggregate_query, dumps, filter_clauses, keyset_after, parse_date_hint, parse_expense_filters, parse_fields,
+    parse_group_by, parse_ids, row_position, row_serializer, select_expense_rows, serialize_aggregate_rows
+)
+from app.expense_search import build_search_query, parse_search_terms
+from app.identity_map import identity_map
+from app.pagination import decode_cursor, encode_cursor, parse_limit, parse_offset
+from app.rollups import build_rollup_aggregate_query, rollups_can_serve
+from models.expense import Expense
+from models.user import User
+from routes.expense_routes import EXPORT_FORMATS
+
+# Async twins of the expense read routes in expense_routes.py, served by asgi.py on an async engine.
+# Responses, ETags and cache entries are identical to the WSGI routes, so both deployments can share one cache.
+# Shared cache (Redis) calls go through run_shared_cache_call, off the event loop.
+# Writes, and every other route, stay on the Flask app.
+
+USER_NOT_FOUND = "Authenticated user not found in local database."
+
+class FlaskAppContext:
+    """Runs an ASGI route, streamed body included, inside an app context of the Flask app (for config and caches)."""
+
+    def __init__(self, app, flask_app):
+        self.app = app
+        self.flask_app = flask_app
+
+    async def __call__(self, scope, receive, send):
+        with self.flask_app.app_context():
+            await self.app(scope, receive, send)
+
+async def _internal_user_id(session, claims):
+    auth0_subject_id = claims.get("sub")
+    if not auth0_subject_id:
+        return None
+    user_id = await run_shared_cache_call(identity_map.get, auth0_subject_id)
+    if user_id is not None:
+        return user_id
+
+    user_id = (await session.execute(select(User.id).where(User.auth0_subject == auth0_subject_id))).scalar()
+    if user_id is not None:
+        await run_shared_cache_call(identity_map.set, auth0_subject_id, user_id)
+        return user_id
+    # First request from a new user: provisioned by the WSGI app's upsert, on a worker thread
+    return await anyio.to_thread.run_sync(functools.partial(
+        get_or_create_internal_user_id, auth0_subject_id, email=claims.get("email"), create_if_missing=True
+    ))
+
+def _error(message, status=400):
+    return JSONResponse({"error": message}, status_code=status)
+
+def _query_params(request):
+    return {name: request.query_params.getlist(name) for name in request.query_params}
+
+def _client_has_current(request, tag):
+    return tag is not None and parse_etags(request.headers.get("if-none-match")).contains_weak(tag)
+
+def _with_etag(response, tag):
+    if tag:
+        response.headers["ETag"] = quote_etag(tag, weak=True)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def _not_modified(tag):
+    return _with_etag(Response(status_code=304), tag)
+
+def _json_response(body, tag):
+    return _with_etag(Response(body, media_type="application/json"), tag)
+
+async def _cached_body(user_id, namespace, params):
+    """(cache key, cached body or None) for a per-user read; both steps may read the shared cache."""
+    def lookup():
+        key = cache_key(user_id, namespace, params)
+        return key, get_cached(key, namespace)
+    return await run_shared_cache_call(lookup)
+
+def _sessions(request):
+    return request.app.state.db_sessions
+
+def _dialect_name(request):
+    return request.app.state.db_engine.dialect.name
+
+@requires_auth_async
+async def get_expense_by_id(request):
+    expense_id = request.path_params["expense_id"]
+    async with _sessions(request)() as session:
+        fintrack_user_id = await _internal_user_id(session, request.state.current_user)
+        if not fintrack_user_id:
+            return _error(USER_NOT_FOUND, 404)
+
+        try:
+            date_hint = parse_date_hint(request.query_params.get("date"))
+        except ValueError as e:
+            return _error(str(e))
+
+        params = {"id": expense_id}
+        if date_hint:
+            params["date"] = request.query_params["date"]
+        tag = await run_shared_cache_call(etag, fintrack_user_id, "by_id", params)
+        if _client_has_current(request, tag):
+            return _not_modified(tag)
+
+        stmt = select_expense_rows(EXPENSE_FIELDS).where(
+            Expense.id == expense_id, Expense.user_id == fintrack_user_id, *date_hint
+        )
+        row = (await session.execute(stmt)).first()
+
+    return _json_response(dumps(row_serializer(EXPENSE_FIELDS)(row) if row else []), tag)
+
+@requires_auth_async
+async def get_expenses_by_ids(request):
+    async with _sessions(request)() as session:
+        fintrack_user_id = await _internal_user_id(session, request.state.current_user)
+        if not fintrack_user_id:
+            return _error(USER_NOT_FOUND, 404)
+
+        try:
+            ids = parse_ids(request.query_params.getlist("ids"), current_app.config.get("EXPENSES_BATCH_MAX_IDS", 100))
+            fields = parse_fields(request.query_params.get("fields"))
+        except ValueError as e:
+            return _error(str(e))
+
+        tag = await run_shared_cache_call(etag, fintrack_user_id, "by_ids", _query_params(request))
+        if _client_has_current(request, tag):
+            return _not_modified(tag)
+
+        stmt = select_expense_rows(fields).where(Expense.id.in_(set(ids)), Expense.user_id == fintrack_user_id)
+        serialize = row_serializer(fields)
+        id_position = row_position(fields, "id")
+        found = {row[id_position]: serialize(row) for row in await session.execute(stmt)}
+
+    results = [found.get(expense_id) or {"id": expense_id, "error": "not_found"} for expense_id in ids]
+    return _json_response(dumps({"results": results}), tag)
+
+@requires_auth_async
+async def get_all_expenses(request):
+    args = request.query_params
+    async with _sessions(request)() as session:
+        fintrack_user_id = await _internal_user_id(session, request.state.current_user)
+        if not fintrack_user_id:
+            return _error(USER_NOT_FOUND, 404)
+
+        try:
+            fields = parse_fields(args.get("fields"))
+            filters = parse_expense_filters(args)
+        except ValueError as e:
+            return _error(str(e))
+
+        tag = await run_shared_cache_call(etag, fintrack_user_id, "get_all", _query_params(request))
+        if _client_has_current(request, tag):
+            return _not_modified(tag)
+
+        list_all = args.get("all", "").lower() == "true"
+        if not list_all:
+            try:
+                limit = parse_limit(
+                    args.get("limit"),
+                    default=current_app.config.get("EXPENSES_PAGE_SIZE_DEFAULT", 50),
+                    maximum=current_app.config.get("EXPENSES_PAGE_SIZE_MAX", 500)
+                )
+                cursor = args.get("cursor")
+                after = decode_cursor(cursor) if cursor else None
+            except ValueError as e:
+                return _error(str(e))
+
+        params = dict(filters, fields=fields, all=True) if list_all else dict(filters, fields=fields, limit=limit, cursor=cursor)
+        namespace = "filter" if filters else "list"
+        key, cached_body = await _cached_body(fintrack_user_id, namespace, params)
+        if cached_body is not None:
+            return _json_response(cached_body, tag)
+
+        serialize = row_serializer(fields)
+        stmt = (
+            select_expense_rows(fields)
+            .where(Expense.user_id == fintrack_user_id, *filter_clauses(filters))
+            .order_by(Expense.date.desc(), Expense.id.desc())
+        )
+
+        if list_all:
+            rows = (await session.execute(stmt)).all()
+            body = dumps([serialize(row) for row in rows])
+            await run_shared_cache_call(set_cached, key, body)
+            return _json_response(body, tag)
+
+        if after:
+            stmt = stmt.where(keyset_after(after))
+        rows = (await session.execute(stmt.limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[row_position(fields, "date")], last[row_position(fields, "id")])
+
+    body = dumps({"items": [serialize(row) for row in rows], "next_cursor": next_cursor})
+    await run_shared_cache_call(set_cached, key, body)
+    return _json_response(body, tag)
+
+@requires_auth_async
+async def aggregate_expenses(request):
+    async with _sessions(request)() as session:
+        fintrack_user_id = await _internal_user_id(session, request.state.current_user)
+        if not fintrack_user_id:
+            return _error(USER_NOT_FOUND, 404)
+
+        try:
+            period, by_category = parse_group_by(request.query_params.get("group_by"))
+            filters = parse_expense_filters(request.query_params)
+        except ValueError as e:
+            return _error(str(e))
+
+        tag = await run_shared_cache_call(etag, fintrack_user_id, "aggregate", _query_params(request))
+        if _client_has_current(request, tag):
+            return _not_modified(tag)
+
+        key, cached_body = await _cached_body(
+            fintrack_user_id, "aggregate", dict(filters, period=period, by_category=by_category)
+        )
+        if cached_body is not None:
+            return _json_response(cached_body, tag)
+
+        build_query = build_rollup_aggregate_query if rollups_can_serve(filters) else build_aggregate_query
+        stmt = build_query(_dialect_name(request), fintrack_user_id, period, by_category, filters)
+        rows = (await session.execute(stmt)).all()
+
+    group_by = [name for name, enabled in (("period", bool(period)), ("category", by_category)) if enabled]
+    body = dumps({
+        "group_by": group_by,
+        "period": period,
+        "results": serialize_aggregate_rows(rows, period, by_category)
+    })
+    await run_shared_cache_call(set_cached, key, body)
+    return _json_response(body, tag)
+
+@requires_auth_async
+async def search_expenses(request):
+    args = request.query_params
+    async with _sessions(request)() as session:
+        fintrack_user_id = await _internal_user_id(session, request.state.current_user)
+        if not fintrack_user_id:
+            return _error(USER_NOT_FOUND, 404)
+
+        try:
+            terms = parse_search_terms(args.get("q"))
+            fields = parse_fields(args.get("fields"))
+            filters = parse_expense_filters(args)
+            filters.pop("q", None)
+            limit = parse_limit(
+                args.get("limit"),
+                default=current_app.config.get("EXPENSES_PAGE_SIZE_DEFAULT", 50),
+                maximum=current_app.config.get("EXPENSES_PAGE_SIZE_MAX", 500)
+            )
+            offset = parse_offset(args.get("offset"), current_app.config.get("EXPENSES_SEARCH_MAX_OFFSET", 1000))
+        except ValueError as e:
+            return _error(str(e))
+
+        tag = await run_shared_cache_call(etag, fintrack_user_id, "search", _query_params(request))
+        if _client_has_current(request, tag):
+            return _not_modified(tag)
+
+        key, cached_body = await _cached_body(
+            fintrack_user_id, "search", dict(filters, terms=terms, fields=fields, limit=limit, offset=offset)
+        )
+        if cached_body is not None:
+            return _json_response(cached_body, tag)
+
+        stmt = build_search_query(_dialect_name(request), fintrack_user_id, terms, fields, filter_clauses(filters))
+        rows = (await session.execute(stmt.limit(limit + 1).offset(offset))).all()
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    serialize = row_serializer(fields)
+    body = dumps({"items": [serialize(row) for row in rows], "next_offset": next_offset})
+    await run_shared_cache_call(set_cached, key, body)
+    return _json_response(body, tag)
+
+async def _encode_export(rows, serialize, export_format):
+    """Async twin of expense_routes._encode_export, over a streamed result."""
+    if export_format == "ndjson":
+        async for row in rows:
+            yield dumps(serialize(row)) + "\n"
+        return
+
+    yield "["
+    separator = ""
+    async for row in rows:
+        yield separator + dumps(serialize(row))
+        separator = ","
+    yield "]"
+
+@requires_auth_async
+async def export_expenses(request):
+    async with _sessions(request)() as session:
+        fintrack_user_id = await _internal_user_id(session, request.state.current_user)
+    if not fintrack_user_id:
+        return _error(USER_NOT_FOUND, 404)
+
+    export_format = request.query_params.get("format", "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        return _error(f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}.")
+
+    try:
+        fields = parse_fields(request.query_params.get("fields"))
+        filters = parse_expense_filters(request.query_params)
+    except ValueError as e:
+        return _error(str(e))
+
+    stmt = (
+        select_expense_rows(fields)
+        .where(Expense.user_id == fintrack_user_id, *filter_clauses(filters))
+        .order_by(Expense.date.desc(), Expense.id.desc())
+        .execution_options(yield_per=current_app.config.get("EXPENSES_EXPORT_BATCH_SIZE", 1000))
+    )
+    serialize = row_serializer(fields)
+    sessions = _sessions(request)
+
+    # A slow client holds only this coroutine and one connection, not a server thread
+    async def generate():
+        async with sessions() as session:
+            async for chunk in _encode_export(await session.stream(stmt), serialize, export_format):
+                yield chunk
+
+    media_type, filename = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        generate(), media_type=media_type, headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+_ROUTES = (
+    ("/get_by_id/{expense_id:int}", get_expense_by_id),
+    ("/get_by_ids", get_expenses_by_ids),
+    ("/get_all", get_all_expenses),
+    ("/aggregate", aggregate_expenses),
+    ("/search", search_expenses),
+    ("/export", export_expenses),
+)
+
+def expense_read_routes(flask_app, prefix="/api/expenses"):
+    middleware = [Middleware(FlaskAppContext, flask_app=flask_app)]
+    return [
+        Route(f"{prefix}{path}", endpoint, methods=["GET"], middleware=middleware)
+        for path, endpoint in _ROUTES
+    ]
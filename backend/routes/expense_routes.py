@@ -1,16 +1,29 @@
-from flask import Blueprint, jsonify, g, request
+import io
+from flask import Blueprint, Response, current_app, jsonify, g, request, stream_with_context
 from app.auth_utils import requires_auth
 from models.expense import Expense
 from app.api_helpers import get_or_create_internal_user_id
-from decimal import Decimal
-import datetime
-from datetime import timezone
+from app.pagination import decode_cursor, encode_cursor, parse_limit, parse_offset
+from app.expense_queries import (
+    EXPENSE_FIELDS, build_aggregate_query, dumps, filter_clauses, keyset_after, parse_date_hint, parse_expense_filters, parse_fields,
+    parse_group_by, parse_ids, row_position, row_serializer, select_expense_rows, serialize_aggregate_rows
+)
+from app.expense_cache import bump_data_version, cache_key, etag, get_cached, set_cached
+from app.expense_search import build_search_query, parse_search_terms
+from app.expense_validation import ExpenseValidationError, validate_expense_data, validate_expense_update
+from app.expense_writes import delete_expense_rows, insert_expenses, update_expense_row
+from app.idempotency import idempotent
+from app.db_routing import reads_from_replica
+from app.profiling import profile_phase
+from app.importers import EXPENSE_SIGNS, FORMATS, open_statement, run_import
+from app.rollups import build_rollup_aggregate_query, rollups_can_serve
 from app.extensions import db
 
 expense_bp = Blueprint('expenses', __name__)
 
 @expense_bp.route("/create", methods=['POST'])
 @requires_auth
+@idempotent
 def create_expense():
     auth0_subject_id = g.current_user.get("sub")
     email = g.current_user.get("email")
@@ -28,56 +41,194 @@ def create_expense():
         return jsonify({"error": "Request body must be JSON"}), 400
 
     # --- Data Validation ---
-    required_fields = ['description', 'amount']
-    missing_fields = [field for field in required_fields if field not in data]
-    if missing_fields:
-        return jsonify({"error": f"Missing required fields: {', '.join(missing_fields)}"}), 400
-
-    description = data.get('description')
-    amount_str = data.get('amount')
-    category = data.get('category')  # Optional
-    date_str = data.get('date')     # Optional, defaults to now if not provided
-    
-    try:
-        amount = Decimal(str(amount_str))
-        if amount <= 0:  # Assuming expenses must be positive
-            return jsonify({"error": "Amount must be a positive number."}), 400
-    except Exception:
-        return jsonify({"error": "Invalid amount format. Must be a number."}), 400
-
-    if not isinstance(description, str) or not (0 < len(description) <= 200):
-        return jsonify({"error": "Description must be a string between 1 and 200 characters."}), 400
-
-    expense_date = datetime.datetime.now(timezone.utc)  # Default to now
-    if date_str:
-        try:
-            expense_date = datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except ValueError:
-            return jsonify({"error": "Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ)."}), 400
-
-    if category and (not isinstance(category, str) or len(category) > 50):
-        return jsonify({"error": "Category, if provided, must be a string no longer than 50 characters."}), 400
+    try:
+        values = validate_expense_data(data)
+    except ExpenseValidationError as e:
+        return jsonify({"error": str(e), "fields": e.errors}), 400
 
     # --- Create Expense ---
     try:
-        new_expense = Expense(
-            user_id=fintrack_user_id,
-            date=expense_date,
-            description=description,
-            amount=amount,
-            category=category
-        )
+        new_expense = Expense(user_id=fintrack_user_id, **values)
         db.session.add(new_expense)
         db.session.commit()
+        bump_data_version(fintrack_user_id)
         return jsonify(new_expense.to_dict()), 201  # 201 Created
     except Exception as e:
         db.session.rollback()
-        print(f"Error creating expense: {e}")  # Basic logging
+        current_app.logger.error(f"Error creating expense: {e}")
         return jsonify({"error": "An error occurred while creating the expense."}), 500
 
+BULK_MODES = ("atomic", "partial")
+
+@expense_bp.route("/bulk_create", methods=['POST'])
+@requires_auth
+@idempotent
+def bulk_create_expenses():
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    mode = request.args.get("mode", "atomic").lower()
+    if mode not in BULK_MODES:
+        return jsonify({"error": f"Unsupported mode. Use one of: {', '.join(BULK_MODES)}."}), 400
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Request body must be a non-empty JSON array of expenses."}), 400
+    max_items = current_app.config.get("EXPENSES_BULK_MAX_ITEMS", 500)
+    if len(data) > max_items:
+        return jsonify({"error": f"At most {max_items} expenses may be created at once."}), 400
+
+    # Same rules as /create, reported per item by its index in the request
+    valid, errors = [], []
+    for index, item in enumerate(data):
+        if not isinstance(item, dict) or not item:
+            errors.append({"index": index, "error": "Each expense must be a non-empty JSON object."})
+            continue
+        try:
+            valid.append((index, validate_expense_data(item)))
+        except ExpenseValidationError as e:
+            errors.append({"index": index, "error": str(e), "fields": e.errors})
+
+    # atomic: any invalid item rejects the whole batch; partial: valid items are created regardless
+    if not valid or (errors and mode == "atomic"):
+        return jsonify({"error": "No expenses were created.", "created": [], "errors": errors}), 400
+
+    try:
+        ids = insert_expenses(db.session, fintrack_user_id, [values for _, values in valid])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error bulk creating expenses: {e}")
+        return jsonify({"error": "An error occurred while creating the expenses."}), 500
+
+    bump_data_version(fintrack_user_id)
+    created = [{"index": index, "id": expense_id} for (index, _), expense_id in zip(valid, ids)]
+    return jsonify({"created": created, "errors": errors}), 201
+
+
+@expense_bp.route("/update/<int:expense_id>", methods=['PATCH'])
+@requires_auth
+@idempotent
+def update_expense(expense_id):
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be JSON"}), 400
+
+    try:
+        values = validate_expense_update(data)
+    except ExpenseValidationError as e:
+        return jsonify({"error": str(e), "fields": e.errors}), 400
+    try:
+        date_hint = parse_date_hint(request.args.get("date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # One ownership-scoped UPDATE ... RETURNING; another user's expense is indistinguishable from a missing one
+    try:
+        row = update_expense_row(db.session, fintrack_user_id, expense_id, values, clauses=date_hint)
+        if row is None:
+            db.session.rollback()
+            return jsonify({"error": "Expense not found."}), 404
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error updating expense {expense_id}: {e}")
+        return jsonify({"error": "An error occurred while updating the expense."}), 500
+
+    bump_data_version(fintrack_user_id)
+    return jsonify(row_serializer(EXPENSE_FIELDS)(row)), 200
+
+@expense_bp.route("/delete/<int:expense_id>", methods=['DELETE'])
+@requires_auth
+@idempotent
+def delete_expense(expense_id):
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    try:
+        date_hint = parse_date_hint(request.args.get("date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = delete_expense_rows(db.session, fintrack_user_id, [Expense.id == expense_id, *date_hint])
+        if not rows:
+            db.session.rollback()
+            return jsonify({"error": "Expense not found."}), 404
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error deleting expense {expense_id}: {e}")
+        return jsonify({"error": "An error occurred while deleting the expense."}), 500
+
+    bump_data_version(fintrack_user_id)
+    return jsonify(row_serializer(EXPENSE_FIELDS)(rows[0])), 200
+
+@expense_bp.route("/delete", methods=['DELETE'])
+@requires_auth
+@idempotent
+def delete_expenses_by_filter():
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    try:
+        filters = parse_expense_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # Guard against wiping everything by forgetting the filters
+    if not filters and request.args.get("all", "").lower() != "true":
+        return jsonify({"error": "Give at least one filter, or all=true to delete every expense."}), 400
+
+    try:
+        rows = delete_expense_rows(db.session, fintrack_user_id, filter_clauses(filters), fields=("id",))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error bulk deleting expenses: {e}")
+        return jsonify({"error": "An error occurred while deleting the expenses."}), 500
+
+    if rows:
+        bump_data_version(fintrack_user_id)
+    return jsonify({"deleted": len(rows)}), 200
 
 @expense_bp.route("/get_by_id/<int:expense_id>", methods=['GET'])
 @requires_auth
+@reads_from_replica
 def get_expense_by_id(expense_id): # expense_id is now a path parameter
     auth0_subject_id = g.current_user.get("sub")
     email = g.current_user.get("email")
@@ -90,16 +241,64 @@ def get_expense_by_id(expense_id): # expense_id is now a path parameter
     if not fintrack_user_id:
         return jsonify({"error": "Authenticated user not found in local database."}), 404
 
+    try:
+        date_hint = parse_date_hint(request.args.get("date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    params = {"id": expense_id}
+    if date_hint:
+        params["date"] = request.args["date"]
+    tag = etag(fintrack_user_id, "by_id", params)
+    if _client_has_current(tag):
+        return _not_modified(tag)
+
     # filter by both expense_id AND user_id for DB-layer security.
-    expense = Expense.query.filter_by(id=expense_id, user_id=fintrack_user_id).first()
+    expense = Expense.query.filter_by(id=expense_id, user_id=fintrack_user_id).filter(*date_hint).first()
 
     if expense:
-        return jsonify(expense.to_dict()), 200
+        return _with_etag(jsonify(expense.to_dict()), tag), 200
     else:
-        return jsonify([]), 200
+        return _with_etag(jsonify([]), tag), 200
+
+@expense_bp.route("/get_by_ids", methods=['GET'])
+@requires_auth
+@reads_from_replica
+def get_expenses_by_ids():
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    try:
+        ids = parse_ids(request.args.getlist("ids"), current_app.config.get("EXPENSES_BATCH_MAX_IDS", 100))
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tag = etag(fintrack_user_id, "by_ids", _query_params())
+    if _client_has_current(tag):
+        return _not_modified(tag)
+
+    # One query for the whole batch; the user_id condition keeps other users' rows out
+    stmt = select_expense_rows(fields).where(Expense.id.in_(set(ids)), Expense.user_id == fintrack_user_id)
+    serialize = row_serializer(fields)
+    id_position = row_position(fields, "id")
+    found = {row[id_position]: serialize(row) for row in db.session.execute(stmt)}
+
+    # Missing and other users' ids share one marker, so a response never reveals that an id exists
+    results = [found.get(expense_id) or {"id": expense_id, "error": "not_found"} for expense_id in ids]
+    return _with_etag(_json_response({"results": results}), tag)
 
 @expense_bp.route("/get_all", methods=['GET'])
 @requires_auth
+@reads_from_replica
 def get_all_expenses():
     auth0_subject_id = g.current_user.get("sub")
     email = g.current_user.get("email")
@@ -112,9 +311,299 @@ def get_all_expenses():
     if not fintrack_user_id:
         return jsonify({"error": "Authenticated user not found in local database."}), 404
 
-    expenses = Expense.query.filter_by(user_id=fintrack_user_id).order_by(Expense.date.desc()).all()
-    if expenses:
-        return jsonify([e.to_dict() for e in expenses]), 200
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        filters = parse_expense_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Answered before any expenses query: the tag only changes when the user writes
+    tag = etag(fintrack_user_id, "get_all", _query_params())
+    if _client_has_current(tag):
+        return _not_modified(tag)
+
+    list_all = request.args.get("all", "").lower() == "true"
+    if not list_all:
+        try:
+            limit = parse_limit(
+                request.args.get("limit"),
+                default=current_app.config.get("EXPENSES_PAGE_SIZE_DEFAULT", 50),
+                maximum=current_app.config.get("EXPENSES_PAGE_SIZE_MAX", 500)
+            )
+            cursor = request.args.get("cursor")
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    # Read-through cache of the serialized page under the user's data version, so any write invalidates it
+    params = dict(filters, fields=fields, all=True) if list_all else dict(filters, fields=fields, limit=limit, cursor=cursor)
+    namespace = "filter" if filters else "list"
+    key = cache_key(fintrack_user_id, namespace, params)
+    cached_body = get_cached(key, namespace)
+    if cached_body is not None:
+        return _with_etag(_json_response(cached_body), tag)
+
+    # Plain-row projection: no ORM hydration, precompiled row serializer
+    serialize = row_serializer(fields)
+    stmt = (
+        select_expense_rows(fields)
+        .where(Expense.user_id == fintrack_user_id, *filter_clauses(filters))
+        .order_by(Expense.date.desc(), Expense.id.desc())
+    )
+
+    # Unpaginated listing is kept for callers that explicitly opt in with ?all=true
+    if list_all:
+        rows = db.session.execute(stmt).all()
+        with profile_phase("serialize"):
+            body = dumps([serialize(row) for row in rows])
+        set_cached(key, body)
+        return _with_etag(_json_response(body), tag)
+
+    # Keyset pagination over (date DESC, id DESC), served by ix_expenses_user_id_date_id
+    if after:
+        stmt = stmt.where(keyset_after(after))
+    rows = db.session.execute(stmt.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[row_position(fields, "date")], last[row_position(fields, "id")])
+
+    with profile_phase("serialize"):
+        body = dumps({"items": [serialize(row) for row in rows], "next_cursor": next_cursor})
+    set_cached(key, body)
+    return _with_etag(_json_response(body), tag)
+
+def _json_response(payload, status=200):
+    body = payload if isinstance(payload, str) else dumps(payload)
+    return current_app.response_class(body, status=status, mimetype="application/json")
+
+def _query_params():
+    return {name: request.args.getlist(name) for name in request.args}
+
+def _client_has_current(tag):
+    return tag is not None and request.if_none_match.contains_weak(tag)
+
+def _with_etag(response, tag):
+    if tag:
+        # Weak: the same data may be re-encoded differently (e.g. compressed by a proxy)
+        response.set_etag(tag, weak=True)
+        # Let browsers keep the body but revalidate it on every use
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def _not_modified(tag):
+    return _with_etag(current_app.response_class(status=304), tag)
+
+@expense_bp.route("/aggregate", methods=['GET'])
+@requires_auth
+@reads_from_replica
+def aggregate_expenses():
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    try:
+        period, by_category = parse_group_by(request.args.get("group_by"))
+        filters = parse_expense_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tag = etag(fintrack_user_id, "aggregate", _query_params())
+    if _client_has_current(tag):
+        return _not_modified(tag)
+
+    # Cached per user under the user's data version, so any write invalidates it
+    key = cache_key(fintrack_user_id, "aggregate", dict(filters, period=period, by_category=by_category))
+    cached_body = get_cached(key, "aggregate")
+    if cached_body is not None:
+        return _with_etag(_json_response(cached_body), tag)
+
+    # Daily rollups answer most dashboard queries from a few hundred rows; anything finer-grained scans expenses
+    dialect_name = db.session.get_bind().dialect.name
+    build_query = build_rollup_aggregate_query if rollups_can_serve(filters) else build_aggregate_query
+    rows = db.session.execute(build_query(dialect_name, fintrack_user_id, period, by_category, filters)).all()
+
+    group_by = [name for name, enabled in (("period", bool(period)), ("category", by_category)) if enabled]
+    with profile_phase("serialize"):
+        body = dumps({
+            "group_by": group_by,
+            "period": period,
+            "results": serialize_aggregate_rows(rows, period, by_category)
+        })
+    set_cached(key, body)
+    return _with_etag(_json_response(body), tag)
+
+@expense_bp.route("/search", methods=['GET'])
+@requires_auth
+@reads_from_replica
+def search_expenses():
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    try:
+        terms = parse_search_terms(request.args.get("q"))
+        fields = parse_fields(request.args.get("fields"))
+        # q is the search itself here, not the substring filter
+        filters = parse_expense_filters(request.args)
+        filters.pop("q", None)
+        limit = parse_limit(
+            request.args.get("limit"),
+            default=current_app.config.get("EXPENSES_PAGE_SIZE_DEFAULT", 50),
+            maximum=current_app.config.get("EXPENSES_PAGE_SIZE_MAX", 500)
+        )
+        offset = parse_offset(request.args.get("offset"), current_app.config.get("EXPENSES_SEARCH_MAX_OFFSET", 1000))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tag = etag(fintrack_user_id, "search", _query_params())
+    if _client_has_current(tag):
+        return _not_modified(tag)
+
+    key = cache_key(fintrack_user_id, "search", dict(filters, terms=terms, fields=fields, limit=limit, offset=offset))
+    cached_body = get_cached(key, "search")
+    if cached_body is not None:
+        return _with_etag(_json_response(cached_body), tag)
+
+    # Relevance ordering has no stable keyset, so pages are addressed by offset (bounded by EXPENSES_SEARCH_MAX_OFFSET)
+    dialect_name = db.session.get_bind().dialect.name
+    stmt = build_search_query(dialect_name, fintrack_user_id, terms, fields, filter_clauses(filters))
+    rows = db.session.execute(stmt.limit(limit + 1).offset(offset)).all()
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    serialize = row_serializer(fields)
+    with profile_phase("serialize"):
+        body = dumps({"items": [serialize(row) for row in rows], "next_offset": next_offset})
+    set_cached(key, body)
+    return _with_etag(_json_response(body), tag)
+
+@expense_bp.route("/import", methods=['POST'])
+@requires_auth
+def import_expenses():
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    # Either a multipart upload in "file" (spooled to disk by Werkzeug) or the raw request body
+    upload = request.files.get("file")
+    if upload:
+        binary, filename = upload.stream, upload.filename or ""
     else:
-        return jsonify([]), 200 
-    
\ No newline at end of file
+        binary, filename = io.BufferedReader(request.stream), ""
+
+    statement_format = (request.args.get("format") or filename.rpartition(".")[2]).lower()
+    expense_sign = request.args.get("expense_sign", "negative").lower()
+    if expense_sign not in EXPENSE_SIGNS:
+        return jsonify({"error": f"Unsupported expense_sign. Use one of: {', '.join(EXPENSE_SIGNS)}."}), 400
+    if statement_format not in FORMATS:
+        return jsonify({"error": f"Unsupported import format. Use one of: {', '.join(FORMATS)}."}), 400
+
+    try:
+        encoding = request.args.get("encoding", "utf-8-sig")
+        stream = io.TextIOWrapper(binary, encoding=encoding, errors="replace", newline="")
+        records, parse_date = open_statement(stream, statement_format, request.args.get("date_format"))
+    except (ValueError, LookupError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    events = run_import(
+        db.session, fintrack_user_id, records, parse_date,
+        batch_size=current_app.config.get("EXPENSES_IMPORT_BATCH_SIZE", 1000),
+        expense_sign=expense_sign
+    )
+
+    # One NDJSON progress line per committed batch, then a final "done" or "error" line
+    def generate():
+        for event in events:
+            yield dumps(event) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "expenses.ndjson"),
+    "json": ("application/json", "expenses.json"),
+}
+
+def _encode_export(rows, serialize, export_format):
+    """Yields the export body piece by piece so no more than one row is ever encoded at a time."""
+    if export_format == "ndjson":
+        for row in rows:
+            yield dumps(serialize(row)) + "\n"
+        return
+
+    yield "["
+    separator = ""
+    for row in rows:
+        yield separator + dumps(serialize(row))
+        separator = ","
+    yield "]"
+
+@expense_bp.route("/export", methods=['GET'])
+@requires_auth
+@reads_from_replica
+def export_expenses():
+    auth0_subject_id = g.current_user.get("sub")
+    email = g.current_user.get("email")
+    fintrack_user_id = get_or_create_internal_user_id(
+        auth0_subject_id,
+        email=email,
+        create_if_missing=True
+    )
+
+    if not fintrack_user_id:
+        return jsonify({"error": "Authenticated user not found in local database."}), 404
+
+    export_format = request.args.get("format", "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}."}), 400
+
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        filters = parse_expense_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # yield_per streams rows from a server-side cursor in fixed-size batches, keeping memory flat
+    stmt = (
+        select_expense_rows(fields)
+        .where(Expense.user_id == fintrack_user_id, *filter_clauses(filters))
+        .order_by(Expense.date.desc(), Expense.id.desc())
+        .execution_options(yield_per=current_app.config.get("EXPENSES_EXPORT_BATCH_SIZE", 1000))
+    )
+    serialize = row_serializer(fields)
+
+    def generate():
+        yield from _encode_export(db.session.execute(stmt), serialize, export_format)
+
+    mimetype, filename = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 
+from app import api_helpers
 from app.api_helpers import get_or_create_internal_user_id
 
 def test_get_internal_user_id_with_none_auth0_id():
@@ -10,7 +11,7 @@ def test_get_internal_user_id_with_empty_auth0_id():
     """Test that providing an empty string for auth0_subject_id returns None."""
     assert get_or_create_internal_user_id("") is None
 
-def test_get_internal_user_id_user_found(mocker):
+def test_get_internal_user_id_user_found(app_context, mocker):
     """Test the case where a user is found for the given auth0_subject_id."""
 
     mock_user_instance = MagicMock()
@@ -30,7 +31,7 @@ def test_get_internal_user_id_user_found(mocker):
     mock_User_class.query.filter_by.assert_called_once_with(auth0_subject=auth0_id)
     mock_User_class.query.filter_by.return_value.first.assert_called_once()
 
-def test_get_internal_user_id_user_not_found(mocker):
+def test_get_internal_user_id_user_not_found(app_context, mocker):
     """Test the case where no user is found for the given auth0_subject_id."""
 
     mock_User_class = mocker.patch('app.api_helpers.User')
@@ -43,4 +44,53 @@ def test_get_internal_user_id_user_not_found(mocker):
     assert result is None
 
     mock_User_class.query.filter_by.assert_called_once_with(auth0_subject=auth0_id)
-    mock_User_class.query.filter_by.return_value.first.assert_called_once()
\ No newline at end of file
+    mock_User_class.query.filter_by.return_value.first.assert_called_once()
+
+# --- Upsert-based provisioning ---
+def test_create_if_missing_provisions_user(db):
+    from models.user import User
+
+    user_id = get_or_create_internal_user_id("auth0|new_subject", email="new@example.com", create_if_missing=True)
+
+    user = db.session.get(User, user_id)
+    assert user.auth0_subject == "auth0|new_subject"
+    assert user.email == "new@example.com"
+
+def test_create_if_missing_returns_existing_id_on_conflict(db, seed_test_user):
+    """A request that loses the provisioning race gets the winner's ID instead of an IntegrityError."""
+    from models.user import User
+
+    user_id = get_or_create_internal_user_id(seed_test_user.auth0_subject, create_if_missing=True)
+
+    assert user_id == seed_test_user.id
+    assert User.query.filter_by(auth0_subject=seed_test_user.auth0_subject).count() == 1
+
+def test_create_if_missing_reads_before_writing(db, seed_test_user, mocker):
+    provision = mocker.spy(api_helpers, "_provision_user")
+
+    user_id = get_or_create_internal_user_id(seed_test_user.auth0_subject, create_if_missing=True)
+
+    assert user_id == seed_test_user.id
+    provision.assert_not_called()
+
+def test_create_if_missing_does_not_commit_unrelated_session_state(db):
+    from models.user import User
+
+    db.session.add(User(auth0_subject="auth0|pending_in_session"))
+    get_or_create_internal_user_id("auth0|provisioned", create_if_missing=True)
+    db.session.rollback()
+
+    assert User.query.filter_by(auth0_subject="auth0|pending_in_session").first() is None
+    assert User.query.filter_by(auth0_subject="auth0|provisioned").first() is not None
+
+def test_user_upsert_statements_per_dialect():
+    from sqlalchemy.dialects import mysql, postgresql
+    from app.api_helpers import build_user_upsert
+
+    pg_sql = str(build_user_upsert("postgresql", "auth0|x").compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (auth0_subject) DO UPDATE" in pg_sql
+    assert "RETURNING users.id" in pg_sql
+
+    mysql_sql = str(build_user_upsert("mysql", "auth0|x").compile(dialect=mysql.dialect()))
+    assert "ON DUPLICATE KEY UPDATE" in mysql_sql
+    assert "last_insert_id(users.id)" in mysql_sql
@@ -0,0 +1,16 @@
+import pytest
+
+from app.async_db import async_database_uri
+
+@pytest.mark.parametrize("uri, expected", [
+    ("postgres://u:p@db:5432/fintrack", "postgresql+asyncpg://u:p@db:5432/fintrack"),
+    ("postgresql+psycopg2://u:p@db/fintrack", "postgresql+asyncpg://u:p@db/fintrack"),
+    ("sqlite:////var/lib/fintrack.db", "sqlite+aiosqlite:////var/lib/fintrack.db"),
+])
+def test_async_database_uri_swaps_driver(uri, expected):
+    assert async_database_uri(uri) == expected
+
+@pytest.mark.parametrize("uri", ["mysql://u:p@db/fintrack", "mariadb+pymysql://u:p@db/fintrack", "oracle://u:p@db/fintrack"])
+def test_async_database_uri_rejects_unsupported_backend(uri):
+    with pytest.raises(ValueError, match="support Postgres and SQLite"):
+        async_database_uri(uri)
@@ -1,5 +1,5 @@
 import pytest
-from flask import g as flask_g, current_app as flask_current_app
+from flask import g as flask_g
 
 from app.auth_utils import (
     AuthError,
@@ -11,14 +11,13 @@ from tests.conftest import SAMPLE_JWKS, SAMPLE_PAYLOAD, TEST_TOKEN
 # --- Tests for requires_auth decorator ---
 def test_requires_auth_success(
     app_context, request_context, # Flask contexts
-    mock_auth_utils_cache,      # Cache mock from conftest
     mock_get_token_auth_header,
     mock_get_jwks_from_auth0_uncached,
     mock_verify_decode_jwt
 ):
     """Test successful authentication flow through requires_auth."""
     mock_get_token_auth_header.return_value = TEST_TOKEN
-    # The memoized function will call the uncached one, which our mock_auth_utils_cache ensures
+    # The JWKS provider fetches through the uncached function on a cold start
     mock_get_jwks_from_auth0_uncached.return_value = SAMPLE_JWKS
     mock_verify_decode_jwt.return_value = SAMPLE_PAYLOAD
 
@@ -33,17 +32,15 @@ def test_requires_auth_success(
     assert flask_g.current_user == SAMPLE_PAYLOAD
 
     mock_get_token_auth_header.assert_called_once()
-    # cache.memoize is called once by requires_auth to create memoized_get_jwks
-    mock_auth_utils_cache.memoize.assert_called_once_with(timeout=flask_current_app.config['CACHE_DEFAULT_TIMEOUT'])
-    # The (mocked) uncached function is called once via the memoized wrapper
+    # The (mocked) uncached function is called once via the JWKS provider
     mock_get_jwks_from_auth0_uncached.assert_called_once()
     mock_verify_decode_jwt.assert_called_once_with(TEST_TOKEN, SAMPLE_JWKS)
 
 
 def test_requires_auth_raises_auth_error_from_dependency(
     app_context, request_context,
-    mock_auth_utils_cache,
-    mock_get_token_auth_header
+    mock_get_token_auth_header,
+    mock_get_jwks_from_auth0_uncached
     # Other mocks not needed if get_token_auth_header fails early
 ):
     """Test that AuthError from a dependency is re-raised by requires_auth."""
@@ -59,12 +56,11 @@ def test_requires_auth_raises_auth_error_from_dependency(
 
     assert exc_info.value == expected_error # Checks if the exact exception instance is raised
     mock_get_token_auth_header.assert_called_once()
-    mock_auth_utils_cache.memoize.assert_called_once_with(timeout=flask_current_app.config['CACHE_DEFAULT_TIMEOUT'])
+    mock_get_jwks_from_auth0_uncached.assert_not_called()
 
 
 def test_requires_auth_jwks_unavailable(
     app_context, request_context,
-    mock_auth_utils_cache,
     mock_get_token_auth_header,
     mock_get_jwks_from_auth0_uncached
 ):
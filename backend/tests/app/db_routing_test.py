@@ -0,0 +1,101 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from unittest.mock import MagicMock
+
+from app.config import TestingConfig, _replica_binds
+from app.db_routing import replica_monitor
+from app.extensions import db as _db, cache as _cache
+from models.expense import Expense
+from models.user import User
+from routes.expense_routes import expense_bp
+
+@pytest.fixture
+def app():
+    """Two separate in-memory SQLite databases: the primary and a replica bind."""
+    _app = Flask(__name__)
+    _app.config.from_object(TestingConfig)
+    _app.config["SQLALCHEMY_BINDS"] = {"replica_0": "sqlite:///:memory:"}
+    _app.logger = MagicMock()
+    with _app.app_context():
+        _db.init_app(_app)
+        _cache.init_app(_app)
+        _app.register_blueprint(expense_bp)
+    yield _app
+    # init_app registered an (empty) metadata for the bind on the shared db object
+    _db.metadatas.pop("replica_0", None)
+
+@pytest.fixture
+def replica(db):
+    """The replica engine, holding a copy of the test user but none of the primary's expenses."""
+    engine = db.engines["replica_0"]
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert().values(id=1, auth0_subject="auth0|testuser123"))
+    yield engine
+    db.metadata.drop_all(engine)
+
+def _add_expense(connection, description):
+    connection.execute(Expense.__table__.insert().values(
+        user_id=1, description=description, amount=Decimal("5.00"), date=datetime.datetime(2025, 6, 1)
+    ))
+
+def _descriptions(client):
+    response = client.get("/get_all")
+    assert response.status_code == 200
+    return [item["description"] for item in response.get_json()["items"]]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_reads_go_to_replica_and_writes_to_primary(client, db, replica):
+    with replica.begin() as connection:
+        _add_expense(connection, "On the replica")
+
+    assert _descriptions(client) == ["On the replica"]
+
+    assert client.post("/create", json={"description": "Lunch", "amount": "9.50"}).status_code == 201
+    assert [e.description for e in db.session.query(Expense)] == ["Lunch"]
+    with replica.connect() as connection:
+        assert connection.execute(Expense.__table__.select()).all()[0].description == "On the replica"
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_user_reads_own_writes_from_primary(client, app, replica):
+    assert client.post("/create", json={"description": "Lunch", "amount": "9.50"}).status_code == 201
+
+    # The replica has not caught up, but the writer is pinned to the primary for the window
+    assert _descriptions(client) == ["Lunch"]
+
+    app.config["REPLICA_READ_YOUR_WRITES_WINDOW"] = 0
+    assert client.post("/create", json={"description": "Taxi", "amount": "20.00"}).status_code == 201
+    assert _descriptions(client) == []
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_lagging_replica_falls_back_to_primary(client, db, replica, mocker):
+    db.session.add(Expense(user_id=1, description="Primary only", amount=Decimal("3.00")))
+    db.session.commit()
+    lag = mocker.patch("app.db_routing.replica_lag", return_value=60.0)
+
+    assert _descriptions(client) == ["Primary only"]
+    assert _descriptions(client) == ["Primary only"]
+    # Checked once per REPLICA_LAG_CHECK_INTERVAL, not on every request
+    assert lag.call_count == 1
+
+    lag.return_value = 0.5
+    replica_monitor.reset()
+    assert _descriptions(client) == []
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_unreachable_replica_falls_back_to_primary(client, db, replica, mocker):
+    db.session.add(Expense(user_id=1, description="Primary only", amount=Decimal("3.00")))
+    db.session.commit()
+    mocker.patch("app.db_routing.replica_lag", side_effect=ConnectionError("replica down"))
+
+    assert _descriptions(client) == ["Primary only"]
+
+def test_replica_binds_from_hosts():
+    assert _replica_binds("postgresql", "u", "p", "r1, r2:5433", "5432", "fintrack") == {
+        "replica_0": "postgresql://u:p@r1:5432/fintrack",
+        "replica_1": "postgresql://u:p@r2:5433/fintrack",
+    }
+    assert _replica_binds("postgresql", "u", "p", None, "5432", "fintrack") == {}
@@ -0,0 +1,41 @@
+import zlib
+
+from app.expense_cache import (
+    COMPRESS_MIN_BYTES, _pack, _unpack, bump_data_version, cache_key, data_version, get_cached, set_cached
+)
+
+def test_small_bodies_stored_uncompressed():
+    body = '{"items":[]}'
+    payload = _pack(body)
+    assert payload == b"r" + body.encode("utf-8")
+    assert _unpack(payload) == body
+
+def test_large_bodies_compressed():
+    body = '{"description":"Café lunch"},' * 200
+    payload = _pack(body)
+    assert len(body) > COMPRESS_MIN_BYTES
+    assert payload[:1] == b"z"
+    assert len(payload) < len(body) // 5
+    assert zlib.decompress(payload[1:]).decode("utf-8") == body
+    assert _unpack(payload) == body
+
+def test_unreadable_payloads_are_misses():
+    assert _unpack(None) is None
+    assert _unpack('{"legacy": "str entry"}') is None
+    assert _unpack(b"z not zlib") is None
+    assert _unpack(b"") is None
+
+def test_cached_body_round_trip_and_invalidation(app, app_context):
+    app.config["SHARED_CACHE_ENABLED"] = True
+    key = cache_key(7, "list", {"limit": 50})
+    set_cached(key, "x" * 2000)
+
+    assert get_cached(key, "list") == "x" * 2000
+    version = data_version(7)
+    bump_data_version(7)
+    assert data_version(7) == version + 1
+    assert get_cached(cache_key(7, "list", {"limit": 50}), "list") is None
+
+def test_no_caching_without_shared_cache(app_context):
+    assert cache_key(7, "list", {}) is None
+    assert get_cached(None, "list") is None
@@ -0,0 +1,123 @@
+import datetime
+import json
+import pytest
+from decimal import Decimal
+from flask import jsonify
+
+from app.expense_queries import EXPENSE_FIELDS, MAX_ID, dumps, parse_fields, parse_ids, row_serializer, select_expense_rows
+from models.expense import Expense
+
+def test_parse_fields_defaults_to_all_fields():
+    assert parse_fields(None) == EXPENSE_FIELDS
+    assert parse_fields("") == EXPENSE_FIELDS
+
+def test_parse_fields_keeps_canonical_order_without_duplicates():
+    assert parse_fields("amount, id,amount") == ("id", "amount")
+
+def test_parse_fields_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="Unknown field"):
+        parse_fields("id,password")
+
+@pytest.mark.parametrize("value", [",", " ", " , ,"])
+def test_parse_fields_rejects_empty_field_list(value):
+    with pytest.raises(ValueError, match="No fields requested"):
+        parse_fields(value)
+
+def test_parse_ids_accepts_up_to_the_largest_bigint():
+    assert parse_ids([f"1,{MAX_ID}"], 5) == [1, MAX_ID]
+
+@pytest.mark.parametrize("value", ["²", "١٢", str(MAX_ID + 1), "99999999999999999999999"])
+def test_parse_ids_rejects_non_ascii_and_out_of_range_ids(value):
+    with pytest.raises(ValueError, match=f"Invalid id: {value}. Ids must be positive integers."):
+        parse_ids([value], 5)
+
+def test_row_serializer_is_compiled_once_per_fieldset():
+    assert row_serializer(("id", "amount")) is row_serializer(("id", "amount"))
+
+def test_fast_path_matches_orm_serialization(db, seed_test_user):
+    expense = Expense(
+        user_id=seed_test_user.id,
+        description="Parity check",
+        amount=Decimal("42.10"),
+        category=None,
+        date=datetime.datetime(2025, 3, 4, 5, 6, 7),
+        created_at=datetime.datetime(2025, 3, 4, 8, 9, 10)
+    )
+    db.session.add(expense)
+    db.session.commit()
+
+    row = db.session.execute(select_expense_rows(EXPENSE_FIELDS).where(Expense.id == expense.id)).one()
+    fast = json.loads(dumps(row_serializer(EXPENSE_FIELDS)(row)))
+    orm = jsonify(db.session.get(Expense, expense.id).to_dict()).get_json()
+
+    assert fast == orm
+
+
+# --- Filters ---
+def _args(query_string):
+    from werkzeug.datastructures import MultiDict
+    from urllib.parse import parse_qsl
+    return MultiDict(parse_qsl(query_string))
+
+def test_parse_expense_filters_normalizes_values():
+    from app.expense_queries import parse_expense_filters
+
+    filters = parse_expense_filters(_args(
+        "date_from=2025-01-01&date_to=2025-01-31&category=Food,Travel&category=Food&amount_min=1.5&q=%20coffee%20"
+    ))
+
+    assert filters == {
+        "date_from": datetime.datetime(2025, 1, 1),
+        # A date-only upper bound includes the whole day
+        "date_before": datetime.datetime(2025, 2, 1),
+        "category": ("Food", "Travel"),
+        "amount_min": Decimal("1.5"),
+        "q": "coffee",
+    }
+
+def test_parse_expense_filters_converts_aware_datetimes_to_utc():
+    from app.expense_queries import parse_expense_filters
+
+    filters = parse_expense_filters(_args("date_to=2025-01-31T10:00:00%2B02:00"))
+
+    assert filters == {"date_to": datetime.datetime(2025, 1, 31, 8, 0, 0)}
+
+@pytest.mark.parametrize("query_string, message", [
+    ("date_from=yesterday", "date_from must be an ISO 8601 date or datetime."),
+    ("amount_max=lots", "amount_max must be a number."),
+    ("amount_min=NaN", "amount_min must be a number."),
+    ("date_from=2025-02-01&date_to=2025-01-01", "date_from must not be after date_to."),
+    ("amount_min=10&amount_max=1", "amount_min must not be greater than amount_max."),
+])
+def test_parse_expense_filters_rejects_invalid_values(query_string, message):
+    from app.expense_queries import parse_expense_filters
+
+    with pytest.raises(ValueError) as exc_info:
+        parse_expense_filters(_args(query_string))
+    assert str(exc_info.value) == message
+
+
+# --- Aggregation ---
+def test_parse_group_by():
+    from app.expense_queries import parse_group_by
+
+    assert parse_group_by(None) == (None, False)
+    assert parse_group_by("Month, category") == ("month", True)
+    with pytest.raises(ValueError, match="at most one period"):
+        parse_group_by("month,year")
+    with pytest.raises(ValueError, match="Unknown group_by"):
+        parse_group_by("quarter")
+
+@pytest.mark.parametrize("dialect_module, expected", [
+    ("postgresql", "to_char(date_trunc(%(date_trunc_1)s, expenses.date), %(to_char_1)s)"),
+    ("mysql", "date_format(subdate(expenses.date, weekday(expenses.date)), %s)"),
+    ("sqlite", "date(expenses.date, ?, ?)"),
+])
+def test_period_start_is_dialect_aware(dialect_module, expected):
+    import importlib
+    from app.expense_queries import period_start
+
+    dialect = importlib.import_module(f"sqlalchemy.dialects.{dialect_module}").dialect()
+    expression = period_start(dialect.name, "week", Expense.__table__.c.date)
+
+    assert str(expression.compile(dialect=dialect)) == expected
@@ -0,0 +1,30 @@
+import pytest
+
+from app.expense_search import MAX_TERMS, build_search_query, parse_search_terms
+from app.expense_queries import EXPENSE_FIELDS
+
+def test_parse_search_terms_normalizes():
+    assert parse_search_terms("  Coffee, BEANS coffee ") == ("coffee", "beans")
+    assert parse_search_terms("café-bar") == ("café", "bar")
+
+@pytest.mark.parametrize("value, error", [
+    (None, "q must contain at least one word."),
+    (" -*\"' ", "q must contain at least one word."),
+    (" ".join(f"w{i}" for i in range(MAX_TERMS + 1)), f"q may contain at most {MAX_TERMS} words."),
+])
+def test_parse_search_terms_invalid(value, error):
+    with pytest.raises(ValueError, match=error):
+        parse_search_terms(value)
+
+def test_search_terms_cannot_inject_query_syntax():
+    # Operators are dropped by tokenization before the terms reach the FTS / tsquery syntax
+    terms = parse_search_terms('coffee" OR "x* | !tea & (milk)')
+    assert terms == ("coffee", "or", "x", "tea", "milk")
+
+def test_postgres_search_uses_generated_tsvector():
+    from sqlalchemy.dialects import postgresql
+    stmt = build_search_query("postgresql", 1, ("cof", "bean"), EXPENSE_FIELDS, [])
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    assert "expenses.search_vector @@ to_tsquery('simple'::regconfig, 'cof:* & bean:*')" in sql
+    assert "ORDER BY ts_rank_cd(expenses.search_vector" in sql
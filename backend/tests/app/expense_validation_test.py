@@ -0,0 +1,65 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.expense_validation import ExpenseValidationError, validate_expense_data, validate_expense_update
+
+def test_validate_expense_data_normalizes_values():
+    values = validate_expense_data({"description": "Lunch", "amount": "12.50", "date": "2025-06-01T12:00:00Z", "extra": 1})
+
+    assert values == {
+        "description": "Lunch",
+        "amount": Decimal("12.50"),
+        "category": None,
+        "date": datetime.datetime(2025, 6, 1, 12, 0, tzinfo=datetime.timezone.utc),
+    }
+
+@pytest.mark.parametrize("amount, expected", [
+    ("0.10", Decimal("0.10")),
+    (0.1, Decimal("0.1")),
+    (7, Decimal("7")),
+    (Decimal("3.25"), Decimal("3.25")),
+])
+def test_validate_expense_data_amount_types(amount, expected):
+    assert validate_expense_data({"description": "x", "amount": amount})["amount"] == expected
+
+@pytest.mark.parametrize("amount", ["abc", "NaN", "Infinity", True, None, [1]])
+def test_validate_expense_data_rejects_non_numbers(amount):
+    with pytest.raises(ExpenseValidationError, match="Invalid amount format. Must be a number."):
+        validate_expense_data({"description": "x", "amount": amount})
+
+def test_validate_expense_data_empty_date_defaults_to_now():
+    before = datetime.datetime.now(datetime.timezone.utc)
+    values = validate_expense_data({"description": "x", "amount": "1", "date": ""})
+    assert values["date"] >= before
+
+def test_validate_expense_data_reports_every_field():
+    with pytest.raises(ExpenseValidationError) as info:
+        validate_expense_data({"amount": "-1", "category": "X" * 51, "date": "soon"})
+
+    assert str(info.value) == "Missing required fields: description"
+    assert info.value.errors == {
+        "description": "This field is required.",
+        "amount": "Amount must be a positive number.",
+        "category": "Category, if provided, must be a string no longer than 50 characters.",
+        "date": "Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ).",
+    }
+
+@pytest.mark.parametrize("payload, first_error", [
+    ({"description": "", "amount": "x"}, "Invalid amount format. Must be a number."),
+    ({"description": "x", "amount": "1", "category": "X" * 51, "date": "soon"},
+     "Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ)."),
+    ({}, "Missing required fields: description, amount"),
+])
+def test_validate_expense_data_reports_first_error_in_check_order(payload, first_error):
+    # amount, description, date, category: the order the original /create checked them in
+    with pytest.raises(ExpenseValidationError) as info:
+        validate_expense_data(payload)
+    assert str(info.value) == first_error
+
+def test_validate_expense_update_checks_given_fields_only():
+    assert validate_expense_update({"category": None}) == {"category": None}
+    with pytest.raises(ExpenseValidationError) as info:
+        validate_expense_update({"description": "", "amount": "2"})
+    assert info.value.errors == {"description": "Description must be a string between 1 and 200 characters."}
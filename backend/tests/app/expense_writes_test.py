@@ -0,0 +1,81 @@
+import datetime
+import pytest
+from decimal import Decimal
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+from app.expense_writes import delete_expense_rows, update_expense_row
+from models.expense import Expense
+from models.expense_daily_rollup import ExpenseDailyRollup
+
+def _rollups(db):
+    return {(r.day.isoformat(), r.category): (r.expense_count, r.amount_total)
+            for r in db.session.query(ExpenseDailyRollup).all()}
+
+@pytest.fixture
+def expense(db, seed_test_user):
+    """(user_id, expense id) of a committed expense; plain values so tests issue no lazy loads."""
+    expense = Expense(user_id=seed_test_user.id, description="Lunch", amount=Decimal("10.00"), category="Food",
+                      date=datetime.datetime(2025, 6, 1, 12, 0))
+    db.session.add(expense)
+    db.session.commit()
+    return expense.user_id, expense.id
+
+@pytest.fixture
+def statements(db):
+    captured = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement.split()[0])
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(db.engine, "before_cursor_execute", record)
+
+def test_description_update_is_a_single_statement(db, expense, statements):
+    row = update_expense_row(db.session, *expense, {"description": "Brunch"})
+    db.session.commit()
+
+    assert row.description == "Brunch"
+    assert statements == ["UPDATE"]
+    assert _rollups(db) == {("2025-06-01", "Food"): (1, Decimal("10.00"))}
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_rollup_column_update_moves_rollups(db, expense, mocker, returning):
+    # returning=False exercises the MySQL path
+    mocker.patch.object(db.engine.dialect, "update_returning", returning)
+    values = {"amount": Decimal("4.00"), "category": None, "date": datetime.datetime(2025, 6, 2, 9, 0)}
+
+    row = update_expense_row(db.session, *expense, values)
+    db.session.commit()
+
+    assert (row.amount, row.category) == (Decimal("4.00"), None)
+    assert _rollups(db) == {("2025-06-02", ""): (1, Decimal("4.00"))}
+
+def test_update_of_another_users_expense(db, expense):
+    assert update_expense_row(db.session, expense[0] + 1, expense[1], {"amount": Decimal("1")}) is None
+    assert update_expense_row(db.session, expense[0] + 1, expense[1], {"description": "x"}) is None
+    db.session.commit()
+    assert _rollups(db) == {("2025-06-01", "Food"): (1, Decimal("10.00"))}
+
+def test_postgres_update_returns_old_values_in_one_statement(mocker):
+    executed = []
+    session = mocker.Mock()
+    session.get_bind.return_value.dialect = postgresql.dialect()
+    session.execute.side_effect = lambda stmt: executed.append(stmt) or mocker.Mock(first=lambda: None)
+
+    assert update_expense_row(session, 1, 5, {"amount": Decimal("2.00")}) is None
+    sql = str(executed[0].compile(dialect=postgresql.dialect()))
+
+    assert len(executed) == 1
+    assert sql.startswith("UPDATE expenses SET amount=%(amount)s FROM (SELECT expenses.id AS id")
+    assert "FOR UPDATE) AS previous WHERE expenses.id = previous.id AND expenses.date = previous.date" in sql
+    assert sql.endswith("previous.date AS old_date, previous.category AS old_category, previous.amount AS old_amount")
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_delete_returns_rows_and_updates_rollups(db, expense, statements, mocker, returning):
+    mocker.patch.object(db.engine.dialect, "delete_returning", returning)
+    rows = delete_expense_rows(db.session, expense[0], [Expense.id == expense[1]])
+    db.session.commit()
+
+    assert [row.id for row in rows] == [expense[1]]
+    assert statements[0] == ("DELETE" if returning else "SELECT")
+    assert _rollups(db) == {}
@@ -0,0 +1,156 @@
+import datetime
+import pytest
+
+from app.idempotency import DatabaseStore, SharedCacheStore
+from models.expense import Expense
+from models.idempotency_key import IdempotencyKey
+
+SUBJECT = "auth0|testuser123"
+EXPENSE = {"description": "Taxi", "amount": "18.00", "date": "2025-05-01T22:00:00Z"}
+
+@pytest.fixture(params=["shared_cache", "database"])
+def store_kind(request, app):
+    app.config["SHARED_CACHE_ENABLED"] = request.param == "shared_cache"
+    return request.param
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_retry_replays_stored_response(client, db, store_kind):
+    first = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "retry-1"})
+    second = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "retry-1"})
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert db.session.query(Expense).count() == 1
+    # Durable rows are only written when the shared cache is not in use
+    assert db.session.query(IdempotencyKey).count() == (1 if store_kind == "database" else 0)
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_replay_does_not_query_expenses(client, db, store_kind, mocker):
+    client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "retry-2"})
+    execute_spy = mocker.spy(db.session, "execute")
+    add_spy = mocker.spy(db.session, "add")
+
+    assert client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "retry-2"}).status_code == 201
+    assert execute_spy.call_count == 0
+    assert add_spy.call_count == 0
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_key_reused_for_different_request(client, store_kind):
+    client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "reused"})
+    response = client.post("/create", json=dict(EXPENSE, amount="19.00"), headers={"Idempotency-Key": "reused"})
+
+    assert response.status_code == 422
+    assert response.get_json() == {"error": "Idempotency-Key has already been used with a different request."}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_keys_are_scoped_per_user(client, db, store_kind, mock_verify_decode_jwt, mocker):
+    client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "shared-key"})
+
+    mock_verify_decode_jwt.return_value = {"sub": "auth0|someone_else"}
+    response = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "shared-key"})
+
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+    assert db.session.query(Expense).count() == 2
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_validation_errors_are_replayed_but_server_errors_are_not(client, db, store_kind, mocker):
+    invalid = client.post("/create", json={"amount": "1"}, headers={"Idempotency-Key": "bad"})
+    replayed = client.post("/create", json={"amount": "1"}, headers={"Idempotency-Key": "bad"})
+    assert invalid.status_code == replayed.status_code == 400
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+
+    commit = mocker.patch.object(db.session, "commit", side_effect=RuntimeError("db down"))
+    assert client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "flaky"}).status_code == 500
+    mocker.stop(commit)
+    retry = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "flaky"})
+    assert retry.status_code == 201
+    assert "Idempotent-Replayed" not in retry.headers
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_concurrent_duplicate_waits_for_the_first(app, client, db, store_kind, mocker):
+    import app.idempotency as idempotency
+    fingerprint_request = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "probe"})
+    stored = {"status": fingerprint_request.status_code, "body": fingerprint_request.get_data(as_text=True),
+              "mimetype": "application/json"}
+
+    with app.test_request_context("/create", method="POST", json=EXPENSE):
+        fingerprint = idempotency.request_fingerprint()
+    store_class = SharedCacheStore if store_kind == "shared_cache" else DatabaseStore
+    with app.app_context():
+        store = store_class(SUBJECT, "in-flight")
+        assert store.reserve(fingerprint)
+
+    # The first request finishes while the duplicate is waiting
+    def finish_first(_):
+        with app.app_context():
+            store.complete(dict(stored, fingerprint=fingerprint))
+    mocker.patch.object(idempotency.time, "sleep", side_effect=finish_first)
+
+    response = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "in-flight"})
+
+    assert response.status_code == 201
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert db.session.query(Expense).count() == 1
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_concurrent_duplicate_times_out(app, client, db, store_kind):
+    store_class = SharedCacheStore if store_kind == "shared_cache" else DatabaseStore
+    with app.app_context():
+        assert store_class(SUBJECT, "stuck").reserve("other")
+
+    response = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "stuck"})
+
+    assert response.status_code == 409
+    assert response.get_json() == {"error": "A request with this Idempotency-Key is still being processed."}
+    assert db.session.query(Expense).count() == 0
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_stale_database_reservation_is_taken_over(client, db):
+    past = datetime.datetime(2000, 1, 1)
+    db.session.add(IdempotencyKey(auth0_subject=SUBJECT, key="crashed", fingerprint="x", locked_until=past,
+                                  expires_at=datetime.datetime(2999, 1, 1)))
+    db.session.commit()
+
+    response = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "crashed"})
+
+    assert response.status_code == 201
+    db.session.expire_all()
+    assert db.session.get(IdempotencyKey, (SUBJECT, "crashed")).status_code == 201
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_shared_cache_failure_falls_back_to_database(app, client, db, mocker):
+    from app.extensions import cache
+    app.config["SHARED_CACHE_ENABLED"] = True
+    mocker.patch.object(cache, "get", side_effect=ConnectionError("redis down"))
+
+    client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "fallback"})
+    replay = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "fallback"})
+
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert db.session.query(IdempotencyKey).count() == 1
+    assert db.session.query(Expense).count() == 1
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_invalid_key(client):
+    response = client.post("/create", json=EXPENSE, headers={"Idempotency-Key": "x" * 256})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Idempotency-Key must be between 1 and 255 characters."}
+
+def test_purge_cli_deletes_expired_rows(app, db):
+    from app.commands import idempotency_cli
+    db.session.add_all([
+        IdempotencyKey(auth0_subject=SUBJECT, key="old", fingerprint="x", status_code=201,
+                       expires_at=datetime.datetime(2000, 1, 1)),
+        IdempotencyKey(auth0_subject=SUBJECT, key="new", fingerprint="x", status_code=201,
+                       expires_at=datetime.datetime(2999, 1, 1)),
+    ])
+    db.session.commit()
+
+    app.cli.add_command(idempotency_cli)
+    result = app.test_cli_runner().invoke(args=["idempotency", "purge"])
+
+    assert "Deleted 1 expired idempotency keys." in result.output
+    assert [row.key for row in db.session.query(IdempotencyKey).all()] == ["new"]
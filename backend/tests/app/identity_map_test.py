@@ -0,0 +1,37 @@
+from app.api_helpers import get_or_create_internal_user_id
+from app.identity_map import IdentityMap, identity_map
+
+def test_lookup_is_served_from_identity_map(db, seed_test_user, mocker):
+    user_id = get_or_create_internal_user_id(seed_test_user.auth0_subject)
+    assert user_id == seed_test_user.id
+
+    mock_User_class = mocker.patch("app.api_helpers.User")
+    assert get_or_create_internal_user_id(seed_test_user.auth0_subject) == seed_test_user.id
+    # Second lookup never reached the users table
+    mock_User_class.query.filter_by.assert_not_called()
+
+def test_created_user_is_added_to_identity_map(db):
+    user_id = get_or_create_internal_user_id("auth0|brand_new", email="new@example.com", create_if_missing=True)
+
+    assert identity_map.get("auth0|brand_new") == user_id
+
+def test_missing_user_is_not_cached(db):
+    assert get_or_create_internal_user_id("auth0|nobody") is None
+    assert identity_map.get("auth0|nobody") is None
+
+def test_deleting_user_invalidates_identity_map(db, seed_test_user):
+    get_or_create_internal_user_id(seed_test_user.auth0_subject)
+    assert identity_map.get(seed_test_user.auth0_subject) == seed_test_user.id
+
+    db.session.delete(seed_test_user)
+    db.session.commit()
+
+    assert identity_map.get(seed_test_user.auth0_subject) is None
+    assert get_or_create_internal_user_id(seed_test_user.auth0_subject) is None
+
+def test_identity_map_shared_tier(app, app_context):
+    app.config["SHARED_CACHE_ENABLED"] = True
+
+    IdentityMap().set("auth0|shared_subject", 42)
+    # Another process's identity map starts empty and fills from the shared tier
+    assert IdentityMap().get("auth0|shared_subject") == 42
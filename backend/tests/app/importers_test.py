@@ -0,0 +1,181 @@
+import datetime
+import io
+import re
+import pytest
+from decimal import Decimal
+
+from app.importers import (
+    normalize_record, open_statement, parse_csv, parse_ofx, parse_ofx_date, parse_qif, parse_qif_date,
+    parse_statement_amount, parse_statement_date, run_import
+)
+from models.expense import Expense
+
+OFX_SGML = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20250131120000.000[-5:EST]
+<TRNAMT>-12.50
+<NAME>Corner Caf&eacute;
+<MEMO>Card 1234
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20250201
+<TRNAMT>1500.00
+<NAME>Salary
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+OFX_XML = """<?xml version="1.0" encoding="UTF-8"?><?OFX OFXHEADER="200"?>
+<OFX><STMTTRN><DTPOSTED>20250105</DTPOSTED><TRNAMT>-3.20</TRNAMT><MEMO>Bus fare &amp; top-up</MEMO></STMTTRN></OFX>
+"""
+
+QIF = """!Account
+NChecking
+^
+!Type:Bank
+D1/31'25
+T-1,234.56
+PLandlord
+LHousing:Rent
+^
+D02/01/2025
+T-40.00
+PGroceries Ltd
+LFood
+SFood
+$-30.00
+SHousehold
+$-10.00
+^
+D2/ 2/2025
+T-100.00
+PTransfer to savings
+L[Savings]
+^
+!Type:Cat
+NFood
+^
+"""
+
+def _records(parser, text, **kwargs):
+    return list(parser(io.StringIO(text), **kwargs))
+
+def test_parse_csv_amount_column():
+    text = "Date,Description,Amount,Category\n2025-01-02,Coffee,-3.10,Food\n\n2025-01-03,Refund,5.00,\n"
+    assert _records(parse_csv, text) == [
+        (1, {"date": "2025-01-02", "description": "Coffee", "amount": "-3.10", "category": "Food"}),
+        (3, {"date": "2025-01-03", "description": "Refund", "amount": "5.00", "category": None}),
+    ]
+
+def test_parse_csv_debit_credit_columns():
+    text = "Transaction Date,Payee,Money Out,Money In\n01/02/2025,Shop,9.99,\n01/03/2025,Pay,,100\n"
+    assert [raw["amount"] for _, raw in _records(parse_csv, text)] == ["-9.99", "100"]
+
+@pytest.mark.parametrize("text, error", [
+    ("", "CSV file is empty."),
+    ("when,what\n2025-01-01,x\n", "CSV header must include date, description and amount (or debit/credit) columns."),
+])
+def test_parse_csv_rejects_unusable_header(text, error):
+    with pytest.raises(ValueError, match=re.escape(error)):
+        parse_csv(io.StringIO(text))
+
+@pytest.mark.parametrize("chunk_size", [7, 64 * 1024])
+def test_parse_ofx_sgml_across_chunks(chunk_size):
+    assert _records(parse_ofx, OFX_SGML, chunk_size=chunk_size) == [
+        (1, {"date": "20250131120000.000[-5:EST]", "description": "Corner Café", "amount": "-12.50", "category": None}),
+        (2, {"date": "20250201", "description": "Salary", "amount": "1500.00", "category": None}),
+    ]
+
+def test_parse_ofx_xml():
+    assert _records(parse_ofx, OFX_XML, chunk_size=5) == [
+        (1, {"date": "20250105", "description": "Bus fare & top-up", "amount": "-3.20", "category": None}),
+    ]
+
+def test_parse_ofx_date():
+    assert parse_ofx_date("20250131") == datetime.datetime(2025, 1, 31)
+    assert parse_ofx_date("20250131120000.000[-5:EST]") == datetime.datetime(2025, 1, 31, 17, 0)
+    with pytest.raises(ValueError, match="Invalid date: 2025-13."):
+        parse_ofx_date("2025-13")
+
+def test_parse_qif_skips_splits_transfers_and_lists():
+    assert _records(parse_qif, QIF) == [
+        (1, {"date": "1/31'25", "description": "Landlord", "amount": "-1,234.56", "category": "Housing:Rent"}),
+        (2, {"date": "02/01/2025", "description": "Groceries Ltd", "amount": "-40.00", "category": "Food"}),
+        (3, {"date": "2/ 2/2025", "description": "Transfer to savings", "amount": "-100.00", "category": None}),
+    ]
+    assert parse_qif_date("1/31'25") == datetime.datetime(2025, 1, 31)
+    assert parse_qif_date("2/ 2/2025") == datetime.datetime(2025, 2, 2)
+
+@pytest.mark.parametrize("value, expected", [
+    ("-12.50", Decimal("-12.50")),
+    ("(12.50)", Decimal("-12.50")),
+    ("£1,234.56", Decimal("1234.56")),
+    ("12,5", Decimal("12.5")),
+    ("-1.234,56 EUR", Decimal("-1234.56")),
+    ("twelve", None),
+])
+def test_parse_statement_amount(value, expected):
+    if expected is None:
+        with pytest.raises(ValueError):
+            parse_statement_amount(value)
+    else:
+        assert parse_statement_amount(value) == expected
+
+def test_parse_statement_date_formats():
+    assert parse_statement_date("2025-03-04T10:00:00Z").tzinfo is not None
+    assert parse_statement_date("03/04/2025") == datetime.datetime(2025, 3, 4)
+    assert parse_statement_date("03/04/2025", "%d/%m/%Y") == datetime.datetime(2025, 4, 3)
+    with pytest.raises(ValueError, match="Invalid date: 31/01/2025."):
+        parse_statement_date("31/01/2025")
+
+def test_normalize_record():
+    raw = {"date": "2025-01-02T09:00:00+01:00", "description": "  Corner   shop ", "amount": "-3.10", "category": "x" * 60}
+    values = normalize_record(raw, parse_statement_date)
+    assert values["amount"] == Decimal("3.10")
+    assert values["description"] == "Corner shop"
+    assert values["category"] == "x" * 50
+    assert values["date"] == datetime.datetime(2025, 1, 2, 8, 0)
+
+    assert normalize_record(dict(raw, amount="3.10"), parse_statement_date) is None
+    assert normalize_record(dict(raw, amount="3.10"), parse_statement_date, expense_sign="positive") is not None
+    with pytest.raises(ValueError, match="Description must be a string between 1 and 200 characters."):
+        normalize_record(dict(raw, description=""), parse_statement_date)
+
+def test_run_import_commits_in_batches(app_context, db, seed_test_user):
+    text = "Date,Description,Amount\n" + "".join(f"2025-01-{day:02d},Item {day},-{day}.00\n" for day in range(1, 6))
+    text += "2025-01-06,Salary,900.00\nnot a date,Broken,-1.00\n"
+    records, parse_date = open_statement(io.StringIO(text), "csv")
+
+    events = list(run_import(db.session, seed_test_user.id, records, parse_date, batch_size=2))
+
+    assert [event["event"] for event in events] == ["progress", "progress", "progress", "done"]
+    assert [event["imported"] for event in events] == [2, 4, 5, 5]
+    assert events[-1] == {
+        "event": "done", "processed": 7, "imported": 5, "skipped": 1, "failed": 1,
+        "errors": [{"record": 7, "error": "Invalid date: not a date."}],
+    }
+    assert db.session.query(Expense).count() == 5
+
+def test_run_import_keeps_committed_batches_on_failure(app_context, db, seed_test_user, mocker):
+    import app.importers as importers
+    real_insert = importers.insert_expenses
+    calls = iter([True, False])
+
+    def insert(session, user_id, rows):
+        if next(calls):
+            return real_insert(session, user_id, rows)
+        raise RuntimeError("db gone")
+    mocker.patch.object(importers, "insert_expenses", side_effect=insert)
+
+    text = "Date,Description,Amount\n" + "".join(f"2025-01-0{day},Item {day},-1.00\n" for day in range(1, 5))
+    records, parse_date = open_statement(io.StringIO(text), "csv")
+    events = list(run_import(db.session, seed_test_user.id, records, parse_date, batch_size=2))
+
+    assert events[-1]["event"] == "error"
+    assert events[-1]["imported"] == 2
+    assert db.session.query(Expense).count() == 2
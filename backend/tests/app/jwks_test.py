@@ -0,0 +1,225 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+import pytest
+
+from app.auth_utils import AuthError, verify_decode_jwt, get_jwks_from_auth0_uncached
+import app.jwks as jwks_module
+from app.jwks import JWKSProvider, PublicKeyIndex, get_public_key_index, jwks_fingerprint
+
+from tests.conftest import SAMPLE_JWKS, TestingConfig
+
+def _sign(private_key, kid=TestingConfig.KID, **claims):
+    payload = {
+        "iss": f"https://{TestingConfig.AUTH0_DOMAIN}/",
+        "aud": TestingConfig.AUTH0_API_AUDIENCE,
+        "sub": "auth0|jwks_user",
+        "exp": int(time.time()) + 3600,
+    }
+    payload.update(claims)
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+def test_public_key_index_built_once_per_key_set(rsa_signing_key):
+    _, public_jwk = rsa_signing_key
+    jwks = {"keys": [public_jwk]}
+
+    first = get_public_key_index(jwks)
+    # An equal key set (e.g. re-read from the cache) reuses the same index
+    assert get_public_key_index({"keys": [dict(public_jwk)]}) is first
+    assert TestingConfig.KID in first
+
+    rotated = get_public_key_index({"keys": [dict(public_jwk, kid="rotated-kid")]})
+    assert rotated is not first
+    assert "rotated-kid" in rotated
+
+def test_public_key_index_remembers_construction_errors():
+    broken_jwks = {"keys": [dict(SAMPLE_JWKS["keys"][0], kty="EC")]}
+    index = PublicKeyIndex(broken_jwks)
+
+    assert TestingConfig.KID in index
+    with pytest.raises(Exception):
+        index.get(TestingConfig.KID)
+
+def test_verify_decode_jwt_with_indexed_key(app_context, rsa_signing_key):
+    private_key, public_jwk = rsa_signing_key
+    token = _sign(private_key)
+
+    payload = verify_decode_jwt(token, {"keys": [public_jwk]})
+
+    assert payload["sub"] == "auth0|jwks_user"
+
+def test_unknown_kid_triggers_single_rate_limited_refresh(
+    app_context, rsa_signing_key, mock_get_jwks_from_auth0_uncached
+):
+    private_key, public_jwk = rsa_signing_key
+    stale_jwks = {"keys": [dict(public_jwk, kid="old-kid")]}
+    mock_get_jwks_from_auth0_uncached.return_value = {"keys": [public_jwk]}
+
+    # The refreshed key set contains the token's kid, so verification succeeds
+    payload = verify_decode_jwt(_sign(private_key), stale_jwks)
+    assert payload["sub"] == "auth0|jwks_user"
+    assert mock_get_jwks_from_auth0_uncached.call_count == 1
+
+    # A second unknown kid inside the refresh interval does not hit Auth0 again
+    with pytest.raises(AuthError) as exc_info:
+        verify_decode_jwt(_sign(private_key, kid="bogus-kid"), stale_jwks)
+    assert exc_info.value.error["code"] == "invalid_key"
+    assert mock_get_jwks_from_auth0_uncached.call_count == 1
+
+
+# --- JWKSProvider against a local stub JWKS server ---
+@pytest.fixture
+def stub_jwks_server(app, rsa_signing_key):
+    """Serves `state["jwks"]` (or a 500 if `state["fail"]`) after `state["delay"]` seconds, counting requests."""
+    _, public_jwk = rsa_signing_key
+    state = {"jwks": {"keys": [public_jwk]}, "fail": False, "delay": 0.0, "requests": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                state["requests"] += 1
+            time.sleep(state["delay"])
+            if state["fail"]:
+                self.send_response(500)
+                self.end_headers()
+                return
+            body = json.dumps(state["jwks"]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app.config["AUTH0_JWKS_URL"] = f"http://127.0.0.1:{server.server_port}/.well-known/jwks.json"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_jwks_provider_collapses_concurrent_cold_fetches(app, stub_jwks_server):
+    stub_jwks_server["delay"] = 0.2
+    provider = JWKSProvider(get_jwks_from_auth0_uncached)
+    results = []
+
+    def worker():
+        with app.app_context():
+            results.append(provider.get())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stub_jwks_server["requests"] == 1
+    assert len(results) == 8
+    assert all(result == stub_jwks_server["jwks"] for result in results)
+
+def test_jwks_provider_serves_stale_while_refreshing(app, app_context, stub_jwks_server):
+    provider = JWKSProvider(get_jwks_from_auth0_uncached)
+    original = provider.get()
+
+    app.config["JWKS_REFRESH_INTERVAL"] = 0
+    stub_jwks_server["jwks"] = {"keys": [dict(original["keys"][0], kid="rotated-kid")]}
+    stub_jwks_server["delay"] = 0.2
+    provider.refresh()  # picks up the zero refresh interval
+    app.config["JWKS_REFRESH_INTERVAL"] = 600
+    stub_jwks_server["jwks"] = {"keys": [dict(original["keys"][0], kid="newest-kid")]}
+
+    started = time.monotonic()
+    served = provider.get()
+    # Served from memory without waiting on the slow upstream
+    assert time.monotonic() - started < 0.1
+    assert served["keys"][0]["kid"] == "rotated-kid"
+    assert _wait_for(lambda: provider.get()["keys"][0]["kid"] == "newest-kid")
+
+def test_jwks_provider_keeps_last_good_key_set_on_failure(app, app_context, stub_jwks_server):
+    provider = JWKSProvider(get_jwks_from_auth0_uncached)
+    original = provider.get()
+
+    stub_jwks_server["fail"] = True
+    assert provider.refresh() == original
+    assert provider.get() == original
+
+def test_jwks_provider_cold_failure_raises(app, app_context, stub_jwks_server):
+    stub_jwks_server["fail"] = True
+    provider = JWKSProvider(get_jwks_from_auth0_uncached)
+
+    with pytest.raises(AuthError) as exc_info:
+        provider.get()
+    assert exc_info.value.error["code"] == "jwks_fetch_error"
+
+def test_jwks_provider_cold_failure_fails_waiters_fast(app, stub_jwks_server):
+    stub_jwks_server["fail"] = True
+    stub_jwks_server["delay"] = 0.2
+    provider = JWKSProvider(get_jwks_from_auth0_uncached)
+    errors = []
+
+    def worker():
+        with app.app_context():
+            try:
+                provider.get()
+            except AuthError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stub_jwks_server["requests"] == 1
+    assert len(errors) == 8
+
+    # A later caller, not queued behind the failed fetch, tries again
+    stub_jwks_server["fail"] = False
+    with app.app_context():
+        assert provider.get() == stub_jwks_server["jwks"]
+    assert stub_jwks_server["requests"] == 2
+
+def test_jwks_provider_cached_never_fetches(app, app_context, stub_jwks_server):
+    provider = JWKSProvider(get_jwks_from_auth0_uncached)
+
+    assert provider.cached() is None
+    assert stub_jwks_server["requests"] == 0
+    assert provider.cached() is None
+
+    original = provider.get()
+    assert provider.cached() == original
+    assert stub_jwks_server["requests"] == 1
+
+def test_jwks_provider_fingerprints_each_key_set_once(app, app_context, stub_jwks_server, mocker):
+    fingerprint = mocker.spy(jwks_module, "jwks_fingerprint")
+    provider = JWKSProvider(get_jwks_from_auth0_uncached)
+    jwks = provider.get()
+    calls = fingerprint.call_count
+
+    assert provider.fingerprint(jwks) == jwks_fingerprint(jwks)
+    assert provider.fingerprint(provider.get()) == provider.fingerprint(jwks)
+    assert fingerprint.call_count == calls
+
+def test_public_key_index_lookup_skips_hashing_known_key_sets(rsa_signing_key, mocker):
+    _, public_jwk = rsa_signing_key
+    jwks = {"keys": [public_jwk]}
+    index = get_public_key_index(jwks)
+    fingerprint = mocker.spy(jwks_module, "jwks_fingerprint")
+
+    # The same object is matched by identity, an equal one by the fingerprint the caller already has
+    assert get_public_key_index(jwks) is index
+    assert get_public_key_index({"keys": [dict(public_jwk)]}, index.fingerprint) is index
+    assert fingerprint.call_count == 0
@@ -0,0 +1,118 @@
+import pytest
+from flask import Flask
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from unittest.mock import MagicMock
+
+from app.config import TestingConfig
+from app.extensions import db as _db, cache as _cache
+from app.identity_map import IdentityMap
+from app.metrics import InstrumentedQueuePool, metrics
+from routes.expense_routes import expense_bp
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+@pytest.fixture
+def app():
+    _app = Flask(__name__)
+    _app.config.from_object(TestingConfig)
+    _app.logger = MagicMock()
+    with _app.app_context():
+        metrics.init_app(_app)
+        _db.init_app(_app)
+        _cache.init_app(_app)
+        _app.register_blueprint(expense_bp, url_prefix="/api/expenses")
+    yield _app
+
+def test_request_latency_status_and_queries_are_recorded(client, db, seed_test_user):
+    route = {"blueprint": "expenses", "endpoint": "expenses.get_all_expenses", "method": "GET"}
+    requests_before = sample("fintrack_http_requests_total", status="200", **route)
+    latency_before = sample("fintrack_http_request_duration_seconds_count", **route)
+    queries_before = sample("fintrack_db_query_duration_seconds_count", endpoint="expenses.get_all_expenses", operation="SELECT")
+
+    response = client.get("/api/expenses/get_all")
+
+    assert response.status_code == 200
+    assert sample("fintrack_http_requests_total", status="200", **route) == requests_before + 1
+    assert sample("fintrack_http_request_duration_seconds_count", **route) == latency_before + 1
+    assert sample("fintrack_db_query_duration_seconds_count", endpoint="expenses.get_all_expenses", operation="SELECT") > queries_before
+    assert sample("fintrack_db_queries_per_request_count", endpoint="expenses.get_all_expenses") >= 1
+
+def test_unmatched_urls_share_one_label(client):
+    labels = {"blueprint": "", "endpoint": "unmatched", "method": "GET", "status": "404"}
+    before = sample("fintrack_http_requests_total", **labels)
+
+    client.get("/no/such/route/1")
+    client.get("/no/such/route/2")
+
+    assert sample("fintrack_http_requests_total", **labels) == before + 2
+
+def test_cache_lookups_are_counted(app_context):
+    hits = sample("fintrack_cache_lookups_total", cache="identity", result="hit")
+    misses = sample("fintrack_cache_lookups_total", cache="identity", result="miss")
+
+    identity_map = IdentityMap()
+    identity_map.get("auth0|metrics")
+    identity_map.set("auth0|metrics", 7)
+    identity_map.get("auth0|metrics")
+
+    assert sample("fintrack_cache_lookups_total", cache="identity", result="hit") == hits + 1
+    assert sample("fintrack_cache_lookups_total", cache="identity", result="miss") == misses + 1
+
+def test_instrumented_pool_times_checkouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool)
+    waits = sample("fintrack_db_pool_checkout_wait_seconds_count")
+    checked_out = sample("fintrack_db_pool_checked_out_connections")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert sample("fintrack_db_pool_checked_out_connections") == checked_out + 1
+
+    assert sample("fintrack_db_pool_checkout_wait_seconds_count") == waits + 1
+    assert sample("fintrack_db_pool_checked_out_connections") == checked_out
+    engine.dispose()
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert b"fintrack_http_requests_total{" in response.data
+
+def test_metrics_endpoint_requires_token_when_configured(app, client):
+    app.config["METRICS_AUTH_TOKEN"] = "scrape-secret"
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+def test_metrics_can_be_disabled():
+    _app = Flask(__name__)
+    _app.config.from_object(TestingConfig)
+    _app.config["METRICS_ENABLED"] = False
+
+    metrics.init_app(_app)
+
+    assert "metrics" not in _app.view_functions
+    assert not _app.before_request_funcs
+
+def test_metrics_endpoint_needs_token_outside_debug():
+    _app = Flask(__name__)
+    _app.config.from_object(TestingConfig)
+    _app.config["DEBUG"] = False
+    _app.logger = MagicMock()
+
+    metrics.init_app(_app)
+
+    assert "metrics" not in _app.view_functions
+    assert _app.before_request_funcs  # still collected, just not served
+    _app.logger.warning.assert_called_once()
+
+    _app = Flask(__name__)
+    _app.config.from_object(TestingConfig)
+    _app.config.update(DEBUG=False, METRICS_AUTH_TOKEN="scrape-secret")
+    metrics.init_app(_app)
+    assert "metrics" in _app.view_functions
@@ -0,0 +1,56 @@
+import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.commands import expenses_cli
+from app.partitions import create_partition, ensure_partitions, partition_ranges
+
+def test_partition_ranges_monthly_across_year_end():
+    ranges = partition_ranges(datetime.date(2024, 11, 20), datetime.date(2025, 1, 3), "month")
+    assert ranges == [
+        ("expenses_y2024m11", datetime.date(2024, 11, 1), datetime.date(2024, 12, 1)),
+        ("expenses_y2024m12", datetime.date(2024, 12, 1), datetime.date(2025, 1, 1)),
+        ("expenses_y2025m01", datetime.date(2025, 1, 1), datetime.date(2025, 2, 1)),
+    ]
+
+def test_partition_ranges_yearly():
+    assert partition_ranges(datetime.date(2024, 6, 1), datetime.date(2025, 6, 1), "year") == [
+        ("expenses_y2024", datetime.date(2024, 1, 1), datetime.date(2025, 1, 1)),
+        ("expenses_y2025", datetime.date(2025, 1, 1), datetime.date(2026, 1, 1)),
+    ]
+    with pytest.raises(ValueError, match="Unsupported partition interval"):
+        partition_ranges(datetime.date(2024, 6, 1), datetime.date(2025, 6, 1), "week")
+
+def test_ensure_partitions_creates_only_missing_periods(mocker):
+    mocker.patch("app.partitions.existing_partitions", return_value={"expenses_y2025m06", "expenses_y2025m08"})
+    create = mocker.patch("app.partitions.create_partition")
+
+    created = ensure_partitions(MagicMock(), "month", 3, today=datetime.date(2025, 6, 15))
+
+    assert created == ["expenses_y2025m07", "expenses_y2025m09"]
+    assert create.call_args_list[0].args[1:] == ("expenses_y2025m07", datetime.date(2025, 7, 1), datetime.date(2025, 8, 1))
+
+def test_create_partition_moves_rows_out_of_default_partition():
+    connection = MagicMock()
+    connection.execute.return_value.scalar.return_value = 2
+
+    assert create_partition(connection, "expenses_y2025m07", datetime.date(2025, 7, 1), datetime.date(2025, 8, 1)) == 2
+
+    statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+    assert [statement.split(" (")[0].split(" FROM")[0] for statement in statements] == [
+        "SELECT count(*)",
+        "CREATE TEMP TABLE expenses_moving ON COMMIT DROP AS SELECT id, user_id, date, description, amount, category, created_at",
+        "DELETE",
+        "CREATE TABLE expenses_y2025m07 PARTITION OF expenses FOR VALUES",
+        "INSERT INTO expenses",
+        "DROP TABLE expenses_moving",
+    ]
+    assert "FROM ('2025-07-01') TO ('2025-08-01')" in statements[3]
+
+def test_ensure_partitions_command_without_partitioning(app, db):
+    app.cli.add_command(expenses_cli)
+    result = app.test_cli_runner().invoke(args=["expenses", "ensure-partitions"])
+
+    assert result.exit_code == 0
+    assert "The expenses table is not partitioned; nothing to do." in result.output
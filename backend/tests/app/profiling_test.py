@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from flask import Flask, jsonify
+from sqlalchemy import text
+from unittest.mock import MagicMock
+
+from app.config import TestingConfig
+from app.extensions import db as _db, cache as _cache
+from app.profiling import profiler, statement_shape
+from routes.expense_routes import expense_bp
+
+@pytest.fixture
+def app():
+    _app = Flask(__name__)
+    _app.config.from_object(TestingConfig)
+    _app.config["SQL_PROFILING_ENABLED"] = True
+    _app.config["SQL_PROFILING_REPEAT_THRESHOLD"] = 3
+    _app.logger = MagicMock()
+    with _app.app_context():
+        profiler.init_app(_app)
+        _db.init_app(_app)
+        _cache.init_app(_app)
+        _app.register_blueprint(expense_bp)
+
+    @_app.route("/n_plus_one")
+    def n_plus_one():
+        for user_id in range(4):
+            _db.session.execute(text("SELECT id FROM users WHERE id = :id"), {"id": user_id})
+        return jsonify([])
+
+    yield _app
+
+def _logged(mock_method, prefix):
+    return [call.args[0] for call in mock_method.call_args_list if call.args[0].startswith(prefix)]
+
+def test_statement_shape_collapses_parameter_lists():
+    assert statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?)") == "SELECT * FROM t WHERE id IN (...)"
+    assert statement_shape("SELECT * FROM t WHERE id IN (%(id_1)s)") == "SELECT * FROM t WHERE id IN (...)"
+    assert statement_shape("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (...)"
+
+def test_profiled_request_reports_server_timing_and_log_line(app, client, db, seed_test_user):
+    response = client.get("/get_all")
+
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    for phase in ("auth;dur=", "serialize;dur=", "total;dur="):
+        assert phase in timing
+
+    (line,) = _logged(app.logger.info, "Request profile: ")
+    summary = json.loads(line.removeprefix("Request profile: "))
+    assert summary["endpoint"] == "expenses.get_all_expenses"
+    assert summary["status"] == 200
+    assert summary["statements"] >= 1
+    assert summary["slowest_ms"] <= summary["db_ms"]
+    assert summary["slowest_statement"] is not None
+    assert set(summary["phases_ms"]) >= {"auth", "serialize"}
+
+def test_repeated_statement_logs_n_plus_one_warning(app, client, db):
+    response = client.get("/n_plus_one")
+
+    assert 'desc="4 statements"' in response.headers["Server-Timing"]
+    (warning,) = _logged(app.logger.warning, "Possible N+1")
+    assert "ran 4 times: SELECT id FROM users WHERE id = ?" in warning
+
+def test_statements_below_threshold_are_not_flagged(app, client, db):
+    app.config["SQL_PROFILING_REPEAT_THRESHOLD"] = 5
+
+    client.get("/n_plus_one")
+
+    assert not _logged(app.logger.warning, "Possible N+1")
+
+def test_profiling_is_off_by_default():
+    _app = Flask(__name__)
+    _app.config.from_object(TestingConfig)
+
+    profiler.init_app(_app)
+
+    assert not _app.before_request_funcs
+    assert not _app.after_request_funcs
@@ -0,0 +1,157 @@
+import datetime
+import pytest
+from decimal import Decimal
+
+from app.commands import rollups_cli
+from app.expense_queries import build_aggregate_query, parse_expense_filters, serialize_aggregate_rows
+from app.rollups import build_rollup_aggregate_query, rebuild_rollups, rollups_can_serve
+from models.expense import Expense
+from models.expense_daily_rollup import ExpenseDailyRollup
+from models.user import User
+
+def _rollups(db):
+    return {
+        (r.day.isoformat(), r.category): (r.expense_count, r.amount_total)
+        for r in db.session.query(ExpenseDailyRollup).all()
+    }
+
+def _expense(user_id, amount, category, day, hour=12):
+    return Expense(user_id=user_id, description="Rollup test", amount=Decimal(amount), category=category,
+                   date=datetime.datetime(2025, 5, day, hour, 0))
+
+def test_rollups_follow_orm_inserts(db, seed_test_user):
+    db.session.add_all([
+        _expense(seed_test_user.id, "10.00", "Food", 1, hour=9),
+        _expense(seed_test_user.id, "2.50", "Food", 1, hour=18),
+        _expense(seed_test_user.id, "7.00", None, 2),
+    ])
+    db.session.commit()
+
+    assert _rollups(db) == {
+        ("2025-05-01", "Food"): (2, Decimal("12.50")),
+        ("2025-05-02", ""): (1, Decimal("7.00")),
+    }
+
+def test_rollups_follow_orm_updates_and_deletes(db, seed_test_user):
+    first = _expense(seed_test_user.id, "10.00", "Food", 1)
+    second = _expense(seed_test_user.id, "5.00", "Food", 1)
+    db.session.add_all([first, second])
+    db.session.commit()
+
+    first.amount = Decimal("11.00")
+    second.category = "Travel"
+    second.date = datetime.datetime(2025, 5, 3, 8, 0)
+    db.session.commit()
+    assert _rollups(db) == {
+        ("2025-05-01", "Food"): (1, Decimal("11.00")),
+        ("2025-05-03", "Travel"): (1, Decimal("5.00")),
+    }
+
+    db.session.delete(first)
+    db.session.commit()
+    # Rows that reach zero are removed
+    assert _rollups(db) == {("2025-05-03", "Travel"): (1, Decimal("5.00"))}
+
+def test_rollups_roll_back_with_failed_write(db, seed_test_user):
+    db.session.add(_expense(seed_test_user.id, "10.00", "Food", 1))
+    db.session.flush()
+    db.session.rollback()
+
+    assert _rollups(db) == {}
+
+def test_deleting_user_removes_rollups(db, seed_test_user):
+    db.session.add(_expense(seed_test_user.id, "10.00", "Food", 1))
+    db.session.commit()
+
+    db.session.delete(seed_test_user)
+    db.session.commit()
+
+    assert db.session.query(ExpenseDailyRollup).count() == 0
+
+def test_rebuild_repairs_rollups(db, seed_test_user):
+    db.session.add_all([_expense(seed_test_user.id, "10.00", "Food", 1), _expense(seed_test_user.id, "3.00", None, 4)])
+    db.session.commit()
+    expected = _rollups(db)
+
+    db.session.query(ExpenseDailyRollup).update({"expense_count": 99})
+    db.session.commit()
+    rebuild_rollups(db.session.connection(), user_id=seed_test_user.id)
+    db.session.commit()
+
+    assert _rollups(db) == expected
+
+def test_rebuild_cli_command(app, db, seed_test_user):
+    db.session.add(_expense(seed_test_user.id, "10.00", "Food", 1))
+    db.session.commit()
+    db.session.query(ExpenseDailyRollup).delete()
+    db.session.commit()
+
+    app.cli.add_command(rollups_cli)
+    result = app.test_cli_runner().invoke(args=["rollups", "rebuild"])
+
+    assert result.exit_code == 0
+    assert "Rebuilt 1 daily rollup rows for all users." in result.output
+    assert _rollups(db) == {("2025-05-01", "Food"): (1, Decimal("10.00"))}
+
+def test_rebuild_cli_command_invalidates_cached_reads(app, db, seed_test_user, mocker):
+    other_user = User(auth0_subject="auth0|rollup_other")
+    db.session.add(other_user)
+    db.session.flush()
+    db.session.add_all([_expense(seed_test_user.id, "10.00", "Food", 1), _expense(other_user.id, "4.00", None, 2)])
+    db.session.commit()
+    bump = mocker.patch("app.commands.bump_data_version")
+
+    app.cli.add_command(rollups_cli)
+    app.test_cli_runner().invoke(args=["rollups", "rebuild"])
+    assert sorted(call.args[0] for call in bump.call_args_list) == sorted([seed_test_user.id, other_user.id])
+
+    bump.reset_mock()
+    app.test_cli_runner().invoke(args=["rollups", "rebuild", "--user-id", str(other_user.id)])
+    bump.assert_called_once_with(other_user.id)
+
+def test_rollups_can_serve():
+    from werkzeug.datastructures import MultiDict
+
+    assert rollups_can_serve({})
+    assert rollups_can_serve(parse_expense_filters(MultiDict({"date_from": "2025-01-01", "date_to": "2025-01-31", "category": "Food"})))
+    assert not rollups_can_serve(parse_expense_filters(MultiDict({"date_from": "2025-01-01T12:00:00"})))
+    assert not rollups_can_serve(parse_expense_filters(MultiDict({"amount_min": "5"})))
+    assert not rollups_can_serve(parse_expense_filters(MultiDict({"q": "coffee"})))
+
+@pytest.mark.parametrize("period, by_category", [(None, False), ("day", True), ("week", False), ("month", True), ("year", False)])
+def test_rollup_aggregates_match_expense_aggregates(db, seed_test_user, period, by_category):
+    other = User(auth0_subject="auth0|someone_else")
+    db.session.add(other)
+    db.session.flush()
+    db.session.add_all([
+        _expense(seed_test_user.id, "10.00", "Food", 1),
+        _expense(seed_test_user.id, "2.25", "Food", 1),
+        _expense(seed_test_user.id, "7.10", None, 6),
+        _expense(seed_test_user.id, "3.33", "Travel", 20),
+        _expense(other.id, "1000.00", "Food", 1),
+    ])
+    db.session.commit()
+
+    def run(build):
+        stmt = build("sqlite", seed_test_user.id, period, by_category, {})
+        return serialize_aggregate_rows(db.session.execute(stmt).all(), period, by_category)
+
+    assert run(build_rollup_aggregate_query) == run(build_aggregate_query)
+
+def test_empty_and_missing_categories_group_together_on_both_paths(client, db, seed_test_user):
+    for category in ("", None, "Food"):
+        body = {"description": "Rollup test", "amount": "5.00", "date": "2025-05-01T12:00:00"}
+        if category is not None:
+            body["category"] = category
+        assert client.post("/create", json=body).status_code == 201
+
+    def run(build):
+        stmt = build("sqlite", seed_test_user.id, None, True, {})
+        return serialize_aggregate_rows(db.session.execute(stmt).all(), None, True)
+
+    expected = [
+        {"category": None, "total": "10.00", "count": 2, "average": "5.00"},
+        {"category": "Food", "total": "5.00", "count": 1, "average": "5.00"},
+    ]
+    assert run(build_aggregate_query) == expected
+    assert run(build_rollup_aggregate_query) == expected
@@ -0,0 +1,62 @@
+import time
+
+from app.auth_utils import requires_auth
+from app.token_cache import VerifiedTokenCache
+
+from tests.conftest import SAMPLE_JWKS, SAMPLE_PAYLOAD, TEST_TOKEN
+
+def test_token_cache_hit_after_set(app_context):
+    token_cache = VerifiedTokenCache()
+    token_cache.set(TEST_TOKEN, SAMPLE_PAYLOAD, "fp-1")
+
+    assert token_cache.get(TEST_TOKEN, "fp-1") == SAMPLE_PAYLOAD
+    assert token_cache.get("another.jwt.token", "fp-1") is None
+
+def test_token_cache_skips_tokens_without_exp(app_context):
+    token_cache = VerifiedTokenCache()
+    token_cache.set(TEST_TOKEN, {"sub": "auth0|no_exp"}, "fp-1")
+
+    assert token_cache.get(TEST_TOKEN, "fp-1") is None
+
+def test_token_cache_entry_expires_at_exp(app_context, mocker):
+    token_cache = VerifiedTokenCache()
+    now = time.time()
+    token_cache.set(TEST_TOKEN, {"sub": "auth0|short", "exp": now + 60}, "fp-1")
+    assert token_cache.get(TEST_TOKEN, "fp-1") is not None
+
+    mocker.patch("app.caching.time.time", return_value=now + 61)
+    assert token_cache.get(TEST_TOKEN, "fp-1") is None
+
+def test_token_cache_dropped_on_jwks_rotation(app_context):
+    token_cache = VerifiedTokenCache()
+    token_cache.set(TEST_TOKEN, SAMPLE_PAYLOAD, "fp-1")
+
+    assert token_cache.get(TEST_TOKEN, "fp-2") is None
+    # Rotating back must not resurrect entries verified against the old key set
+    assert token_cache.get(TEST_TOKEN, "fp-1") is None
+
+def test_token_cache_shared_tier(app, app_context):
+    app.config["SHARED_CACHE_ENABLED"] = True
+
+    VerifiedTokenCache().set(TEST_TOKEN, SAMPLE_PAYLOAD, "fp-1")
+    # A second cache instance (i.e. another worker) finds the entry in the shared tier
+    assert VerifiedTokenCache().get(TEST_TOKEN, "fp-1") == SAMPLE_PAYLOAD
+
+def test_requires_auth_verifies_repeat_token_once(
+    app_context, request_context,
+    mock_get_token_auth_header,
+    mock_get_jwks_from_auth0_uncached,
+    mock_verify_decode_jwt
+):
+    mock_get_token_auth_header.return_value = TEST_TOKEN
+    mock_get_jwks_from_auth0_uncached.return_value = SAMPLE_JWKS
+    mock_verify_decode_jwt.return_value = SAMPLE_PAYLOAD
+
+    @requires_auth
+    def protected_route():
+        return "Authenticated", 200
+
+    protected_route()
+    protected_route()
+
+    mock_verify_decode_jwt.assert_called_once_with(TEST_TOKEN, SAMPLE_JWKS)
@@ -7,7 +7,7 @@ from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
 from app.config import TestingConfig
-from app.extensions import db as _db
+from app.extensions import db as _db, cache as _cache
 from routes.expense_routes import expense_bp
 
 # Enabling FK pragma to avoid IntegrityErrors when testing models
@@ -27,7 +27,9 @@ def app():
 
     with _app.app_context():
         _db.init_app(_app)
-        
+        # Fresh SimpleCache per app; shared-tier caching stays off unless a test enables SHARED_CACHE_ENABLED
+        _cache.init_app(_app)
+
         # tested route blueprints
         _app.register_blueprint(expense_bp)
 
@@ -116,29 +118,57 @@ SAMPLE_PAYLOAD = {
 TEST_TOKEN = "fake.jwt.token"
 SAMPLE_UNVERIFIED_HEADER = {"alg": "RS256", "typ": "JWT", "kid": "test_kid_123"}
 
-@pytest.fixture
-def mock_auth_utils_cache(mocker):
-    """
-    Mocks the 'cache' object as imported and used within 'app.auth_utils'.
-    The patch target 'app.auth_utils.cache' assumes 'auth_utils.py' is in the 'app' package
-    and imports cache as 'from .extensions import cache'.
-    """
-    mock_cache_instance = MagicMock()
-    # .memoize(timeout) returns a decorator. That decorator(func) returns func.
-    mock_cache_instance.memoize = MagicMock(side_effect=lambda timeout: lambda func: func)
-    mock_cache_instance.delete_memoized = MagicMock()
+@pytest.fixture(autouse=True)
+def reset_token_cache():
+    """Verified-token cache is process-global; keep tests isolated from each other."""
+    from app.token_cache import token_cache
+    token_cache.clear()
+    yield
+    token_cache.clear()
 
-    # Patch 'cache' where it's referenced in app.auth_utils
-    mocker.patch('app.auth_utils.cache', new=mock_cache_instance)
-    return mock_cache_instance
+@pytest.fixture(autouse=True)
+def reset_identity_map():
+    from app.identity_map import identity_map
+    identity_map.clear()
+    yield
+    identity_map.clear()
+
+@pytest.fixture(autouse=True)
+def reset_replica_state():
+    from app.db_routing import reset_replica_state
+    reset_replica_state()
+    yield
+
+@pytest.fixture(autouse=True)
+def reset_jwks_state(mocker):
+    """JWKS provider, public key index and unknown-kid refresh limiter are process-global too."""
+    from app.auth_utils import jwks_provider
+    from app.jwks import reset_public_key_index
+    jwks_provider.invalidate()
+    reset_public_key_index()
+    mocker.patch("app.auth_utils._last_forced_refresh", None)
+    yield
+    jwks_provider.invalidate()
+    reset_public_key_index()
+
+@pytest.fixture(scope="session")
+def rsa_signing_key():
+    """A real RSA key pair as (private_key, public JWK dict) for end-to-end token verification."""
+    import json
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jwt.algorithms import RSAAlgorithm
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    public_jwk.update({"kid": TestingConfig.KID, "alg": "RS256", "use": "sig"})
+    return private_key, public_jwk
 
 @pytest.fixture(autouse=True)
 def mock_auth_for_protected_routes(
     mocker,
     mock_get_token_auth_header,
     mock_get_jwks_from_auth0_uncached,
-    mock_verify_decode_jwt,
-    mock_auth_utils_cache
+    mock_verify_decode_jwt
 ):
     """
     Automatically mock auth and internal user lookup for all protected route tests.
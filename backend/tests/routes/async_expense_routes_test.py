@@ -0,0 +1,128 @@
+import asyncio
+import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from starlette.testclient import TestClient
+from unittest.mock import MagicMock
+
+from app.asgi import create_asgi_app
+from app.config import TestingConfig
+from app.extensions import db as _db, cache as _cache
+from models.expense import Expense
+from routes.expense_routes import expense_bp
+
+AUTH = {"Authorization": "Bearer test-token"}
+
+@pytest.fixture
+def app(tmp_path):
+    """A file database, so the Flask app and the async engine see the same rows."""
+    _app = Flask(__name__)
+    _app.config.from_object(TestingConfig)
+    _app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'fintrack.db'}"
+    _app.logger = MagicMock()
+    with _app.app_context():
+        _db.init_app(_app)
+        _cache.init_app(_app)
+        _app.register_blueprint(expense_bp, url_prefix="/api/expenses")
+    yield _app
+
+@pytest.fixture
+def expenses(db, seed_test_user):
+    rows = [
+        Expense(user_id=seed_test_user.id, description=f"Coffee {i}", amount=Decimal("3.50") + i,
+                category=("Food", "Travel")[i % 2], date=datetime.datetime(2025, 1, 1 + i, 9, 30))
+        for i in range(5)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return [expense.id for expense in rows]
+
+@pytest.fixture
+def asgi_client(app):
+    with TestClient(create_asgi_app(app)) as client:
+        yield client
+
+@pytest.mark.parametrize("url", [
+    "/api/expenses/get_by_id/1",
+    "/api/expenses/get_by_id/1?date=2025-01-01",
+    "/api/expenses/get_by_id/999",
+    "/api/expenses/get_by_ids?ids=2,999,1&fields=id,amount",
+    "/api/expenses/get_all",
+    "/api/expenses/get_all?limit=2&category=Food",
+    "/api/expenses/get_all?all=true&fields=id,description",
+    "/api/expenses/get_all?limit=0",
+    "/api/expenses/aggregate?group_by=month,category",
+    "/api/expenses/search?q=coffee&limit=2",
+    "/api/expenses/export",
+    "/api/expenses/export?format=json&fields=id,date",
+])
+def test_async_reads_match_wsgi_routes(client, asgi_client, expenses, url):
+    expected = client.get(url, headers=AUTH)
+    response = asgi_client.get(url, headers=AUTH)
+
+    assert response.status_code == expected.status_code
+    # TestingConfig's DEBUG makes jsonify pretty-print, so JSON bodies are compared decoded
+    if expected.mimetype == "application/json":
+        assert response.json() == expected.get_json()
+    else:
+        assert response.content == expected.data
+    assert response.headers.get("ETag") == expected.headers.get("ETag")
+    assert response.headers["Content-Type"].split(";")[0] == expected.mimetype
+
+def test_async_read_honours_if_none_match(app, client, asgi_client, expenses):
+    # ETags come from the shared data version
+    app.config["SHARED_CACHE_ENABLED"] = True
+    first = asgi_client.get("/api/expenses/get_all", headers=AUTH)
+    assert first.headers["ETag"] == client.get("/api/expenses/get_all", headers=AUTH).headers["ETag"]
+
+    response = asgi_client.get("/api/expenses/get_all", headers={**AUTH, "If-None-Match": first.headers["ETag"]})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == first.headers["ETag"]
+
+def test_async_reads_keep_shared_cache_calls_off_the_event_loop(app, asgi_client, expenses, mocker):
+    app.config["SHARED_CACHE_ENABLED"] = True
+    on_loop = []
+
+    def off_loop_check(method):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(method.__name__)
+            except RuntimeError:
+                pass
+            return method(*args, **kwargs)
+        return wrapper
+
+    for name in ("get", "set", "add"):
+        mocker.patch.object(_cache, name, off_loop_check(getattr(_cache, name)))
+
+    for url in ("/api/expenses/get_all", "/api/expenses/get_all", "/api/expenses/aggregate?group_by=month",
+                "/api/expenses/search?q=coffee", "/api/expenses/get_by_id/1", "/api/expenses/get_by_ids?ids=1,2"):
+        assert asgi_client.get(url, headers=AUTH).status_code == 200
+    assert on_loop == []
+
+def test_async_read_requires_bearer_token(asgi_client, db):
+    response = asgi_client.get("/api/expenses/get_all")
+
+    assert response.status_code == 401
+    assert response.json()["code"] == "authorization_header_missing"
+
+def test_async_auth_uses_token_cache(asgi_client, expenses, mock_verify_decode_jwt):
+    mock_verify_decode_jwt.return_value = {"sub": "auth0|testuser123", "exp": 9999999999}
+
+    asgi_client.get("/api/expenses/get_all", headers=AUTH)
+    asgi_client.get("/api/expenses/get_all", headers=AUTH)
+
+    mock_verify_decode_jwt.assert_called_once()
+
+def test_writes_are_served_by_flask_app(asgi_client, client, seed_test_user):
+    response = asgi_client.post(
+        "/api/expenses/create", headers=AUTH, json={"description": "Train", "amount": "12.00", "date": "2025-02-01"}
+    )
+
+    assert response.status_code == 201
+    listed = asgi_client.get("/api/expenses/get_all", headers=AUTH).json()
+    assert [item["description"] for item in listed["items"]] == ["Train"]
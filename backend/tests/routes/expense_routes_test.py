@@ -25,7 +25,10 @@ def test_create_expense_missing_fields(client):
     response = client.post("/create", json=data)
     assert response.status_code == 400
     response_data = response.get_json()
-    assert response_data == {"error": "Missing required fields: description, amount"}
+    assert response_data == {
+        "error": "Missing required fields: description, amount",
+        "fields": {"description": "This field is required.", "amount": "This field is required."},
+    }
 
 @pytest.mark.usefixtures("seed_test_user")
 def test_create_expense_invalid_amount(client):
@@ -33,7 +36,7 @@ def test_create_expense_invalid_amount(client):
     response = client.post("/create", json=data)
     assert response.status_code == 400
     response_data = response.get_json()
-    assert response_data == {"error": "Invalid amount format. Must be a number."}
+    assert response_data == {"error": "Invalid amount format. Must be a number.", "fields": {"amount": "Invalid amount format. Must be a number."}}
 
 @pytest.mark.usefixtures("seed_test_user")
 def test_create_expense_negative_amount(client):
@@ -41,7 +44,7 @@ def test_create_expense_negative_amount(client):
     response = client.post("/create", json=data)
     assert response.status_code == 400
     response_data = response.get_json()
-    assert response_data == {"error": "Amount must be a positive number."}
+    assert response_data == {"error": "Amount must be a positive number.", "fields": {"amount": "Amount must be a positive number."}}
 
 @pytest.mark.usefixtures("seed_test_user")
 def test_create_expense_invalid_description(client):
@@ -49,7 +52,8 @@ def test_create_expense_invalid_description(client):
     response = client.post("/create", json=data)
     assert response.status_code == 400
     response_data = response.get_json()
-    assert response_data == {"error": "Description must be a string between 1 and 200 characters."}
+    assert response_data["error"] == "Description must be a string between 1 and 200 characters."
+    assert response_data["fields"] == {"description": response_data["error"]}
 
 @pytest.mark.usefixtures("seed_test_user")
 def test_create_expense_invalid_date_format(client):
@@ -61,7 +65,8 @@ def test_create_expense_invalid_date_format(client):
     response = client.post("/create", json=data)
     assert response.status_code == 400
     response_data = response.get_json()
-    assert response_data == {"error": "Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ)."}
+    assert response_data["error"] == "Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ)."
+    assert response_data["fields"] == {"date": response_data["error"]}
 
 @pytest.mark.usefixtures("seed_test_user")
 def test_create_expense_invalid_category(client):
@@ -73,7 +78,8 @@ def test_create_expense_invalid_category(client):
     response = client.post("/create", json=data)
     assert response.status_code == 400
     response_data = response.get_json()
-    assert response_data == {"error": "Category, if provided, must be a string no longer than 50 characters."}
+    assert response_data["error"] == "Category, if provided, must be a string no longer than 50 characters."
+    assert response_data["fields"] == {"category": response_data["error"]}
 
 @pytest.mark.usefixtures("seed_test_user")
 def test_create_expense_user_not_found(client, mocker):
@@ -116,6 +122,20 @@ def test_get_expense_by_id_success(client, db):
     response_data = response.get_json()
     assert response_data["description"] == expense.description
 
+@pytest.mark.usefixtures("seed_test_user")
+def test_expense_date_hint(client):
+    # ?date= narrows lookups by id to the expense's day, so Postgres scans one date partition
+    expense_id = client.post("/create", json={"description": "Lunch", "amount": "9.99", "date": "2025-06-01T12:30:00Z"}).get_json()["id"]
+
+    assert client.get(f"/get_by_id/{expense_id}?date=2025-06-01").get_json()["id"] == expense_id
+    assert client.get(f"/get_by_id/{expense_id}?date=2025-06-02").get_json() == []
+    assert client.get(f"/get_by_id/{expense_id}?date=June").get_json() == {"error": "date must be an ISO 8601 date or datetime."}
+
+    assert client.patch(f"/update/{expense_id}?date=2025-05-31", json={"amount": "1.00"}).status_code == 404
+    assert client.patch(f"/update/{expense_id}?date=2025-06-01T00:00:00", json={"amount": "1.00"}).status_code == 200
+    assert client.delete(f"/delete/{expense_id}?date=2025-06-02").status_code == 404
+    assert client.delete(f"/delete/{expense_id}?date=2025-06-01").get_json()["amount"] == "1.00"
+
 @pytest.mark.usefixtures("seed_test_user")
 def test_get_expense_by_id_not_found(client):
     response = client.get("/get_by_id/9999")
@@ -156,3 +176,649 @@ def test_get_expense_user_not_found(client, mocker):
     assert response.status_code == 404
     response_data = response.get_json()
     assert response_data == {"error": "Authenticated user not found in local database."}
+
+def _seed_expenses(db, count, user_id=1):
+    from models.expense import Expense
+    base = datetime.datetime(2025, 1, 1, 12, 0, 0)
+    expenses = [
+        Expense(user_id=user_id, description=f"Expense {i}", amount=Decimal("1.00") + i,
+                category="Food", date=base + datetime.timedelta(days=i // 2))
+        for i in range(count)
+    ]
+    db.session.add_all(expenses)
+    db.session.commit()
+    return expenses
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_paginates_with_cursor(client, db):
+    expenses = _seed_expenses(db, 5)
+    expected_ids = [e.id for e in sorted(expenses, key=lambda e: (e.date, e.id), reverse=True)]
+
+    seen_ids = []
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/get_all", query_string=params)
+        assert response.status_code == 200
+        page = response.get_json()
+        seen_ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Pages never overlap or skip rows, including rows that share a date
+    assert seen_ids == expected_ids
+    assert cursor is None
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_empty(client):
+    response = client.get("/get_all")
+    assert response.status_code == 200
+    assert response.get_json() == {"items": [], "next_cursor": None}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_unpaginated_opt_in(client, db):
+    _seed_expenses(db, 3)
+    response = client.get("/get_all?all=true")
+    assert response.status_code == 200
+    response_data = response.get_json()
+    assert isinstance(response_data, list)
+    assert len(response_data) == 3
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_invalid_cursor(client):
+    response = client.get("/get_all?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor."}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_invalid_limit(client):
+    response = client.get("/get_all?limit=0")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "limit must be a positive integer."}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_export_expenses_ndjson(client, db):
+    import json
+    _seed_expenses(db, 5)  # more rows than EXPENSES_EXPORT_BATCH_SIZE, so several batches are streamed
+    response = client.get("/export")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+
+    lines = response.get_data(as_text=True).splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert len(rows) == 5
+    assert rows[0]["description"] == "Expense 4"
+    assert rows[0]["amount"] == "5.00"
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_export_expenses_json_array(client, db):
+    _seed_expenses(db, 3)
+    response = client.get("/export?format=json")
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert [row["description"] for row in response.get_json()] == ["Expense 2", "Expense 1", "Expense 0"]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_export_expenses_empty_json_array(client):
+    response = client.get("/export?format=json")
+    assert response.get_json() == []
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_export_expenses_invalid_format(client):
+    response = client.get("/export?format=xml")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Unsupported export format. Use one of: ndjson, json."}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_sparse_fields(client, db):
+    _seed_expenses(db, 3)
+    response = client.get("/get_all?fields=id,amount&limit=2")
+    assert response.status_code == 200
+    page = response.get_json()
+    assert all(set(item) == {"id", "amount"} for item in page["items"])
+    # The cursor still works although date was not requested
+    next_page = client.get(f"/get_all?fields=id,amount&limit=2&cursor={page['next_cursor']}").get_json()
+    assert len(next_page["items"]) == 1
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_unknown_field(client):
+    response = client.get("/get_all?fields=id,secret")
+    assert response.status_code == 400
+    assert "Unknown field(s): secret" in response.get_json()["error"]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_empty_field_list(client):
+    response = client.get("/get_all?fields=,")
+    assert response.status_code == 400
+    assert "No fields requested" in response.get_json()["error"]
+
+def _seed_filterable_expenses(db):
+    from models.expense import Expense
+    rows = [
+        ("Coffee beans", "9.50", "Food", datetime.datetime(2025, 1, 3, 9, 0)),
+        ("Train ticket", "45.00", "Travel", datetime.datetime(2025, 1, 15, 18, 30)),
+        ("Iced COFFEE", "4.20", "Food", datetime.datetime(2025, 1, 31, 23, 59)),
+        ("Rent", "900.00", "Housing", datetime.datetime(2025, 2, 1, 0, 0)),
+        ("100% juice", "3.00", None, datetime.datetime(2025, 2, 2, 8, 0)),
+    ]
+    db.session.add_all([
+        Expense(user_id=1, description=d, amount=Decimal(a), category=c, date=dt) for d, a, c, dt in rows
+    ])
+    db.session.commit()
+
+@pytest.mark.usefixtures("seed_test_user")
+@pytest.mark.parametrize("query_string, expected", [
+    ("date_from=2025-01-10&date_to=2025-01-31", ["Iced COFFEE", "Train ticket"]),
+    ("category=Food", ["Iced COFFEE", "Coffee beans"]),
+    ("category=Travel&category=Housing", ["Rent", "Train ticket"]),
+    ("amount_min=4.20&amount_max=45", ["Iced COFFEE", "Train ticket", "Coffee beans"]),
+    ("q=coffee", ["Iced COFFEE", "Coffee beans"]),
+    ("q=100%25", ["100% juice"]),
+    ("q=coffee&category=Food&date_from=2025-01-10", ["Iced COFFEE"]),
+])
+def test_get_all_expenses_filters(client, db, query_string, expected):
+    _seed_filterable_expenses(db)
+    response = client.get(f"/get_all?{query_string}")
+    assert response.status_code == 200
+    assert [item["description"] for item in response.get_json()["items"]] == expected
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_invalid_filter(client):
+    response = client.get("/get_all?amount_min=abc")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "amount_min must be a number."}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_aggregate_expenses_by_month_and_category(client, db):
+    _seed_filterable_expenses(db)
+    response = client.get("/aggregate?group_by=month,category&category=Food,Housing")
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "group_by": ["period", "category"],
+        "period": "month",
+        "results": [
+            {"period": "2025-01-01", "category": "Food", "total": "13.70", "count": 2, "average": "6.85"},
+            {"period": "2025-02-01", "category": "Housing", "total": "900.00", "count": 1, "average": "900.00"},
+        ]
+    }
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_aggregate_expenses_by_week_starts_on_monday(client, db):
+    _seed_filterable_expenses(db)
+    response = client.get("/aggregate?group_by=week&date_from=2025-01-27")
+    results = response.get_json()["results"]
+    # Fri 2025-01-31 falls in the week of Mon 2025-01-27; Sat 02-01 and Sun 02-02 as well
+    assert results == [{"period": "2025-01-27", "total": "907.20", "count": 3, "average": "302.40"}]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_aggregate_expenses_grand_total(client, db):
+    _seed_filterable_expenses(db)
+    response = client.get("/aggregate?q=coffee")
+    assert response.get_json()["results"] == [{"total": "13.70", "count": 2, "average": "6.85"}]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_aggregate_expenses_no_rows(client):
+    response = client.get("/aggregate?group_by=category")
+    assert response.get_json()["results"] == []
+    response = client.get("/aggregate")
+    assert response.get_json()["results"] == [{"total": "0.00", "count": 0, "average": None}]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_aggregate_expenses_invalid_group_by(client):
+    response = client.get("/aggregate?group_by=fortnight")
+    assert response.status_code == 400
+    assert "Unknown group_by value(s): fortnight" in response.get_json()["error"]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_aggregate_expenses_cached_until_write(app, client, db, mocker):
+    app.config["SHARED_CACHE_ENABLED"] = True
+    _seed_filterable_expenses(db)
+    import routes.expense_routes as expense_routes
+    query_spy = mocker.spy(expense_routes, "build_rollup_aggregate_query")
+
+    first = client.get("/aggregate?group_by=year").get_json()
+    second = client.get("/aggregate?group_by=year").get_json()
+    assert first == second
+    assert query_spy.call_count == 1
+
+    client.post("/create", json={"description": "Snack", "amount": "1.00", "date": "2025-06-01T00:00:00Z"})
+    third = client.get("/aggregate?group_by=year").get_json()
+    assert query_spy.call_count == 2
+    assert third["results"][0]["count"] == 6
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_conditional_get(app, client, db, mocker):
+    app.config["SHARED_CACHE_ENABLED"] = True
+    _seed_expenses(db, 3)
+
+    first = client.get("/get_all")
+    tag = first.headers["ETag"]
+    assert tag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    execute_spy = mocker.spy(db.session, "execute")
+    not_modified = client.get("/get_all", headers={"If-None-Match": tag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert not_modified.headers["ETag"] == tag
+    assert execute_spy.call_count == 0
+
+    # Different parameters are a different representation
+    assert client.get("/get_all?limit=1", headers={"If-None-Match": tag}).status_code == 200
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_etag_changes_after_write(app, client, db):
+    app.config["SHARED_CACHE_ENABLED"] = True
+    _seed_expenses(db, 2)
+    tag = client.get("/get_all").headers["ETag"]
+
+    client.post("/create", json={"description": "Snack", "amount": "1.00"})
+    response = client.get("/get_all", headers={"If-None-Match": tag})
+
+    assert response.status_code == 200
+    assert len(response.get_json()["items"]) == 3
+    assert response.headers["ETag"] != tag
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_expense_by_id_conditional_get(app, client, db):
+    app.config["SHARED_CACHE_ENABLED"] = True
+    expense_id = client.post("/create", json={"description": "Lunch", "amount": "9.99"}).get_json()["id"]
+
+    first = client.get(f"/get_by_id/{expense_id}")
+    assert first.status_code == 200
+    response = client.get(f"/get_by_id/{expense_id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+
+    other = client.get(f"/get_by_id/{expense_id + 1}", headers={"If-None-Match": first.headers["ETag"]})
+    assert other.status_code == 200
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_no_etag_without_shared_cache(client, db):
+    _seed_expenses(db, 1)
+    response = client.get("/get_all")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_all_expenses_cached_until_write(app, client, db, mocker):
+    from prometheus_client import REGISTRY
+
+    def lookups(namespace, result):
+        return REGISTRY.get_sample_value(
+            "fintrack_cache_lookups_total", {"cache": f"expenses_{namespace}", "result": result}
+        ) or 0
+
+    before = {(namespace, result): lookups(namespace, result) for namespace in ("list", "filter") for result in ("hit", "miss")}
+    app.config["SHARED_CACHE_ENABLED"] = True
+    _seed_expenses(db, 3)
+
+    first = client.get("/get_all?limit=2").get_json()
+    execute_spy = mocker.spy(db.session, "execute")
+    second = client.get("/get_all?limit=2").get_json()
+    assert second == first
+    assert execute_spy.call_count == 0
+
+    client.get("/get_all?category=Food&all=true")
+    client.post("/create", json={"description": "Snack", "amount": "1.00"})
+    third = client.get("/get_all?limit=2").get_json()
+    assert third != first
+    counted = {(namespace, result): lookups(namespace, result) - count for (namespace, result), count in before.items()}
+    assert counted == {("list", "hit"): 1, ("list", "miss"): 2, ("filter", "hit"): 0, ("filter", "miss"): 1}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_get_expenses_by_ids_in_request_order(client, db, mocker):
+    from models.user import User
+    other = User(auth0_subject="auth0|someone_else")
+    db.session.add(other)
+    db.session.commit()
+    mine = _seed_expenses(db, 3)
+    theirs = _seed_expenses(db, 1, user_id=other.id)
+    ids = [mine[2].id, theirs[0].id, 9999, mine[0].id, mine[2].id]
+
+    execute_spy = mocker.spy(db.session, "execute")
+    response = client.get(f"/get_by_ids?ids={','.join(map(str, ids))}&fields=id,amount")
+
+    assert response.status_code == 200
+    assert execute_spy.call_count == 1
+    assert response.get_json()["results"] == [
+        {"id": mine[2].id, "amount": "3.00"},
+        {"id": theirs[0].id, "error": "not_found"},
+        {"id": 9999, "error": "not_found"},
+        {"id": mine[0].id, "amount": "1.00"},
+        {"id": mine[2].id, "amount": "3.00"},
+    ]
+
+@pytest.mark.usefixtures("seed_test_user")
+@pytest.mark.parametrize("query, error", [
+    ("", "At least one id must be given."),
+    ("?ids=1,abc", "Invalid id: abc. Ids must be positive integers."),
+    ("?ids=0", "Invalid id: 0. Ids must be positive integers."),
+    ("?ids=1,%C2%B2", "Invalid id: ². Ids must be positive integers."),
+    ("?ids=99999999999999999999999", "Invalid id: 99999999999999999999999. Ids must be positive integers."),
+    ("?ids=1,2,3&ids=4,5,6", "At most 5 ids may be requested at once."),
+])
+def test_get_expenses_by_ids_invalid(client, query, error):
+    response = client.get(f"/get_by_ids{query}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+def _seed_searchable_expenses(db):
+    from models.expense import Expense
+    rows = [
+        ("Coffee beans", "Groceries", "8.50", 1),
+        ("Flat white", "Coffee", "3.20", 2),
+        ("Coffee with Sam", "Eating out", "4.10", 3),
+        ("Train ticket", "Travel", "12.00", 4),
+        ("Café crème", None, "3.00", 5),
+    ]
+    expenses = [
+        Expense(user_id=1, description=description, category=category, amount=Decimal(amount),
+                date=datetime.datetime(2025, 3, day, 9, 0))
+        for description, category, amount, day in rows
+    ]
+    db.session.add_all(expenses)
+    db.session.commit()
+    return expenses
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_search_expenses_ranked_prefix_match(client, db):
+    _seed_searchable_expenses(db)
+
+    response = client.get("/search?q=cof&fields=description")
+    assert response.status_code == 200
+    # Description matches outrank the category-only match, shorter descriptions first
+    assert response.get_json() == {
+        "items": [{"description": "Coffee beans"}, {"description": "Coffee with Sam"}, {"description": "Flat white"}],
+        "next_offset": None,
+    }
+
+    both_terms = client.get("/search?q=coffee+bea&fields=description").get_json()["items"]
+    assert both_terms == [{"description": "Coffee beans"}]
+    # Diacritics are folded on both sides
+    assert client.get("/search?q=cafe&fields=description").get_json()["items"] == [{"description": "Café crème"}]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_search_expenses_paginates_and_filters(client, db):
+    _seed_searchable_expenses(db)
+
+    first = client.get("/search?q=coffee&limit=2&fields=description").get_json()
+    assert first["next_offset"] == 2
+    second = client.get("/search?q=coffee&limit=2&offset=2&fields=description").get_json()
+    assert [item["description"] for item in first["items"]] == ["Coffee beans", "Coffee with Sam"]
+    assert second == {"items": [{"description": "Flat white"}], "next_offset": None}
+
+    filtered = client.get("/search?q=coffee&category=Groceries&fields=description").get_json()
+    assert filtered["items"] == [{"description": "Coffee beans"}]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_search_index_follows_writes(client, db):
+    from models.expense import Expense
+    from models.user import User
+    expenses = _seed_searchable_expenses(db)
+    other = User(auth0_subject="auth0|someone_else")
+    db.session.add(other)
+    db.session.flush()
+    db.session.add(Expense(user_id=other.id, description="Coffee for someone else", amount=Decimal("1.00")))
+
+    expenses[3].description = "Coffee on the train"
+    db.session.delete(expenses[0])
+    db.session.commit()
+
+    items = client.get("/search?q=coffee&fields=description").get_json()["items"]
+    assert [item["description"] for item in items] == ["Coffee on the train", "Coffee with Sam", "Flat white"]
+    assert client.get("/search?q=beans").get_json()["items"] == []
+
+@pytest.mark.usefixtures("seed_test_user")
+@pytest.mark.parametrize("query, error", [
+    ("", "q must contain at least one word."),
+    ("?q=coffee&offset=-1", "offset must not be negative."),
+    ("?q=coffee&offset=5000", "offset must not be greater than 1000."),
+])
+def test_search_expenses_invalid(client, query, error):
+    response = client.get(f"/search{query}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+def _bulk_items():
+    return [
+        {"description": "Bread", "amount": "2.10", "category": "Food", "date": "2025-04-01T08:00:00Z"},
+        {"description": "Milk", "amount": "1.05", "category": "Food", "date": "2025-04-01T08:05:00Z"},
+        {"description": "Bus", "amount": "3.00", "date": "2025-04-02T09:00:00Z"},
+    ]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_bulk_create_expenses_single_insert(client, db):
+    from sqlalchemy import event
+    from models.expense import Expense
+    from models.expense_daily_rollup import ExpenseDailyRollup
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/bulk_create", json=_bulk_items())
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["errors"] == []
+    assert [item["index"] for item in body["created"]] == [0, 1, 2]
+    ids = [item["id"] for item in body["created"]]
+    assert [db.session.get(Expense, expense_id).description for expense_id in ids] == ["Bread", "Milk", "Bus"]
+    assert len([s for s in statements if s.startswith("INSERT INTO expenses ")]) == 1
+
+    rollups = {(r.day.isoformat(), r.category): (r.expense_count, r.amount_total)
+               for r in db.session.query(ExpenseDailyRollup).all()}
+    assert rollups == {("2025-04-01", "Food"): (2, Decimal("3.15")), ("2025-04-02", ""): (1, Decimal("3.00"))}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_bulk_create_expenses_atomic_rejects_batch(client, db):
+    from models.expense import Expense
+    items = _bulk_items()
+    items[1]["amount"] = "-1"
+    items.append("not an object")
+
+    response = client.post("/bulk_create", json=items)
+
+    assert response.status_code == 400
+    assert response.get_json() == {
+        "error": "No expenses were created.",
+        "created": [],
+        "errors": [
+            {"index": 1, "error": "Amount must be a positive number.", "fields": {"amount": "Amount must be a positive number."}},
+            {"index": 3, "error": "Each expense must be a non-empty JSON object."},
+        ],
+    }
+    assert db.session.query(Expense).count() == 0
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_bulk_create_expenses_partial(client, db):
+    from models.expense import Expense
+    items = _bulk_items()
+    del items[0]["description"]
+
+    response = client.post("/bulk_create?mode=partial", json=items)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [item["index"] for item in body["created"]] == [1, 2]
+    assert body["errors"] == [
+        {"index": 0, "error": "Missing required fields: description", "fields": {"description": "This field is required."}},
+    ]
+    assert db.session.query(Expense).count() == 2
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_bulk_create_expenses_without_multirow_returning(client, db, mocker):
+    # Dialects without ordered RETURNING (MySQL) go through the ORM; rollups must not be counted twice
+    from models.expense_daily_rollup import ExpenseDailyRollup
+    mocker.patch.object(db.engine.dialect, "insert_executemany_returning_sort_by_parameter_order", False)
+
+    response = client.post("/bulk_create", json=_bulk_items())
+
+    assert response.status_code == 201
+    assert len(response.get_json()["created"]) == 3
+    assert sum(r.expense_count for r in db.session.query(ExpenseDailyRollup).all()) == 3
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_bulk_create_expenses_invalidates_cached_reads(app, client, db):
+    app.config["SHARED_CACHE_ENABLED"] = True
+    assert client.get("/get_all").get_json()["items"] == []
+    client.post("/bulk_create", json=_bulk_items())
+    assert len(client.get("/get_all").get_json()["items"]) == 3
+
+@pytest.mark.usefixtures("seed_test_user")
+@pytest.mark.parametrize("query, body, error", [
+    ("", {"description": "Bread", "amount": "1"}, "Request body must be a non-empty JSON array of expenses."),
+    ("", [], "Request body must be a non-empty JSON array of expenses."),
+    ("", [{"description": "x", "amount": "1"}] * 6, "At most 5 expenses may be created at once."),
+    ("?mode=best_effort", [{"description": "x", "amount": "1"}], "Unsupported mode. Use one of: atomic, partial."),
+])
+def test_bulk_create_expenses_invalid_request(client, query, body, error):
+    response = client.post(f"/bulk_create{query}", json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_import_expenses_csv_upload_streams_progress(client, db):
+    import io
+    import json
+    from models.expense import Expense
+    csv_text = "Date,Description,Amount,Category\n" \
+        "2025-02-01,Coffee,-3.00,Food\n2025-02-02,Salary,2000.00,\n2025-02-03,Cinema,-12.00,Fun\n2025-02-04,Bad,abc,\n"
+
+    response = client.post(
+        "/import",
+        data={"file": (io.BytesIO(csv_text.encode("utf-8")), "statement.csv")},
+        content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [event["event"] for event in events] == ["progress", "done"]
+    assert events[-1] == {
+        "event": "done", "processed": 4, "imported": 2, "skipped": 1, "failed": 1,
+        "errors": [{"record": 4, "error": "Invalid amount: abc."}],
+    }
+    assert sorted(e.description for e in db.session.query(Expense).all()) == ["Cinema", "Coffee"]
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_import_expenses_raw_ofx_body(client, db):
+    from models.expense import Expense
+    body = "<OFX><STMTTRN><DTPOSTED>20250105<TRNAMT>-3.20<NAME>Bus</STMTTRN></OFX>"
+
+    response = client.post("/import?format=ofx", data=body.encode("utf-8"), content_type="application/x-ofx")
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).splitlines()[-1].startswith('{"processed":1,"imported":1')
+    expense = db.session.query(Expense).one()
+    assert (expense.description, expense.amount, expense.date) == ("Bus", Decimal("3.20"), datetime.datetime(2025, 1, 5))
+
+@pytest.mark.usefixtures("seed_test_user")
+@pytest.mark.parametrize("query, body, error", [
+    ("", "Date,Description,Amount\n", "Unsupported import format. Use one of: csv, ofx, qif."),
+    ("?format=csv&expense_sign=both", "Date,Description,Amount\n", "Unsupported expense_sign. Use one of: negative, positive."),
+    ("?format=csv", "when,what\n", "CSV header must include date, description and amount (or debit/credit) columns."),
+    ("?format=csv&encoding=klingon", "Date,Description,Amount\n", "unknown encoding: klingon"),
+])
+def test_import_expenses_invalid_request(client, query, body, error):
+    response = client.post(f"/import{query}", data=body.encode("utf-8"), content_type="text/csv")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+def test_import_expenses_cli(app, db, seed_test_user, tmp_path):
+    from app.commands import expenses_cli
+    from models.expense import Expense
+    statement = tmp_path / "history.qif"
+    statement.write_text("!Type:Bank\nD01/31/2025\nT-9.99\nPStreaming\nLSubscriptions\n^\n", encoding="utf-8")
+
+    app.cli.add_command(expenses_cli)
+    result = app.test_cli_runner().invoke(args=["expenses", "import", str(statement), "--user-id", str(seed_test_user.id)])
+
+    assert result.exit_code == 0, result.output
+    assert "Done: processed 1, imported 1, skipped 0, failed 0" in result.output
+    assert db.session.query(Expense).one().category == "Subscriptions"
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_update_expense(app, client, db):
+    app.config["SHARED_CACHE_ENABLED"] = True
+    created = client.post("/create", json={"description": "Lunch", "amount": "9.50", "date": "2025-06-01T12:00:00Z"})
+    expense_id = created.get_json()["id"]
+    assert client.get(f"/get_by_id/{expense_id}").get_json()["amount"] == "9.50"
+
+    response = client.patch(f"/update/{expense_id}", json={"amount": "11.25", "category": "Food"})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["id"], body["description"], body["amount"], body["category"]) == (expense_id, "Lunch", "11.25", "Food")
+    assert client.get(f"/get_by_id/{expense_id}").get_json()["amount"] == "11.25"
+    aggregate = client.get("/aggregate?group_by=category").get_json()["results"]
+    assert aggregate == [{"category": "Food", "total": "11.25", "count": 1, "average": "11.25"}]
+
+@pytest.mark.usefixtures("seed_test_user")
+@pytest.mark.parametrize("body, error, fields", [
+    ({}, "At least one of description, amount, category, date must be given.", {}),
+    ({"user_id": 2}, "Unknown field(s): user_id. Updatable fields: description, amount, category, date.",
+     {"user_id": "Unknown field."}),
+    ({"amount": "0"}, "Amount must be a positive number.", {"amount": "Amount must be a positive number."}),
+    ({"date": None, "category": 5}, "Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ).", {
+        "category": "Category, if provided, must be a string no longer than 50 characters.",
+        "date": "Invalid date format. Please use ISO 8601 format (e.g., YYYY-MM-DDTHH:MM:SSZ).",
+    }),
+    (["amount", "1"], "Request body must be JSON", None),
+])
+def test_update_expense_invalid(client, body, error, fields):
+    response = client.patch("/update/1", json=body)
+    assert response.status_code == 400
+    assert response.get_json() == ({"error": error} if fields is None else {"error": error, "fields": fields})
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_update_and_delete_other_users_expense_not_found(client, db):
+    from models.user import User
+    other = User(auth0_subject="auth0|someone_else")
+    db.session.add(other)
+    db.session.commit()
+    theirs = _seed_expenses(db, 1, user_id=other.id)[0]
+
+    assert client.patch(f"/update/{theirs.id}", json={"amount": "1"}).status_code == 404
+    response = client.delete(f"/delete/{theirs.id}")
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Expense not found."}
+    db.session.expire_all()
+    assert db.session.get(type(theirs), theirs.id).amount == Decimal("1.00")
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_delete_expense(client, db):
+    from models.expense import Expense
+    expense_id = client.post("/create", json={"description": "Gym", "amount": "30.00"}).get_json()["id"]
+
+    response = client.delete(f"/delete/{expense_id}")
+
+    assert response.status_code == 200
+    assert response.get_json()["description"] == "Gym"
+    assert db.session.query(Expense).count() == 0
+    assert client.delete(f"/delete/{expense_id}").status_code == 404
+
+@pytest.mark.usefixtures("seed_test_user")
+def test_delete_expenses_by_filter(client, db):
+    from models.expense import Expense
+    _seed_filterable_expenses(db)
+    before = db.session.query(Expense).count()
+
+    guarded = client.delete("/delete")
+    assert guarded.status_code == 400
+    assert guarded.get_json() == {"error": "Give at least one filter, or all=true to delete every expense."}
+
+    response = client.delete("/delete?category=Food")
+    assert response.status_code == 200
+    deleted = response.get_json()["deleted"]
+    assert deleted > 0
+    assert db.session.query(Expense).filter(Expense.category == "Food").count() == 0
+    assert client.get("/aggregate").get_json()["results"][0]["count"] == before - deleted
+
+    assert client.delete("/delete?all=true").get_json() == {"deleted": before - deleted}
@@ -150,12 +150,20 @@ function ExpensesPage() {
 
         try {
             const token = await getAccessTokenSilently();
-            const response = await axios.get(`${API_BASE_URL}/expenses/get_all`, {
-                headers: {
-                    Authorization: `Bearer ${token}`,
-                },
-            });
-            setAllExpenses(response.data || []);
+            // get_all is cursor-paginated; follow next_cursor until the last page
+            const expenses = [];
+            let cursor = null;
+            do {
+                const response = await axios.get(`${API_BASE_URL}/expenses/get_all`, {
+                    headers: {
+                        Authorization: `Bearer ${token}`,
+                    },
+                    params: cursor ? { cursor } : {},
+                });
+                expenses.push(...(response.data.items || []));
+                cursor = response.data.next_cursor;
+            } while (cursor);
+            setAllExpenses(expenses);
         } catch (error) {
             console.error('Error fetching all expenses:', error);
             setFetchAllExpensesError(